@@ -0,0 +1,94 @@
+"""
+Encode/decode cost of the packed binary content type against JSON.
+
+For each hot message (a status request, a guide pulse, a status response, a
+star coordinates response and a telemetry frame) this times JSON through the
+old BytesIO/TextIOWrapper decode, JSON through libcodec, and libpacked, and
+prints the size of each form. It then times framing a message: building the
+JSON header dict every time, as before, against libcodec.encode_frame.
+
+Usage: python bench_codec.py [iterations]
+"""
+import io
+import json
+import os
+import struct
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'Server'))
+import libserver # noqa: E402
+import libcodec # noqa: E402  (Common is on the path once libserver is imported)
+import libpacked # noqa: E402
+
+MESSAGES = [
+    ('status request', 'request', {"action": "status", "value": 0.5}),
+    ('pulse request', 'request', {"action": "pulse", "value": {"direction": "east", "duration": 250}}),
+    ('status response', 'status', {"result": {"value": 2, "age": 0.012}}),
+    ('starcoords response', 'starcoords', {"result": {"value": [320.5, 240.25], "age": 0.012}}),
+    ('telemetry frame', 'subscribe', {"telemetry": {
+        "seq": 1234, "time": 1700000000.25, "centroid": [320.5, 240.25],
+        "error": [0.125, -0.25], "status": 3, "age": 0.004, "coalesced": 0,
+    }}),
+]
+
+
+def legacy_json_decode(json_bytes, encoding):
+    # what libserver and libclient did per header and per body before libcodec
+    tiow = io.TextIOWrapper(io.BytesIO(json_bytes), encoding=encoding, newline="")
+    obj = json.load(tiow)
+    tiow.close()
+    return obj
+
+
+def legacy_frame(content_bytes):
+    jsonheader = {
+        "byteorder": sys.byteorder,
+        "content-type": "text/json",
+        "content-encoding": "utf-8",
+        "content-length": len(content_bytes),
+        "request-id": 1234,
+    }
+    jsonheader_bytes = libcodec.json_encode(jsonheader)
+    return struct.pack(">H", len(jsonheader_bytes)) + jsonheader_bytes + content_bytes
+
+
+def per_op(func, arg, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        func(arg)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f'{"message":<20} {"codec":<7} {"bytes":>5} {"encode":>10} {"decode":>10}')
+    for name, action, content in MESSAGES:
+        json_bytes = libserver.json_encode(content, "utf-8")
+        if action == 'request':
+            packed = libpacked.encode_request(content)
+            pack, unpack = libpacked.encode_request, libpacked.decode_request
+        else:
+            packed = libpacked.encode_response(action, content)
+            pack, unpack = (lambda c: libpacked.encode_response(action, c)), libpacked.decode_response
+        json_encode_time = per_op(libcodec.json_encode, content, count)
+        rows = (
+            ('legacy', len(json_bytes), json_encode_time,
+             per_op(lambda b: legacy_json_decode(b, "utf-8"), json_bytes, count)),
+            ('json', len(json_bytes), json_encode_time,
+             per_op(libcodec.json_decode, json_bytes, count)),
+            ('packed', len(packed), per_op(pack, content, count), per_op(unpack, packed, count)),
+        )
+        for codec, size, encode, decode in rows:
+            print(f'{name:<20} {codec:<7} {size:5d} {encode * 1e6:8.2f}us {decode * 1e6:8.2f}us')
+    content_bytes = libcodec.json_encode(MESSAGES[2][2])
+    assert libcodec.json_decode(legacy_frame(content_bytes)[2:-len(content_bytes)]) == \
+        libcodec.json_decode(libcodec.encode_frame(content_bytes, "text/json", "utf-8", 1234)[2:-len(content_bytes)])
+    print(f'frame header, dict + json  {per_op(legacy_frame, content_bytes, count) * 1e6:8.2f}us')
+    print(f'frame header, cached       '
+          f'{per_op(lambda c: libcodec.encode_frame(c, "text/json", "utf-8", 1234), content_bytes, count) * 1e6:8.2f}us')
+
+
+if __name__ == '__main__':
+    main()
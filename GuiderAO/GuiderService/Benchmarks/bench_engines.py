@@ -0,0 +1,89 @@
+"""
+Head to head: the asyncio server engine against the original selectors loop.
+
+Each engine is started from Server/app-server.py on localhost. A number of
+client threads then hammer it at once, each over its own session, and the
+per-request latency and total throughput are reported. The clients ask for
+the cached guider status. With --busy, one more client keeps the guider
+exposing the whole time, which shows whether status reads wait behind it.
+
+Usage: python bench_engines.py [clients] [requests per client] [--busy]
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'Client'))
+from libclient import Session # noqa: E402
+from standin import free_port, start_server, stop_server # noqa: E402
+
+REQUEST = dict(
+    type="text/json",
+    encoding="utf-8",
+    content=dict(action="status", value=""),
+)
+
+EXPOSE = dict(
+    type="text/json",
+    encoding="utf-8",
+    content=dict(action="star", value=0.05),
+)
+
+
+def client(port, count, samples):
+    with Session('127.0.0.1', port) as session:
+        for _ in range(count):
+            start = time.perf_counter()
+            session.request(REQUEST)
+            samples.append(time.perf_counter() - start)
+
+
+def exposer(port, done):
+    try:
+        with Session('127.0.0.1', port) as session:
+            session.request(dict(EXPOSE, content=dict(action="initialize", value=0.05)))
+            while not done.is_set():
+                session.request(EXPOSE)
+    except (OSError, RuntimeError):
+        pass # the server was stopped mid command
+
+
+def run(engine_args, clients, count, busy=False):
+    port = free_port()
+    server = start_server(port, *engine_args)
+    samples = []
+    done = threading.Event()
+    try:
+        if busy:
+            threading.Thread(target=exposer, args=(port, done), daemon=True).start()
+            time.sleep(0.5) # let the first exposure get going
+        threads = [threading.Thread(target=client, args=(port, count, samples)) for _ in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        done.set()
+        stop_server(server)
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    return len(samples) / elapsed, statistics.median(samples), p99
+
+
+def main():
+    busy = '--busy' in sys.argv
+    argv = [arg for arg in sys.argv[1:] if arg != '--busy']
+    clients = int(argv[0]) if len(argv) > 0 else 8
+    count = int(argv[1]) if len(argv) > 1 else 200
+    for name, args in (('selector', ['--selector']), ('asyncio', [])):
+        rate, p50, p99 = run(args, clients, count, busy)
+        print(f'{name:<9} {rate:9.0f} req/s   p50 {p50 * 1e6:8.1f} us   p99 {p99 * 1e6:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Receive throughput of the message framing layer for large binary payloads.
+
+Pushes framed multi-megabyte messages through a local socket pair into
+libserver.Message and compares with the original receive loop, which
+appended every 4096-byte recv to a bytes buffer and re-sliced it.
+
+Usage: python bench_framing.py [MB ...]
+"""
+import contextlib
+import io
+import json
+import os
+import selectors
+import socket
+import struct
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'Server'))
+from libserver import Message # noqa: E402
+
+
+def frame(payload):
+    jsonheader = json.dumps({
+        "byteorder": sys.byteorder,
+        "content-type": "binary/custom-client-binary-type",
+        "content-encoding": "binary",
+        "content-length": len(payload),
+    }).encode("utf-8")
+    return struct.pack(">H", len(jsonheader)) + jsonheader + payload
+
+
+def send_in_background(sock, data):
+    sender = threading.Thread(target=sock.sendall, args=(data,))
+    sender.start()
+    return sender
+
+
+def legacy_receive(sock):
+    # the receive path before RecvBuffer, kept here for comparison
+    recv_buffer = b""
+    jsonheader_len = jsonheader = None
+    while True:
+        data = sock.recv(4096)
+        recv_buffer += data
+        if jsonheader_len is None and len(recv_buffer) >= 2:
+            jsonheader_len = struct.unpack(">H", recv_buffer[:2])[0]
+            recv_buffer = recv_buffer[2:]
+        if jsonheader_len is not None and jsonheader is None and len(recv_buffer) >= jsonheader_len:
+            jsonheader = json.loads(recv_buffer[:jsonheader_len])
+            recv_buffer = recv_buffer[jsonheader_len:]
+        if jsonheader and len(recv_buffer) >= jsonheader["content-length"]:
+            request = recv_buffer[:jsonheader["content-length"]]
+            recv_buffer = recv_buffer[jsonheader["content-length"]:]
+            return request
+
+
+def message_receive(sock):
+    sel = selectors.DefaultSelector()
+    sel.register(sock, selectors.EVENT_READ)
+    message = Message(sel, sock, 'bench')
+    sel.modify(sock, selectors.EVENT_READ, data=message)
+    with contextlib.redirect_stdout(io.StringIO()):
+        while message.request is None:
+            sel.select()
+            message.read()
+    sel.unregister(sock)
+    sel.close()
+    return message.request
+
+
+def run(receive, payload, blocking):
+    a, b = socket.socketpair()
+    b.setblocking(blocking)
+    data = frame(payload)
+    start = time.perf_counter()
+    sender = send_in_background(a, data)
+    request = receive(b)
+    elapsed = time.perf_counter() - start
+    sender.join()
+    a.close()
+    b.close()
+    assert request == payload
+    return elapsed
+
+
+def main():
+    sizes = [float(mb) for mb in sys.argv[1:]] or [1, 4, 16]
+    for mb in sizes:
+        payload = os.urandom(int(mb * 1024 * 1024))
+        new = min(run(message_receive, payload, False) for _ in range(3))
+        line = f'{mb:6.1f} MB   RecvBuffer {mb / new:8.1f} MB/s'
+        if mb <= 16: # the quadratic loop takes minutes beyond this
+            old = run(legacy_receive, payload, True)
+            line += f'   legacy bytes += {mb / old:8.1f} MB/s'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
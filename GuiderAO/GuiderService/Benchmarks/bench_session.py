@@ -0,0 +1,85 @@
+"""
+Per-command latency of the GuiderService socket protocol, one connection per
+command (the original client) against a persistent session.
+
+A stand-in server is started from Server/app-server.py on localhost, so no
+MaxIm DL or guider hardware is needed.
+
+Usage: python bench_session.py [count]
+"""
+import contextlib
+import io
+import os
+import selectors
+import socket
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'Client'))
+from libclient import Message, Session # noqa: E402
+from standin import free_port, start_server, stop_server # noqa: E402
+
+REQUEST = dict(
+    type="text/json",
+    encoding="utf-8",
+    content=dict(action="status", value=""),
+)
+
+
+def one_shot(port):
+    # the original client flow: connect, send one request, read the reply, close
+    sel = selectors.DefaultSelector()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    sock.connect_ex(('127.0.0.1', port))
+    message = Message(sel, sock, ('127.0.0.1', port), REQUEST)
+    sel.register(sock, selectors.EVENT_READ | selectors.EVENT_WRITE, data=message)
+    with contextlib.redirect_stdout(io.StringIO()):
+        while sel.get_map():
+            for key, mask in sel.select(timeout=1):
+                key.data.process_events(mask)
+    sel.close()
+    return message.response
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f'{name:<22} mean {statistics.mean(samples) * 1e6:9.1f} us   '
+          f'p50 {statistics.median(samples) * 1e6:9.1f} us   p99 {p99 * 1e6:9.1f} us')
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    port = free_port()
+    server = start_server(port)
+    try:
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            one_shot(port)
+            samples.append(time.perf_counter() - start)
+        report('connection per command', samples)
+
+        with Session('127.0.0.1', port) as session:
+            samples = []
+            for _ in range(count):
+                start = time.perf_counter()
+                session.request(REQUEST)
+                samples.append(time.perf_counter() - start)
+            report('session, sequential', samples)
+
+            start = time.perf_counter()
+            ids = [session.send(REQUEST) for _ in range(count)]
+            for request_id in ids:
+                session.receive(request_id)
+            elapsed = time.perf_counter() - start
+            print(f'{"session, pipelined":<22} mean {elapsed / count * 1e6:9.1f} us per command')
+    finally:
+        stop_server(server)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Telemetry subscriptions against a stand-in server on the fake camera.
+
+A prompt subscriber reports the frame rate it gets and the spread of frame
+intervals. A slow subscriber reads one frame per `lag` seconds and reports how
+stale its frames are and how many samples the server coalesced, for both
+server engines.
+
+Usage: python bench_telemetry.py [rate Hz] [seconds]
+"""
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'Client'))
+from libclient import Session # noqa: E402
+from standin import free_port, start_server, stop_server # noqa: E402
+
+
+def prompt(port, rate, seconds):
+    with Session('127.0.0.1', port) as session:
+        session.subscribe(rate)
+        arrivals = []
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            session.telemetry()
+            arrivals.append(time.perf_counter())
+        session.unsubscribe()
+    gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+    return len(arrivals) / seconds, statistics.median(gaps), statistics.pstdev(gaps)
+
+
+def slow(port, rate, seconds, lag=0.05):
+    with Session('127.0.0.1', port) as session:
+        session.subscribe(rate)
+        delays = []
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            sample = session.telemetry()
+            delays.append(time.time() - sample['time'])
+            time.sleep(lag)
+        session.unsubscribe()
+    return len(delays), sample['seq'], sample['coalesced'], max(delays)
+
+
+def main():
+    rate = float(sys.argv[1]) if len(sys.argv) > 1 else 50.0
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    for name, args in (('selector', ['--selector']), ('asyncio', [])):
+        port = free_port()
+        server = start_server(port, '--refresh', '0.02', *args)
+        try:
+            hz, p50, jitter = prompt(port, rate, seconds)
+            print(f'{name:<9} prompt  {hz:6.1f} frames/s   interval p50 {p50 * 1e3:6.2f} ms   '
+                  f'stdev {jitter * 1e3:6.2f} ms')
+            read, seq, coalesced, worst = slow(port, rate, seconds)
+            print(f'{name:<9} slow    read {read:4d} of {seq:4d} sent   coalesced {coalesced:5d}   '
+                  f'worst frame delay {worst * 1e3:7.1f} ms')
+        finally:
+            stop_server(server)
+
+
+if __name__ == '__main__':
+    main()
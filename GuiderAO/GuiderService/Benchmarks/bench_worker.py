@@ -0,0 +1,109 @@
+"""
+Times guider commands through MaximWorker against the fake camera.
+
+Reports the queue round trip for a cheap command against reading the same
+value from the worker's cached guider state, how long exposures take
+compared with the requested duration (with the default settle delays and
+with them zeroed), how late the asyncio event loop runs while it awaits an
+exposure on the worker, and the wait times maxim_menu recorded.
+
+Usage: python bench_worker.py
+"""
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'Server'))
+import maxim_menu # noqa: E402
+from fake_camera import FakeCCDCamera # noqa: E402
+from guider_state import StateCache # noqa: E402
+from maxim_worker import MaximWorker # noqa: E402
+
+OUT = sys.stdout # maxim_menu prints every step, so results go here and the rest is muted
+
+
+def round_trip(worker, count=2000):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        worker.submit('calcode').result()
+        samples.append(time.perf_counter() - start)
+    print(f'calcode round trip      p50 {statistics.median(samples) * 1e6:8.1f} us   '
+          f'max {max(samples) * 1e6:8.1f} us', file=OUT)
+
+
+def cached_reads(worker, count=20000):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        worker.cache.read('calcode', max_age=1.0)
+        samples.append(time.perf_counter() - start)
+    print(f'calcode cached read     p50 {statistics.median(samples) * 1e6:8.1f} us   '
+          f'max {max(samples) * 1e6:8.1f} us', file=OUT)
+    # the cache keeps answering while the worker is busy with an exposure
+    busy = worker.submit('expose', 1.0)
+    ages = []
+    while not busy.done():
+        ages.append(worker.cache.read('status').age())
+        time.sleep(0.01)
+    print(f'status age during expose   max {max(ages):6.3f} s   '
+          f'(refresh every {worker.cache.interval} s)', file=OUT)
+
+
+def exposures(worker, note):
+    for duration in (0.05, 0.2, 1.0):
+        start = time.perf_counter()
+        worker.submit('expose', duration).result()
+        elapsed = time.perf_counter() - start
+        print(f'expose {duration:4.2f} s {note:<12} took {elapsed:6.3f} s   '
+              f'dead time {elapsed - duration:6.3f} s', file=OUT)
+
+
+async def loop_lag(worker):
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    tick = asyncio.create_task(ticker())
+    await worker.call('expose', 0.5)
+    done = True
+    await tick
+    print(f'event loop lag during expose   ticks {len(lags)}   '
+          f'p50 {statistics.median(lags) * 1e6:8.1f} us   max {max(lags) * 1e6:8.1f} us', file=OUT)
+
+
+def wait_report():
+    for label, stats in maxim_menu.wait_stats.summary().items():
+        print(f'wait {label:<12} {stats["count"]:4d} waits   mean {stats["mean"]:6.3f} s   '
+              f'max {stats["max"]:6.3f} s   {stats["polls"]:5.1f} polls', file=OUT)
+
+
+def main():
+    worker = MaximWorker(camera_factory=FakeCCDCamera, cache=StateCache(0.25))
+    worker.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        worker.submit('connect').result()
+        round_trip(worker)
+        cached_reads(worker)
+        exposures(worker, 'settled')
+        settle_times = dict(maxim_menu.settle_times)
+        maxim_menu.settle_times.update(dict.fromkeys(settle_times, 0))
+        exposures(worker, 'no settle')
+        maxim_menu.settle_times.update(settle_times)
+        asyncio.run(loop_lag(worker))
+        wait_report()
+        worker.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Start Server/app-server.py on localhost as a stand-in guider server for the benchmarks."""
+import os
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER = os.path.join(HERE, '..', 'Server', 'app-server.py')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, *args):
+    """Launch the server on the fake camera with extra command line ``args`` and wait until it accepts."""
+    server = subprocess.Popen(
+        [sys.executable, SERVER, '127.0.0.1', str(port), '--fake-camera', *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError('stand-in server did not start')
+
+
+def stop_server(server):
+    server.terminate()
+    server.wait()
@@ -1,25 +1,20 @@
 # ...
 import sys 
+import logging
 import socket
 import selectors
 import traceback
-from libclient import Message
+from libclient import Message, Session
 
 sel = selectors.DefaultSelector()
+logging.basicConfig(level=logging.WARNING) # libclient logs each message at DEBUG
 
 def create_request(action, value):
-    if action == "search":
-        return dict(
-            type="text/json",
-            encoding="utf-8",
-            content=dict(action=action, value=value),
-        )
-    else:
-        return dict( # i guess you have to use 
-            type="binary/custom-client-binary-type",
-            encoding="binary",
-            content=bytes(action + value, encoding="utf-8"),
-        )
+    return dict(
+        type="text/json",
+        encoding="utf-8",
+        content=dict(action=action, value=value),
+    )
 
 def start_connection(host, port, request):
     addr = (host, port) # same ole socket connection parameters
@@ -31,16 +26,41 @@ def start_connection(host, port, request):
     message = Message(sel, sock, addr, request)
     sel.register(sock, events, data=message)
 
+def run_session(host, port, pairs):
+    # several commands share one connection, sent back to back and matched by request id
+    with Session(host, port) as session:
+        ids = [session.send(create_request(action, value)) for action, value in pairs]
+        for (action, value), request_id in zip(pairs, ids):
+            print(f'{action} {value}: {session.receive(request_id)!r}')
+
+def run_subscription(host, port, rate):
+    # prints guide star telemetry as the server pushes it, until Ctrl-C
+    with Session(host, port) as session:
+        print(f'subscribe {rate}: {session.subscribe(rate)!r}')
+        try:
+            while True:
+                sample = session.telemetry()
+                print(f"#{sample['seq']} centroid {sample['centroid']} error {sample['error']} "
+                      f"status {sample['status']} age {sample['age']}s coalesced {sample['coalesced']}")
+        except KeyboardInterrupt:
+            print(f'unsubscribe: {session.unsubscribe()!r}')
+
 # change this after config file is created
-if len(sys.argv) != 5:
-    print(f'Usage: {sys.argv[0]} <host> <port> <action> <value>')
+if len(sys.argv) < 5 or len(sys.argv) % 2 != 1:
+    print(f'Usage: {sys.argv[0]} <host> <port> <action> <value> [<action> <value> ...]')
     sys.exit(1)
 
 host, port = sys.argv[1], int(sys.argv[2])
+if sys.argv[3] == 'subscribe' and len(sys.argv) == 5:
+    run_subscription(host, port, sys.argv[4])
+    sys.exit(0)
+if len(sys.argv) > 5:
+    pairs = list(zip(sys.argv[3::2], sys.argv[4::2]))
+    run_session(host, port, pairs)
+    sys.exit(0)
 action, value = sys.argv[3], sys.argv[4]
 request = create_request(action, value)
 start_connection(host, port, request)
-print(1)
 
 try:
     while True:
@@ -1,9 +1,20 @@
 # ...
 import sys
+import collections
+import logging
 import selectors
-import struct
-import json
-import io
+import os
+import socket
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from libframing import RecvBuffer
+import libcodec
+from libcodec import json_encode, json_decode, framing_stats
+import libpacked
+
+# per-message lines are DEBUG and are not even formatted unless DEBUG is on
+logger = logging.getLogger("guider.client")
 
 
 class Message:
@@ -12,8 +23,8 @@ class Message:
         self.sock = sock
         self.addr = addr
         self.request = request
-        self._recv_buffer = b""
-        self._send_buffer = b""
+        self._recv_buffer = RecvBuffer()
+        self._send_buffer = bytearray()
         self._request_queued = False
         self._jsonheader_len = None
         self.jsonheader = None
@@ -51,7 +62,13 @@ class Message:
         content_encoding = self.request["encoding"]
         if content_type == 'text/json':
             req = {
-                "content_bytes": self._json_encode(content, content_encoding),
+                "content_bytes": json_encode(content, content_encoding),
+                "content_type": content_type,
+                "content_encoding": content_encoding,
+            }
+        elif content_type == libpacked.CONTENT_TYPE: # same request dict, packed
+            req = {
+                "content_bytes": libpacked.encode_request(content),
                 "content_type": content_type,
                 "content_encoding": content_encoding,
             }
@@ -72,19 +89,16 @@ class Message:
             self.write()
     
     def close(self):
-        print(f"Closing connection to {self.addr}")
+        logger.info("Closing connection to %s", self.addr)
         try:
             self.selector.unregister(self.sock)
         except Exception as e:
-            print(
-                f"Error: selector.unregister() exception for "
-                f"{self.addr}: {e!r}"
-            )
+            logger.error("selector.unregister() exception for %s: %r", self.addr, e)
 
         try:
             self.sock.close()
         except OSError as e:
-            print(f"Error: socket.close() exception for {self.addr}: {e!r}")
+            logger.error("socket.close() exception for %s: %r", self.addr, e)
         finally:
             # Delete reference to socket object for garbage collection
             self.sock = None
@@ -92,18 +106,16 @@ class Message:
     def process_protoheader(self): # receiving and processing the first two bytes, the fixed length header
         hdrlen = 2 # 2-byte integer in network, or big endian, byte order | contains length of json header 
         if len(self._recv_buffer) >= hdrlen:
-            self._jsonheader_len = struct.unpack( # where we are storing the header length
-                ">H", self._recv_buffer[:hdrlen]
+            self._jsonheader_len = self._recv_buffer.unpack( # where we are storing the header length
+                ">H" # once done, it is consumed from the recv_buffer
             )[0]
-            self._recv_buffer = self._recv_buffer[hdrlen:] #once done, it is removed from the recv_buffer
     
     def process_jsonheader(self):
         hdrlen = self._jsonheader_len
         if len(self._recv_buffer) >= hdrlen:
-            self.jsonheader = self._json_decode( # using json package methods to decode + deserialize JSON hdr into dict
-                self._recv_buffer[:hdrlen], "utf-8" # JSON header is defined by Unicode w/ UTF-8 encoding
-            )
-            self._recv_buffer = self._recv_buffer[hdrlen:] # once done, it is removed from the recv_buffer
+            self.jsonheader = json_decode( # deserialize JSON hdr into dict
+                self._recv_buffer.take(hdrlen) # JSON header is defined by Unicode w/ UTF-8 encoding
+            ) # once done, it is consumed from the recv_buffer
             for reqhdr in (
                 "byteorder",
                 "content-length",
@@ -112,25 +124,27 @@ class Message:
             ):
                 if reqhdr not in self.jsonheader:
                     raise ValueError(f"Missing required header '{reqhdr}'.")
+            # grow the buffer once up front for large content instead of per recv
+            self._recv_buffer.reserve(self.jsonheader["content-length"] - len(self._recv_buffer))
     
     def process_response(self):
         content_len = self.jsonheader["content-length"]
         if not len(self._recv_buffer) >= content_len:
             return
-        data = self._recv_buffer[:content_len]
-        self._recv_buffer = self._recv_buffer[content_len:]
-        if self.jsonheader["content-type"] == "text/json":
-            encoding = self.jsonheader["content-encoding"]
-            self.response = self._json_decode(data, encoding)
-            print(f"Received response {self.response!r} from {self.addr}")
-            self._process_response_json_content()
+        data = self._recv_buffer.take(content_len)
+        content_type = self.jsonheader["content-type"]
+        if content_type == "text/json":
+            self.response = json_decode(data, self.jsonheader["content-encoding"])
+        elif content_type == libpacked.CONTENT_TYPE:
+            self.response = libpacked.decode_response(data)
         else:
             # Binary or unknown content-type
             self.response = data
-            print(
-                f"Received {self.jsonheader['content-type']} "
-                f"response from {self.addr}"
-            )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received %s response %r from %s", content_type, self.response, self.addr)
+        if isinstance(self.response, dict):
+            self._process_response_json_content()
+        else:
             self._process_response_binary_content()
         # Close when response has been processed
         self.close()
@@ -138,19 +152,16 @@ class Message:
     def _read(self):
         try:
             # Should be ready to read
-            data = self.sock.recv(4096)
+            received = self._recv_buffer.recv_into(self.sock)
         except BlockingIOError:
             # Resource temporarily unavailable (errno EWOULDBLOCK)
             pass
         else:
-            if data:
-                self._recv_buffer += data
-            else:
+            if not received:
                 raise RuntimeError("Peer closed.")
 
     def _write(self):
         if self._send_buffer:
-            print(f'Sending {self._send_buffer!r} to {self.addr}')
             try:
                 #Should be ready to write
                 sent = self.sock.send(self._send_buffer)
@@ -158,32 +169,14 @@ class Message:
                 # resource temporarily unavailable
                 pass
             else:
-                self._send_buffer = self._send_buffer[sent:]
-    
-    def _json_encode(self, obj, encoding):
-        return json.dumps(obj, ensure_ascii=False).encode(encoding)
-
-    def _json_decode(self, json_bytes, encoding):
-        tiow = io.TextIOWrapper(
-            io.BytesIO(json_bytes), encoding = encoding, newline=''
-        )
-        obj = json.load(tiow)
-        tiow.close()
-        return obj
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sent %d of %d bytes to %s", sent, len(self._send_buffer), self.addr)
+                del self._send_buffer[:sent]
     
     def _create_message(
             self, *, content_bytes, content_type, content_encoding 
     ):
-        jsonheader = {
-            "byteorder": sys.byteorder,
-            "content-type": content_type,
-            "content-encoding": content_encoding,
-            "content-length": len(content_bytes),
-        }
-        jsonheader_bytes = self._json_encode(jsonheader, "utf-8")
-        message_hdr = struct.pack(">H", len(jsonheader_bytes))
-        message = message_hdr + jsonheader_bytes + content_bytes
-        return message
+        return libcodec.encode_frame(content_bytes, content_type, content_encoding)
     
     def _process_response_json_content(self):
         content = self.response
@@ -204,4 +197,141 @@ class Message:
             events = selectors.EVENT_READ | selectors.EVENT_WRITE
         else:
             raise ValueError(f"Invalid events mask mode {mode!r}.")
-        self.selector.modify(self.sock, events, data=self)
\ No newline at end of file
+        self.selector.modify(self.sock, events, data=self)
+
+class Session:
+    """Long-lived connection that carries many framed requests.
+
+    Every request goes out with a ``request-id`` and ``keep-alive`` header so
+    the server leaves the socket open after answering. Requests can be
+    pipelined with ``send`` and collected later with ``receive``; responses
+    are matched to their request by id.
+
+    After ``subscribe`` the server also pushes telemetry frames, which are
+    read with ``telemetry``.
+    """
+    def __init__(self, host, port, timeout=None):
+        self.addr = (host, port)
+        self.sock = socket.create_connection(self.addr, timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._recv_buffer = RecvBuffer()
+        self._next_id = 0
+        self._responses = {} # request-id -> response that arrived before it was asked for
+        self._telemetry = collections.deque() # stream frames not read yet
+        self._window = 1 # unacknowledged frames the server allows, from subscribe
+        self._acked = 0 # last frame acknowledged
+        self._packed = False # stream requests and frames use libpacked
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(self, request):
+        """Send a request (same dict format as ``Message``) and return its request id."""
+        self._next_id += 1
+        content = request["content"]
+        content_type = request["type"]
+        content_encoding = request["encoding"]
+        start = time.perf_counter()
+        if content_type == "text/json":
+            content = json_encode(content, content_encoding)
+        elif content_type == libpacked.CONTENT_TYPE:
+            content = libpacked.encode_request(content)
+        message = libcodec.encode_frame(
+            content, content_type, content_encoding, request_id=self._next_id, keep_alive=True
+        )
+        framing_stats['encode'].record(time.perf_counter() - start)
+        self.sock.sendall(message)
+        return self._next_id
+
+    def receive(self, request_id):
+        """Block until the response for ``request_id`` arrives and return it."""
+        while request_id not in self._responses:
+            self._route(*self._read_message())
+        return self._responses.pop(request_id)
+
+    def request(self, request):
+        """Send one request and wait for its response."""
+        return self.receive(self.send(request))
+
+    def subscribe(self, rate, packed=False):
+        """Ask for telemetry frames at ``rate`` Hz, returns the server's answer.
+
+        With ``packed`` the stream uses the libpacked binary content type.
+        """
+        self._packed = packed
+        response = self.request(self._stream_request("subscribe", rate))
+        result = response.get("result")
+        if isinstance(result, dict):
+            self._window = result["window"]
+            self._acked = 0
+        return response
+
+    def unsubscribe(self):
+        """Stop the telemetry stream. Frames already on their way are dropped."""
+        response = self.request(self._stream_request("unsubscribe", ""))
+        self._telemetry.clear()
+        return response
+
+    def telemetry(self):
+        """Block until the next telemetry frame arrives and return its sample.
+
+        Frames are acknowledged as they are read, every half window, so the
+        server knows how far behind this client is.
+        """
+        while not self._telemetry:
+            self._route(*self._read_message())
+        sample = self._telemetry.popleft()
+        if sample["seq"] - self._acked >= self._window // 2:
+            self._acked = sample["seq"]
+            self.send(self._stream_request("ack", self._acked))
+        return sample
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError as e:
+                logger.error("socket.close() exception for %s: %r", self.addr, e)
+            finally:
+                self.sock = None
+
+    def _stream_request(self, action, value):
+        if self._packed:
+            return dict(type=libpacked.CONTENT_TYPE, encoding=libpacked.CONTENT_ENCODING,
+                        content=dict(action=action, value=value))
+        return dict(type="text/json", encoding="utf-8", content=dict(action=action, value=value))
+
+    def _route(self, jsonheader, response):
+        if jsonheader.get("stream"):
+            self._telemetry.append(response["telemetry"])
+        else:
+            self._responses[jsonheader.get("request-id")] = response
+
+    def _read_message(self):
+        self._fill(2)
+        jsonheader_len = self._recv_buffer.unpack(">H")[0]
+        self._fill(jsonheader_len)
+        start = time.perf_counter()
+        jsonheader = json_decode(self._recv_buffer.take(jsonheader_len))
+        decode_time = time.perf_counter() - start
+        content_len = jsonheader["content-length"]
+        self._recv_buffer.reserve(content_len - len(self._recv_buffer))
+        self._fill(content_len)
+        data = self._recv_buffer.take(content_len)
+        start = time.perf_counter()
+        if jsonheader["content-type"] == "text/json":
+            response = json_decode(data, jsonheader["content-encoding"])
+        elif jsonheader["content-type"] == libpacked.CONTENT_TYPE:
+            response = libpacked.decode_response(data)
+        else:
+            response = data
+        framing_stats['decode'].record(decode_time + time.perf_counter() - start)
+        return jsonheader, response
+
+    def _fill(self, size):
+        while len(self._recv_buffer) < size:
+            if not self._recv_buffer.recv_into(self.sock):
+                raise RuntimeError("Peer closed.")
@@ -0,0 +1,116 @@
+"""
+JSON codec and message framing for the guider socket protocol
+
+A message is a 2-byte big-endian protoheader holding the JSON header's length,
+the JSON header, then the content. json_decode parses the bytes as they come
+off the socket, with no BytesIO/TextIOWrapper per message. encode_frame keeps
+the constant start of the JSON header for each content-type/encoding pair, so
+framing a message only formats the length and the optional fields.
+
+framing_stats holds a latency histogram each for decoding and encoding
+messages. Only codec work is timed, never waiting on the socket, so the
+framing overhead can be seen on its own.
+"""
+import json
+import struct
+import sys
+import threading
+
+_protoheader = struct.Struct(">H")
+
+
+def json_encode(obj, encoding="utf-8"):
+    return json.dumps(obj, ensure_ascii=False).encode(encoding)
+
+def json_decode(json_bytes, encoding="utf-8"):
+    if encoding in ("utf-8", "utf8"):
+        return json.loads(json_bytes) # json.loads takes UTF-8 bytes as they are
+    return json.loads(bytes(json_bytes).decode(encoding))
+
+
+_header_prefixes = {} # (content-type, content-encoding) -> JSON header up to the content-length value
+
+def _header_prefix(content_type, content_encoding):
+    prefix = _header_prefixes.get((content_type, content_encoding))
+    if prefix is None:
+        fixed = json_encode({
+            "byteorder": sys.byteorder,
+            "content-type": content_type,
+            "content-encoding": content_encoding,
+        })
+        prefix = fixed[:-1] + b', "content-length": '
+        _header_prefixes[(content_type, content_encoding)] = prefix
+    return prefix
+
+def encode_frame(content_bytes, content_type, content_encoding,
+                 request_id=None, keep_alive=False, stream=False):
+    """Protoheader + JSON header + content, ready to send."""
+    header = bytearray(_header_prefix(content_type, content_encoding))
+    header += b"%d" % len(content_bytes)
+    if request_id is not None: # echo the id so a session client can match responses
+        header += b', "request-id": '
+        header += b"%d" % request_id if type(request_id) is int else json_encode(request_id)
+    if keep_alive: # client asks the server to leave the socket open
+        header += b', "keep-alive": true'
+    if stream: # one of many frames pushed for a subscription, not a response
+        header += b', "stream": true'
+    header += b"}"
+    return _protoheader.pack(len(header)) + header + content_bytes
+
+
+class LatencyHistogram:
+    """Durations counted in power-of-two microsecond buckets.
+
+    Bucket 0 counts durations under 1 us, bucket i those from 2**(i-1) up to
+    2**i us, and the last bucket everything longer.
+    """
+    def __init__(self, buckets=24):
+        self._lock = threading.Lock()
+        self._counts = [0] * buckets
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, seconds):
+        index = min(int(seconds * 1e6).bit_length(), len(self._counts) - 1)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def _percentile(self, counts, fraction):
+        # upper edge of the bucket holding the given fraction of samples, in us
+        target = fraction * sum(counts)
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if count and seen >= target:
+                return 1 << index
+        return 0
+
+    def summary(self):
+        """count, mean/max in us, p50/p99 bucket edges in us, and the non-empty buckets."""
+        with self._lock:
+            counts = list(self._counts)
+            total, longest = self._total, self._max
+        count = sum(counts)
+        return {
+            'count': count,
+            'mean_us': round(total / count * 1e6, 2) if count else 0.0,
+            'p50_us': self._percentile(counts, 0.5),
+            'p99_us': self._percentile(counts, 0.99),
+            'max_us': round(longest * 1e6, 2),
+            'buckets': {f'<{1 << index}us': n for index, n in enumerate(counts) if n},
+        }
+
+    def clear(self):
+        with self._lock:
+            self._counts = [0] * len(self._counts)
+            self._total = 0.0
+            self._max = 0.0
+
+
+framing_stats = {
+    'decode': LatencyHistogram(), # JSON header + content to request/response, per message
+    'encode': LatencyHistogram(), # content to a framed message, per message
+}
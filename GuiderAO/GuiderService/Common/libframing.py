@@ -0,0 +1,60 @@
+# Framing helpers shared by libserver and libclient
+import struct
+
+
+class RecvBuffer:
+    """Growable receive buffer that sockets read straight into.
+
+    Data is received with ``socket.recv_into`` into a preallocated
+    ``bytearray``. Two offsets mark the unread region, so consuming the
+    protoheader, JSON header or content only moves an offset instead of
+    re-slicing everything after it. Unread bytes are moved back to the front
+    only when the tail runs out of room, and the buffer doubles when a message
+    does not fit at all.
+    """
+    def __init__(self, size=65536, min_free=4096):
+        self._buf = bytearray(size)
+        self._start = 0 # first unread byte
+        self._end = 0 # one past the last received byte
+        self._min_free = min_free # smallest space offered to a single recv
+
+    def __len__(self):
+        return self._end - self._start
+
+    def reserve(self, size):
+        """Make room to receive ``size`` more bytes without another resize."""
+        if len(self._buf) - self._end >= size:
+            return
+        unread = self._end - self._start
+        if len(self._buf) - unread >= size:
+            # enough room once the unread bytes move back to the front
+            self._buf[:unread] = self._buf[self._start:self._end]
+        else:
+            grown = bytearray(max(2 * len(self._buf), unread + size))
+            grown[:unread] = memoryview(self._buf)[self._start:self._end]
+            self._buf = grown
+        self._start, self._end = 0, unread
+
+    def recv_into(self, sock):
+        """Receive from ``sock`` into the free tail; returns bytes read (0 means peer closed)."""
+        self.reserve(self._min_free)
+        received = sock.recv_into(memoryview(self._buf)[self._end:])
+        self._end += received
+        return received
+
+    def unpack(self, fmt):
+        """Unpack a ``struct`` format from the front of the buffer and consume it."""
+        values = struct.unpack_from(fmt, self._buf, self._start)
+        self._advance(struct.calcsize(fmt))
+        return values
+
+    def take(self, size):
+        """Consume ``size`` bytes from the front of the buffer and return them."""
+        data = memoryview(self._buf)[self._start:self._start + size].tobytes()
+        self._advance(size)
+        return data
+
+    def _advance(self, size):
+        self._start += size
+        if self._start == self._end: # everything read, start over at the front
+            self._start = self._end = 0
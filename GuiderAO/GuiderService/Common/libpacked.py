@@ -0,0 +1,130 @@
+"""
+Packed binary content type for the high-rate guider messages
+
+A request or response sent with content-type ``binary/guider-packed`` (and
+content-encoding ``binary``) carries one fixed-layout struct instead of JSON.
+The first byte is the message kind. Only the hot messages have a packed
+form: action requests, guide pulses, status/calibration codes, star
+coordinates, errors and telemetry frames. Everything else is answered in
+JSON, so a client always checks the response's content-type.
+
+decode_* turn the structs back into the same dicts the JSON path uses, so the
+server dispatches packed and JSON requests alike.
+"""
+import math
+import struct
+
+CONTENT_TYPE = "binary/guider-packed"
+CONTENT_ENCODING = "binary"
+
+# action codes, append only, the index is the wire value
+ACTIONS = (
+    'initialize', 'star', 'track', 'stop', 'disconnect', 'status', 'calcode',
+    'starcoords', 'state', 'waitstats', 'subscribe', 'unsubscribe', 'ack', 'pulse',
+)
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+DIRECTIONS = ('north', 'south', 'east', 'west') # pulse directions, ASCOM GuideDirections order
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+
+# message kinds, the first byte of every packed message
+REQUEST = 1 # action, value
+PULSE = 2 # guide pulse request: direction, duration (ms)
+CODE = 3 # status or calibration code response: code, age
+COORDS = 4 # star coordinates response: x, y, age
+TELEMETRY = 5 # telemetry frame
+ERROR = 6 # "Error: ..." response, utf-8 text follows
+
+# big endian like the protoheader. Missing numbers travel as NaN, missing codes as -1.
+_request = struct.Struct(">BBd")
+_pulse = struct.Struct(">BBI")
+_code = struct.Struct(">Bhf")
+_coords = struct.Struct(">Bddf")
+_telemetry = struct.Struct(">BIdddddhfI")
+_kind = struct.Struct(">B")
+
+NAN = float("nan")
+
+
+def _num(value):
+    return NAN if value is None else value
+
+def _opt(value):
+    return None if math.isnan(value) else value
+
+
+# ---- requests ----
+def encode_request(request):
+    """Pack a {"action": ..., "value": ...} request. KeyError for actions without a code."""
+    action = request["action"]
+    value = request.get("value")
+    if action == "pulse":
+        return _pulse.pack(PULSE, DIRECTION_CODES[value["direction"]], int(value["duration"]))
+    if value == "" or value is None:
+        value = NAN
+    return _request.pack(REQUEST, ACTION_CODES[action], float(value))
+
+def decode_request(data):
+    """Unpack a request into the dict the JSON path would have decoded."""
+    kind = data[0]
+    if kind == PULSE:
+        _, direction, ms = _pulse.unpack(data)
+        return {"action": "pulse", "value": {"direction": DIRECTIONS[direction], "duration": ms}}
+    if kind != REQUEST:
+        raise ValueError(f"Unknown packed request kind {kind}.")
+    _, code, value = _request.unpack(data)
+    value = _opt(value)
+    return {"action": ACTIONS[code], "value": "" if value is None else value}
+
+
+# ---- responses ----
+def encode_response(action, content):
+    """Pack a response content dict for action, or None if it has no packed form."""
+    if "telemetry" in content:
+        frame = content["telemetry"]
+        centroid = frame["centroid"] or (None, None)
+        error = frame["error"] or (None, None)
+        status = frame["status"]
+        return _telemetry.pack(
+            TELEMETRY, frame["seq"], frame["time"],
+            _num(centroid[0]), _num(centroid[1]), _num(error[0]), _num(error[1]),
+            -1 if status is None else status, frame["age"], frame["coalesced"],
+        )
+    result = content.get("result")
+    if isinstance(result, str) and result.startswith("Error"):
+        return _kind.pack(ERROR) + result.encode("utf-8")
+    if action in ("status", "calcode"):
+        code = result["value"]
+        return _code.pack(CODE, -1 if code is None else code, result["age"])
+    if action == "starcoords":
+        coords = result["value"] or (None, None)
+        return _coords.pack(COORDS, _num(coords[0]), _num(coords[1]), result["age"])
+    if action == "star":
+        return _coords.pack(COORDS, _num(result[0]), _num(result[1]), NAN)
+    return None
+
+def decode_response(data):
+    """Unpack a response into the dict the JSON path would have decoded."""
+    kind = data[0]
+    if kind == CODE:
+        _, code, age = _code.unpack(data)
+        return {"result": {"value": None if code == -1 else code, "age": round(age, 3)}}
+    if kind == COORDS:
+        _, x, y, age = _coords.unpack(data)
+        value = None if math.isnan(x) else [x, y]
+        if math.isnan(age): # star answers with bare coordinates
+            return {"result": value}
+        return {"result": {"value": value, "age": round(age, 3)}}
+    if kind == TELEMETRY:
+        _, seq, stamp, cx, cy, ex, ey, status, age, coalesced = _telemetry.unpack(data)
+        return {"telemetry": {
+            "seq": seq,
+            "time": stamp,
+            "centroid": None if math.isnan(cx) else [cx, cy],
+            "error": None if math.isnan(ex) else [ex, ey],
+            "status": None if status == -1 else status,
+            "age": round(age, 3),
+            "coalesced": coalesced,
+        }}
+    if kind == ERROR:
+        return {"result": bytes(data[1:]).decode("utf-8")}
+    raise ValueError(f"Unknown packed response kind {kind}.")
@@ -1,9 +1,21 @@
 # ...
-import sys
+# Usage: python app-server.py <host> <port> [--selector] [--fake-camera] [--refresh SECONDS]
+#                             [--log-level LEVEL]
+# Serves with the asyncio engine (async_server.py) unless --selector is given,
+# which runs the original selectors loop below. --fake-camera stands in a
+# simulated camera for MaxIm DL, for testing and benchmarks.
+import argparse
 import socket
 import selectors # .select() to handle multiple connections simultaneously
-from libserver import Message # contains our message class
-import traceback
+import asyncio
+import logging
+import time
+from libserver import Message, logger # contains our message class
+import async_server
+import dispatcher
+import maxim_menu
+from maxim_worker import MaximWorker
+from fake_camera import FakeCCDCamera
 
 sel = selectors.DefaultSelector() # selector object
 
@@ -11,39 +23,100 @@ sel = selectors.DefaultSelector() # selector object
 
 def accept_wrapper(sock):
     conn, addr = sock.accept() # Should be ready to read
-    print(f'Accepted connection from addr: {addr}')
+    logger.info("Accepted connection from addr: %s", addr)
     conn.setblocking(False) # put socket into non-blocking mode
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # small session replies go out immediately
     message = Message(sel, conn, addr)
     sel.register(conn, selectors.EVENT_READ, data=message)
 
 
-host, port = sys.argv[1], int(sys.argv[2])
-lsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-lsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-lsock.bind((host, port))
-lsock.listen()
-print(f'Listening on host: {host}, port: {port}')
-lsock.setblocking(False) # calls made to this socket will no longer block
-# can wait for events on >=1 socket and then read + write data when its ready
-sel.register(lsock, selectors.EVENT_READ, data=None) # registering the object with lsock, want read events for listening socket
-
-try:
-    while True: #infinite loop
-        events = sel.select(timeout=None) # returns list of tuples which contain key and mask
-        for key, mask in events:
-            if key.data is None:
-                accept_wrapper(key.fileobj)
-            else:
-                message = key.data
-                try:
-                    message.process_events(mask)
-                except Exception:
-                    print(
-                        f'Main: Error: Exception for {message.addr}:\n'
-                        f'{traceback.format_exc()}'
-                    )
-                    message.close()
-except KeyboardInterrupt:
-    print("Caught keyboard interrupt, exiting")
-finally:
-    sel.close() 
\ No newline at end of file
+def push_telemetry():
+    """Queue the telemetry frames that are due, returns the select() timeout until the next."""
+    now = time.monotonic()
+    timeout = None
+    for key in list(sel.get_map().values()):
+        message = key.data
+        if message is None or message.subscription is None:
+            continue
+        delay = message.push_telemetry(now)
+        timeout = delay if timeout is None else min(timeout, delay)
+    return timeout
+
+
+def run_selector_server(host, port):
+    lsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    lsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    lsock.bind((host, port))
+    lsock.listen()
+    logger.info("Listening on host: %s, port: %s", host, port)
+    lsock.setblocking(False) # calls made to this socket will no longer block
+    # can wait for events on >=1 socket and then read + write data when its ready
+    sel.register(lsock, selectors.EVENT_READ, data=None) # registering the object with lsock, want read events for listening socket
+
+    timeout = None # wakes up for subscribers' telemetry frames, otherwise waits for sockets
+    try:
+        while True: #infinite loop
+            events = sel.select(timeout=timeout) # returns list of tuples which contain key and mask
+            for key, mask in events:
+                if key.data is None:
+                    accept_wrapper(key.fileobj)
+                else:
+                    message = key.data
+                    try:
+                        message.process_events(mask)
+                    except Exception:
+                        logger.exception("Main: Error: Exception for %s", message.addr)
+                        message.close()
+            timeout = push_telemetry()
+    except KeyboardInterrupt:
+        logger.info("Caught keyboard interrupt, exiting")
+    finally:
+        sel.close()
+
+
+def run_asyncio_server(host, port):
+    try:
+        asyncio.run(async_server.serve(host, port))
+    except KeyboardInterrupt:
+        logger.info("Caught keyboard interrupt, exiting")
+
+
+def pulse_axes(text): # --pulse-axes north=2,south=3,east=0,west=1
+    axes = {}
+    for pair in text.split(','):
+        direction, _, axis = pair.partition('=')
+        if direction not in maxim_menu.pulse_directions or axis not in ('0', '1', '2', '3'):
+            raise argparse.ArgumentTypeError(f'{pair!r} is not direction=0-3')
+        axes[direction] = int(axis)
+    return axes
+
+parser = argparse.ArgumentParser(description='Guider socket server')
+parser.add_argument('host')
+parser.add_argument('port', type=int)
+parser.add_argument('--selector', action='store_true', help='use the original selectors loop')
+parser.add_argument('--fake-camera', action='store_true', help='simulate the guider camera')
+parser.add_argument('--refresh', type=float, default=0.5, metavar='SECONDS',
+                    help='how often the cached guider state is sampled')
+parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                    help='DEBUG logs every message')
+parser.add_argument('--pulse-axes', type=pulse_axes, default={}, metavar='north=N,south=N,east=N,west=N',
+                    help='GuiderMove direction (0 +X, 1 -X, 2 +Y, 3 -Y) for each guide direction, '
+                         'checked against a calibration; without it pulses are refused')
+args = parser.parse_args()
+
+logging.basicConfig(level=args.log_level, format='%(asctime)s %(levelname)s %(message)s')
+maxim_menu.pulse_axes.update(args.pulse_axes)
+if not maxim_menu.pulse_axes:
+    logger.warning('No --pulse-axes, pulse actions will be refused')
+
+# the one thread that talks to MaxIm DL, it also keeps the cached state fresh
+dispatcher.cache.interval = args.refresh
+worker = MaximWorker(camera_factory=FakeCCDCamera if args.fake_camera else None,
+                     cache=dispatcher.cache)
+worker.start()
+dispatcher.set_worker(worker)
+
+if args.selector:
+    run_selector_server(args.host, args.port)
+else:
+    run_asyncio_server(args.host, args.port)
@@ -0,0 +1,128 @@
+# asyncio engine for the guider socket server
+# Speaks the same wire format as the selector loop in libserver.Message:
+# 2-byte protoheader + JSON header + content, with optional keep-alive sessions
+import asyncio
+import contextlib
+import logging
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import libserver
+from libserver import logger, framing_stats
+
+# Requests that wait on the MaxIm worker (maxim_worker.py) park a thread here
+# while they wait. The event loop stays free to read, parse and answer other
+# clients while a calibration or an exposure is in progress.
+request_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="request")
+
+
+async def read_message(reader):
+    """Read one framed message, returns (jsonheader, request)."""
+    hdr = await reader.readexactly(2)
+    jsonheader_len = struct.unpack(">H", hdr)[0]
+    data = await reader.readexactly(jsonheader_len)
+    start = time.perf_counter()
+    jsonheader = libserver.json_decode(data)
+    libserver.check_jsonheader(jsonheader)
+    decode_time = time.perf_counter() - start
+    data = await reader.readexactly(jsonheader["content-length"])
+    start = time.perf_counter()
+    if libserver.is_structured(jsonheader): # JSON or packed
+        request = libserver.decode_request(jsonheader, data)
+    else:
+        # Binary or unknown content type
+        request = data
+    framing_stats['decode'].record(decode_time + time.perf_counter() - start)
+    return jsonheader, request
+
+
+async def answer(jsonheader, request, writer):
+    """Build the response and send it back, off the event loop unless it is a fast read."""
+    if libserver.is_fast(jsonheader, request):
+        response = libserver.create_response(jsonheader, request)
+    else:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            request_executor, libserver.create_response, jsonheader, request
+        )
+    writer.write(response)
+    await writer.drain()
+
+
+async def stream(writer, subscription, acked):
+    """Push telemetry frames until cancelled. While the subscriber is behind,
+    the ticks missed are coalesced into the next frame. ``acked`` is set
+    whenever an ack arrives."""
+    try:
+        while True:
+            await asyncio.sleep(subscription.delay())
+            while subscription.behind:
+                acked.clear()
+                await acked.wait()
+            writer.write(libserver.create_stream_message(subscription))
+            await writer.drain()
+    except ConnectionError:
+        pass # subscriber went away, handle_connection cleans up
+
+
+async def handle_connection(reader, writer):
+    addr = writer.get_extra_info("peername")
+    logger.info("Accepted connection from addr: %s", addr)
+    pending = set() # session requests still being answered
+    streamer = None # task pushing this connection's telemetry
+    subscription = None
+    acked = asyncio.Event()
+    try:
+        while True:
+            try:
+                jsonheader, request = await read_message(reader)
+            except asyncio.IncompleteReadError:
+                break # client hung up
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received %s request %r from %s", jsonheader["content-type"], request, addr)
+            if jsonheader.get("keep-alive") and libserver.is_stream_action(jsonheader, request):
+                content, subscription = libserver.open_subscription(jsonheader, request, subscription)
+                if content is None: # an ack, the stream may go on
+                    acked.set()
+                    continue
+                writer.write(libserver.frame_response(jsonheader, request, content))
+                if streamer is not None:
+                    streamer.cancel()
+                    streamer = None
+                if subscription is not None:
+                    streamer = asyncio.create_task(stream(writer, subscription, acked))
+                continue
+            if not jsonheader.get("keep-alive"):
+                # one request per connection, the original protocol
+                await answer(jsonheader, request, writer)
+                break
+            # session requests are answered as soon as each one is ready, the
+            # request-id lets the client match responses that come back out of order
+            task = asyncio.create_task(answer(jsonheader, request, writer))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+    except Exception:
+        logger.exception("Main: Error: Exception for %s", addr)
+    finally:
+        if streamer is not None:
+            streamer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await streamer
+        for task in pending:
+            task.cancel()
+        logger.info("Closing connection to %s", addr)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+
+async def serve(host, port):
+    server = await asyncio.start_server(handle_connection, host, port, reuse_address=True)
+    logger.info("Listening on host: %s, port: %s", host, port)
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,170 @@
+"""
+Action dispatcher for the guider socket server
+
+Each action a client can send is registered here with the parser for its
+value and the handler that carries it out. Parameters are validated once,
+in dispatch(), before a handler runs. Handlers reach MaxIm DL only through
+the MaximWorker set with set_worker().
+
+Actions registered with fast=True are cheap reads answered from the
+guider_state.StateCache the worker keeps refreshed. They never touch COM, so
+the asyncio engine answers them straight on the event loop, unless the
+client's max staleness means waiting for a fresh sample.
+"""
+import maxim_menu
+from guider_state import StateCache
+from libcodec import framing_stats # Common is on sys.path through libserver
+
+worker = None # MaximWorker, set by app-server.py at startup
+cache = StateCache() # guider state read by the fast actions, refreshed by the worker
+
+def set_worker(wkr):
+    global worker
+    worker = wkr
+
+# longest a fast read waits for a fresh enough sample before giving up (s)
+fresh_timeout = 2.0
+max_pulse_ms = 10000 # longest guide pulse accepted
+
+
+class Action:
+    """A registered action: its handler, value parser, and whether it is a fast read."""
+    def __init__(self, name, handler, parse=None, fast=False):
+        self.name = name
+        self.handler = handler
+        self.parse = parse # turns the request value into the handler's argument
+        self.fast = fast
+
+actions = {}
+
+def register(name, parse=None, fast=False):
+    """Decorator that adds a handler to the action registry."""
+    def decorator(handler):
+        actions[name] = Action(name, handler, parse, fast)
+        return handler
+    return decorator
+
+
+# ---- value parsers ----
+def duration(value):
+    """Exposure duration in seconds, a positive number."""
+    seconds = float(value)
+    if not seconds > 0:
+        raise ValueError(f'duration must be positive, got {value!r}')
+    return seconds
+
+def pulse(value):
+    """Guide pulse as {"direction": "north"/"south"/"east"/"west", "duration": ms}."""
+    direction = value["direction"]
+    if direction not in maxim_menu.pulse_directions:
+        raise ValueError(f'unknown direction {direction!r}')
+    if direction not in maxim_menu.pulse_axes:
+        raise ValueError(f'no GuiderMove axis set for {direction!r}, start the server with --pulse-axes')
+    ms = int(value["duration"])
+    if not 0 < ms <= max_pulse_ms:
+        raise ValueError(f'duration must be 1 to {max_pulse_ms} ms, got {ms}')
+    return direction, ms
+
+def staleness(value):
+    """Oldest cached state the client will take in seconds, empty for any."""
+    if value is None or value == '':
+        return None
+    seconds = float(value)
+    if seconds < 0:
+        raise ValueError(f'max age must not be negative, got {value!r}')
+    return seconds
+
+
+# ---- dispatch ----
+def is_fast(request):
+    action = actions.get(request.get("action"))
+    if action is None or not action.fast:
+        return False
+    try: # a read that must wait for a fresher sample is not fast
+        return cache.is_fresh(staleness(request.get("value")))
+    except (TypeError, ValueError):
+        return True # dispatch() answers with the error straight away
+
+def dispatch(request):
+    """Run the action in a decoded JSON request and return the response content."""
+    name = request.get("action")
+    action = actions.get(name)
+    if action is None:
+        return {"result": f"Error: invalid action '{name}'."}
+    args = ()
+    if action.parse is not None:
+        try:
+            args = (action.parse(request.get("value")),)
+        except (TypeError, ValueError, KeyError) as ex:
+            return {"result": f"Error: bad value for '{name}': {ex}"}
+    try:
+        return {"result": action.handler(*args)}
+    except Exception as ex:
+        return {"result": f"Error: {name} failed: {ex}"}
+
+
+def _run(command, *args):
+    # blocks this request's thread until the worker has run the command,
+    # the worker refreshes the cache once it's done
+    return worker.submit(command, *args).result()
+
+def _cached(name, max_age):
+    reading = cache.read(name, max_age, fresh_timeout)
+    return {'value': reading.value, 'age': round(reading.age(), 3)}
+
+
+# ---- guider actions ----
+@register('initialize', parse=duration)
+def initialize(seconds): # start guider operations: set, then calibrate
+    if not _run('connect'):
+        raise RuntimeError('Guider not connected, check if plugged in')
+    return {'calcode': _run('calibrate', seconds)}
+
+@register('star', parse=duration)
+def star(seconds): # expose and find a guide star
+    return _run('expose', seconds)
+
+@register('track', parse=duration)
+def track(seconds):
+    return _run('track', seconds)
+
+@register('pulse', parse=pulse)
+def guide_pulse(value): # moves the mount through the guide relays
+    direction, ms = value
+    return _run('pulse', direction, ms / 1000)
+
+@register('stop')
+def stop():
+    return _run('stop')
+
+@register('disconnect')
+def disconnect():
+    return _run('disconnect')
+
+# ---- fast reads, answered from cached state ----
+# the value is the max staleness in seconds, answers carry the value's age
+@register('status', parse=staleness, fast=True)
+def status(max_age):
+    return _cached('status', max_age)
+
+@register('calcode', parse=staleness, fast=True)
+def calcode(max_age):
+    return _cached('calcode', max_age)
+
+@register('starcoords', parse=staleness, fast=True)
+def starcoords(max_age):
+    return _cached('starcoords', max_age)
+
+@register('state', parse=staleness, fast=True)
+def state(max_age): # every cached value at once
+    snapshot = cache.get(max_age, fresh_timeout)
+    return {name: {'value': reading.value, 'age': round(reading.age(), 3)}
+            for name, reading in zip(snapshot._fields, snapshot)}
+
+@register('waitstats', fast=True)
+def waitstats(): # measured guider waits, for tuning maxim_menu.settle_times
+    return maxim_menu.wait_stats.summary()
+
+@register('framing', fast=True)
+def framing(): # codec time per message, decode and encode histograms
+    return {name: histogram.summary() for name, histogram in framing_stats.items()}
@@ -0,0 +1,120 @@
+"""
+Stand-in for the MaxIm.CCDCamera COM object
+
+Implements the properties and methods maxim_menu.py uses, with guider
+operations that take simulated time. This lets the server, the COM worker
+and the benchmarks run on machines without MaxIm DL or a guider.
+"""
+import random
+import threading
+import time
+
+# MaxIm.CCDCamera.CameraStatus codes, see the table in GAO_README.md
+CS_IDLE = 2
+CS_EXPOSING = 3
+
+
+class FakeCCDCamera:
+    """Simulated MaxIm.CCDCamera.
+
+    ``time_scale`` multiplies every simulated duration, so 0.01 makes a 2 s
+    exposure finish in 20 ms. ``star`` is the guide star position reported
+    after an exposure with AutoSelectStar on. While tracking, the guider
+    error wanders by up to ``seeing`` pixels.
+    """
+    def __init__(self, time_scale=1.0, star=(320.5, 240.25), calibrate_seconds=10.0, seeing=0.5):
+        self._lock = threading.Lock()
+        self.time_scale = time_scale
+        self.star = star
+        self.calibrate_seconds = calibrate_seconds
+        self.seeing = seeing
+        self.LinkEnabled = False
+        self.AutoSelectStar = True
+        self.GuiderCalState = 0 # needs calibration
+        self.GuiderXStarPosition = 0.0
+        self.GuiderYStarPosition = 0.0
+        self._busy_until = 0.0 # monotonic time the current exposure/calibration ends
+        self._tracking = False
+        self._moving_until = 0.0 # monotonic time the current guide pulse ends
+        self._on_done = None # applied once the current operation finishes
+
+    # ---- state the scripts poll ----
+    @property
+    def GuiderRunning(self):
+        self._settle()
+        with self._lock:
+            return self._tracking or time.monotonic() < self._busy_until
+
+    @property
+    def GuiderMoving(self):
+        # only while a GuiderMove pulse is running, the fake mount never moves on its own
+        with self._lock:
+            return time.monotonic() < self._moving_until
+
+    @property
+    def GuiderXError(self):
+        return self._error()
+
+    @property
+    def GuiderYError(self):
+        return self._error()
+
+    @property
+    def CameraStatus(self):
+        return CS_EXPOSING if self.GuiderRunning else CS_IDLE
+
+    # ---- commands ----
+    def GuiderExpose(self, duration):
+        def found_star():
+            if self.AutoSelectStar:
+                self.GuiderXStarPosition, self.GuiderYStarPosition = self.star
+        self._start(duration, found_star)
+        return True
+
+    def GuiderCalibrate(self, duration):
+        self.GuiderCalState = 1 # calibrating
+        def calibrated():
+            self.GuiderCalState = 2
+        self._start(self.calibrate_seconds + duration, calibrated)
+        return True
+
+    def GuiderTrack(self, duration):
+        with self._lock:
+            self._tracking = True
+        return True
+
+    def GuiderMove(self, direction, duration):
+        with self._lock:
+            self._moving_until = time.monotonic() + duration * self.time_scale
+        return True
+
+    def GuiderStop(self):
+        with self._lock:
+            if self.GuiderCalState == 1: # a stopped calibration leaves the guider uncalibrated
+                self.GuiderCalState = 0
+            self._tracking = False
+            self._busy_until = 0.0
+            self._moving_until = 0.0
+            self._on_done = None
+        return True
+
+    def Quit(self):
+        self.GuiderStop()
+        self.LinkEnabled = False
+
+    def _error(self):
+        with self._lock:
+            tracking = self._tracking
+        return random.uniform(-self.seeing, self.seeing) if tracking else 0.0
+
+    def _start(self, seconds, on_done):
+        with self._lock:
+            self._busy_until = time.monotonic() + seconds * self.time_scale
+            self._on_done = on_done
+
+    def _settle(self):
+        with self._lock:
+            if self._on_done is None or time.monotonic() < self._busy_until:
+                return
+            on_done, self._on_done = self._on_done, None
+        on_done()
@@ -38,20 +38,50 @@ Commands:
 
 10. 'list' :prints the current list of operable commands to CLI
 
-11. 'quit' :closes the interface as well as MaxIm DL by letting the loop complete.
+11. 'waits' :prints how long each kind of guider wait has actually taken.
+    - Use it to tune maxim_menu.settle_times, the safety delays after each wait.
+
+12. 'quit' :closes the interface as well as MaxIm DL by letting the loop complete.
+
+The camera Object lives on a MaximWorker thread, which also samples the guider
+state every state_interval seconds in the background. 'status', 'calcode' and
+'starcoords' print that cached state with its age instead of waiting on MaxIm,
+and only wait for a new sample once it is older than max_age seconds.
 """
 import comtypes.client # windows package for COM connection
 import maxim_menu # the python library of operable commands
+from guider_state import StateCache
+from maxim_worker import MaximWorker
 from rich.console import Console
 from rich.markdown import Markdown
 
+state_interval = 0.5 # how often the guider state is sampled (s)
+max_age = 2.0 # oldest cached state status/calcode/starcoords will print (s)
+
 options = ['set', 'sever', 'expose', 'calibrate', 'calcode', 'stop', 'status', 'track', \
-           'starcoords', 'list', 'quit']
+           'starcoords', 'list', 'waits', 'quit']
 
 session = 1 # 1 means interface open, 0 means interface closed
-Object = None
 #the application Object is initialized, opening MaxIm DL
 app = comtypes.client.CreateObject("MaxIm.Application")
+#the camera Object is created and used on the worker thread only
+cache = StateCache(state_interval)
+worker = MaximWorker(cache = cache)
+worker.start()
+
+def run(command, *args): #runs a guider command on the worker and waits for it
+    try:
+        return worker.submit(command, *args).result()
+    except RuntimeError as ex:
+        print(ex)
+
+def show(name): #prints a cached guider value and how old it is
+    try:
+        reading = cache.read(name, max_age, timeout = 10)
+    except TimeoutError as ex:
+        print(ex)
+        return
+    print(f"{name}: {reading.value} ({reading.age():.2f}s ago)")
 
 #the session loop
 while session == 1:
@@ -59,45 +89,45 @@ while session == 1:
     command_string = input('Command?\n:') #must be typed lower case as one word
     match command_string:
         case "set": #establishes a maxim.ccdcamera Object
-            Object = maxim_menu.guider_connect()
+            run('connect')
             session = 1
             continue
         case "sever": #quits the camera Object, unsure if quits both
-            maxim_menu.guider_disconnect(Object)
+            run('disconnect')
             session = 1
             continue
         case "expose": #takes a guider exposure, will change when add normal expose
             duration = input('Duration in s? (float)\n:') #respond in float value
             duration = float(duration)
-            maxim_menu.guider_expose(duration, Object)
+            run('expose', duration)
             session = 1
             continue
         case "calibrate": #calibrates guider, dont think we'll have to add ccdcal
             duration = input('Duration in s? (float)\n:') #respond in float value
             duration = float(duration)
-            maxim_menu.guider_calibrate(Object, duration)
+            run('calibrate', duration)
             session = 1
             continue
         case "calcode": #returns the calibration code of the guider
-            maxim_menu.guider_calstate(Object) # refer to manual for codes 
+            show('calcode') # refer to manual for codes
             session = 1
             continue
         case "starcoords": #returns coords of guide star in photo
-            maxim_menu.guidestar_coords(Object)
+            show('starcoords')
             session = 1
             continue
         case "track": #tracks the currently selected guidestar
             duration = input('Duration in s? (float)\n:') # respond in float value
             duration = float(duration)
-            maxim_menu.guider_track(Object, duration)
+            run('track', duration)
             session = 1
             continue
         case "stop": #stops guider tracking, returns cam to idle
-            maxim_menu.guider_stop(Object)
+            run('stop')
             session = 1
             continue
         case "status": #checks status of the ccd camera
-            maxim_menu.cam_status(Object)
+            show('status')
             session = 1
             continue
         case "list": #returns list of operable commands to the command line
@@ -109,10 +139,18 @@ while session == 1:
                 console.print(md)
             session = 1
             continue
+        case "waits": #prints measured wait times so the settle delays can be tuned
+            for label, stats in maxim_menu.wait_stats.summary().items():
+                print(f"{label}: {stats['count']} waits, mean {stats['mean']:.3f}s, "
+                      f"p95 {stats['p95']:.3f}s, max {stats['max']:.3f}s, "
+                      f"{stats['timeouts']} timeouts, settle {maxim_menu.settle_times.get(label, 0)}s")
+            session = 1
+            continue
         case "quit": #quits the current session
             confirm_bool = input('Are you sure? Are all devices warm/shutdown? (y/n)\n:')
             match confirm_bool:
                 case 'y':
+                    worker.shutdown() # disconnects the camera Object
                     session = 0
                     break
                 case 'n':
@@ -0,0 +1,137 @@
+"""
+Cached guider state, refreshed in the background
+
+Reading CameraStatus, GuiderCalState, the guide star position, the guider
+error or LinkEnabled crosses the COM boundary, and a read queued on the MaxIm worker also waits
+behind whatever exposure or calibration is running. StateCache keeps the last
+sample of each of these as an immutable GuiderState. The MaxIm worker refreshes
+it every `interval` seconds, between commands and while it waits on the guider,
+so readers get the state in microseconds without going near COM.
+
+Each value is a Reading carrying the time it was sampled. A reader that needs
+fresher data passes max_age, which asks the worker for a new sample and waits
+for it (or raises StaleStateError).
+"""
+import threading
+import time
+from typing import Any, NamedTuple
+
+
+class Reading(NamedTuple):
+    value: Any
+    stamp: float # time.monotonic() when sampled, 0.0 if never
+
+    def age(self, now=None):
+        """Seconds since this value was sampled."""
+        return (time.monotonic() if now is None else now) - self.stamp
+
+
+class GuiderState(NamedTuple):
+    connected: Reading
+    status: Reading # CameraStatus
+    calcode: Reading # GuiderCalState
+    starcoords: Reading # (GuiderXStarPosition, GuiderYStarPosition)
+    error: Reading # (GuiderXError, GuiderYError), pixels
+
+    def oldest(self):
+        """Stamp of the least recently sampled value."""
+        return min(reading.stamp for reading in self)
+
+    def values(self):
+        """Plain dict of field -> value."""
+        return {name: reading.value for name, reading in zip(self._fields, self)}
+
+
+NEVER = GuiderState(
+    connected=Reading(False, 0.0),
+    status=Reading(None, 0.0),
+    calcode=Reading(None, 0.0),
+    starcoords=Reading(None, 0.0),
+    error=Reading(None, 0.0),
+)
+
+
+class StaleStateError(TimeoutError):
+    """No sample fresh enough arrived before the timeout."""
+
+
+class StateCache:
+    """The latest GuiderState, swapped whole on every refresh.
+
+    Args:
+        interval: seconds between background refreshes.
+    """
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.request_refresh = None # set by the refresher, asks it to sample now
+        self._state = NEVER
+        self._sampled = 0.0 # when the last full sample was published
+        self._wanted = False
+        self._cond = threading.Condition()
+
+    @property
+    def state(self):
+        """The current GuiderState, never blocks."""
+        return self._state
+
+    def publish(self, sample, stamp=None):
+        """Store new values from a dict, e.g. maxim_menu.guider_snapshot().
+
+        Fields missing from sample keep their old reading.
+        """
+        if stamp is None:
+            stamp = time.monotonic()
+        updates = {
+            name: Reading(sample[name], stamp)
+            for name in GuiderState._fields if name in sample
+        }
+        with self._cond:
+            self._state = self._state._replace(**updates)
+            self._sampled = stamp
+            self._wanted = False
+            self._cond.notify_all()
+
+    def due(self, now=None):
+        """True when the refresher should sample again."""
+        now = time.monotonic() if now is None else now
+        return self._wanted or now - self._sampled >= self.interval
+
+    def until_due(self, now=None):
+        """Seconds until the next refresh is due, 0.0 if it already is."""
+        if self._wanted:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._sampled + self.interval - now)
+
+    def get(self, max_age=None, timeout=None):
+        """The current GuiderState, no older than max_age seconds if given.
+
+        A stale state triggers a refresh and waits up to timeout seconds
+        (None waits as long as it takes) for it. max_age=0 always waits for
+        a new sample.
+        """
+        state = self._state
+        if max_age is None:
+            return state
+        cutoff = time.monotonic() - max_age # anything sampled before this is too old
+        if state.oldest() > cutoff:
+            return state
+        with self._cond:
+            if not self._wanted:
+                self._wanted = True
+                if self.request_refresh is not None:
+                    self.request_refresh()
+            if not self._cond.wait_for(lambda: self._state.oldest() > cutoff, timeout):
+                raise StaleStateError(f'guider state older than {max_age} s')
+            return self._state
+
+    def read(self, name, max_age=None, timeout=None):
+        """One field's Reading, no older than max_age seconds if given."""
+        reading = getattr(self._state, name)
+        if max_age is None or reading.age() < max_age:
+            return reading
+        return getattr(self.get(max_age, timeout), name)
+
+    def is_fresh(self, max_age=None):
+        """True when get(max_age) would return without waiting."""
+        return max_age is None or time.monotonic() - self._state.oldest() < max_age
@@ -1,29 +1,38 @@
 # Library for message class for socket communication
 # Used code based on https://realpython.com/python-sockets/
+import logging
 import selectors 
-import struct
-import json
-import io
+import os
 import sys
+import time
 
-# this is where we will import the guider interface
-request_search = {
-    "morpheus": "Follow the white rabbit. \U0001f430",
-    "ring": "In the caves beneath the Misty Mountains. \U0001f48d",
-    "\U0001f436": "\U0001f43e Playing ball! \U0001f3d0",
-}
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Common"))
+from libframing import RecvBuffer
+import libcodec
+from libcodec import json_encode, json_decode, framing_stats
+import libpacked
+
+import dispatcher # maps request actions to guider commands
+import telemetry # subscribe/unsubscribe streams
+
+# level set by app-server.py --log-level; per-message lines are DEBUG and are
+# not even formatted unless DEBUG is on
+logger = logging.getLogger("guider.server")
 
 class Message:
     def __init__(self, selector, sock, addr):
         self.selector = selector
         self.sock = sock
         self.addr = addr
-        self._recv_buffer = b""
-        self._send_buffer = b""
+        self._recv_buffer = RecvBuffer()
+        self._send_buffer = bytearray()
+        self._decode_time = 0.0 # codec time spent on the current message, for framing_stats
         self._jsonheader_len = None #state variable 
         self.jsonheader = None # state variable
         self.request = None # state variable
         self.response_created = False # state variable
+        self._session = False # set once the client asks to keep the connection open
+        self.subscription = None # telemetry.Subscription while the client is subscribed
         #...
     
     def process_events(self, mask):
@@ -34,17 +43,35 @@ class Message:
     
     def read(self):
         self._read()
+        if self.sock is None: # session ended by the client
+            return
 
-        if self._jsonheader_len is None: # check if we have unpacked the proto header
-            self.process_protoheader() # if no, lets do it
-        
-        if self._jsonheader_len is not None: # check if we have unpacked the proto header
-            if self.jsonheader is None: # if yes, have we unpacked the json header
-                self.process_jsonheader() # if no, lets do it
-            
-        if self.jsonheader: # check if we have unpacked the json header
-            if self.request is None: # if yes, have we started a response request
-                self.process_request() # if no, lets do it
+        # a session client may pipeline several requests into one recv, so keep
+        # unpacking messages until the buffer only holds a partial one
+        while True:
+            if self._jsonheader_len is None: # check if we have unpacked the proto header
+                self.process_protoheader() # if no, lets do it
+
+            if self._jsonheader_len is not None: # check if we have unpacked the proto header
+                if self.jsonheader is None: # if yes, have we unpacked the json header
+                    self.process_jsonheader() # if no, lets do it
+
+            if self.jsonheader: # check if we have unpacked the json header
+                if self.request is None: # if yes, have we started a response request
+                    self.process_request() # if no, lets do it
+
+            if self.request is None or not self._session:
+                break
+            # session requests are answered straight away and the state
+            # variables reset so the next message can be unpacked
+            if is_stream_action(self.jsonheader, self.request):
+                content, self.subscription = open_subscription(self.jsonheader, self.request, self.subscription)
+                if content is not None: # acks get no response
+                    self._send_buffer += frame_response(self.jsonheader, self.request, content)
+                self.response_created = True
+            else:
+                self.create_response()
+            self._reset_request()
     
     def write(self):
         if self.request:
@@ -53,82 +80,92 @@ class Message:
         
         self._write()
     
+    def push_telemetry(self, now):
+        """Queue the next telemetry frame if one is due, returns seconds until the next.
+
+        Nothing is queued while the subscriber is behind or earlier data is
+        still waiting to go out, those ticks are coalesced into the next frame.
+        """
+        delay = self.subscription.delay(now)
+        if delay or self.subscription.behind or self._send_buffer:
+            return delay or self.subscription.period
+        self._send_buffer += create_stream_message(self.subscription, now)
+        self._set_selector_events_mask("rw")
+        return self.subscription.delay(now)
+
     def close(self):
-        print(f"Closing connection to {self.addr}")
+        logger.info("Closing connection to %s", self.addr)
+        self.subscription = None
         try:
             self.selector.unregister(self.sock)
         except Exception as e:
-            print(
-                f"Error: selector.unregister() exception for "
-                f"{self.addr}: {e!r}"
-            )
+            logger.error("selector.unregister() exception for %s: %r", self.addr, e)
 
         try:
             self.sock.close()
         except OSError as e:
-            print(f"Error: socket.close() exception for {self.addr}: {e!r}")
+            logger.error("socket.close() exception for %s: %r", self.addr, e)
         finally:
             # Delete reference to socket object for garbage collection
             self.sock = None
+
+    def _reset_request(self):
+        """Clear the per-message state variables for the next request in a session."""
+        self._jsonheader_len = None
+        self.jsonheader = None
+        self.request = None
+        self.response_created = False
     
     def process_protoheader(self): # receiving and processing the first two bytes, the fixed length header
         hdrlen = 2 # 2-byte integer in network, or big endian, byte order | contains length of json header 
         if len(self._recv_buffer) >= hdrlen:
-            self._jsonheader_len = struct.unpack( # where we are storing the header length
-                ">H", self._recv_buffer[:hdrlen]
+            self._jsonheader_len = self._recv_buffer.unpack( # where we are storing the header length
+                ">H" # once done, it is consumed from the recv_buffer
             )[0]
-            self._recv_buffer = self._recv_buffer[hdrlen:] #once done, it is removed from the recv_buffer
     
     def process_jsonheader(self):
         hdrlen = self._jsonheader_len
         if len(self._recv_buffer) >= hdrlen:
-            self.jsonheader = self._json_decode( # using json package methods to decode + deserialize JSON hdr into dict
-                self._recv_buffer[:hdrlen], "utf-8" # JSON header is defined by Unicode w/ UTF-8 encoding
-            ) 
-            self._recv_buffer = self._recv_buffer[hdrlen:] # once done, it is removed from the recv_buffer
-            for reqhdr in (
-                "byteorder",
-                "content-length",
-                "content-type",
-                "content-encoding",
-            ): # sad face
-                if reqhdr not in self.jsonheader:
-                    raise ValueError(f'Missing required header "{reqhdr}".')
+            start = time.perf_counter()
+            self.jsonheader = json_decode( # deserialize JSON hdr into dict
+                self._recv_buffer.take(hdrlen) # JSON header is defined by Unicode w/ UTF-8 encoding
+            ) # once done, it is consumed from the recv_buffer
+            check_jsonheader(self.jsonheader)
+            self._decode_time = time.perf_counter() - start
+            if self.jsonheader.get("keep-alive"): # optional, client wants a session
+                self._session = True
+            # grow the buffer once up front for large content instead of per recv
+            self._recv_buffer.reserve(self.jsonheader["content-length"] - len(self._recv_buffer))
     
     def process_request(self):
         content_len = self.jsonheader["content-length"] # storing dictionary value 1/4
         if not len(self._recv_buffer) >= content_len:
             return
-        data = self._recv_buffer[:content_len] # message content -> data variable
-        self._recv_buffer = self._recv_buffer[content_len:] # empty recv_buffer
-        if self.jsonheader["content-type"] == "text/json": # check content encoding type
-            encoding = self.jsonheader["content-encoding"] 
-            self.request = self._json_decode(data, encoding) # changes self.request
-            #some logging that may not be important
-            print(f'Received request {self.request!r} from {self.addr}')
+        data = self._recv_buffer.take(content_len) # message content -> data variable
+        start = time.perf_counter()
+        if is_structured(self.jsonheader): # JSON or packed, both decode to a request dict
+            self.request = decode_request(self.jsonheader, data) # changes self.request
         else:
             # Binary or unknown content type
             self.request = data
-            print(
-                f'Received {self.jsonheader["content-type"]}'
-                f'request from {self.addr}'
-            )
-        # Set selector to listen for write events, we're done reading proto, hdr, and content
-        self._set_selector_events_mask("w")
+        framing_stats['decode'].record(self._decode_time + time.perf_counter() - start)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received %s request %r from %s",
+                         self.jsonheader["content-type"], self.request, self.addr)
+        if self._session:
+            # keep listening for the next request while this one is answered
+            self._set_selector_events_mask("rw")
+        else:
+            # Set selector to listen for write events, we're done reading proto, hdr, and content
+            self._set_selector_events_mask("w")
     
     def create_response(self):
-        if self.jsonheader["content-type"] == "text/json":
-            response = self._create_response_json_content()
-        else:
-            # Binary or unknown content type
-            response = self._create_response_binary_content()
-        message = self._create_message(**response)
+        message = create_response(self.jsonheader, self.request)
         self.response_created = True
         self._send_buffer += message 
 
     def _write(self):
         if self._send_buffer: # if the send buffer exists
-            print(f'Sending {self._send_buffer!r} to {self.addr}')
             try:
                 # Should be ready to write
                 sent = self.sock.send(self._send_buffer)
@@ -136,35 +173,38 @@ class Message:
                 # Resource temporarily unavailable (errno EWOULDBLOCK)
                 pass
             else:
-                self._send_buffer = self._send_buffer[sent:]
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sent %d of %d bytes to %s", sent, len(self._send_buffer), self.addr)
+                del self._send_buffer[:sent]
                 # Close when the buffer is drained. The response has been sent
-                print('yoooooooooo')
                 if sent and not self._send_buffer: # sent exists but no longer the buffer
-                    self.close()
+                    if self._session:
+                        self._set_selector_events_mask("r") # wait for the next request
+                    else:
+                        self.close()
+        elif self._session:
+            # nothing left to send, stop waking up for write events
+            self._set_selector_events_mask("r")
+
+    @property
+    def closed(self):
+        return self.sock is None
     
     def _read(self):
         try:
             # Should be ready to read
-            data = self.sock.recv(4096)
+            received = self._recv_buffer.recv_into(self.sock)
         except BlockingIOError:
             # Resource temporarily unavailable (errno EWOULDBLOCK)
             pass
         else:
-            if data:
-                self._recv_buffer += data
-            else:
-                raise RuntimeError("Peer closed.")
-    
-    def _json_encode(self, obj, encoding):
-        return json.dumps(obj, ensure_ascii=False).encode(encoding)
-
-    def _json_decode(self, json_bytes, encoding):
-        tiow = io.TextIOWrapper(
-            io.BytesIO(json_bytes), encoding=encoding, newline=""
-        )
-        obj = json.load(tiow)
-        tiow.close()
-        return obj
+            if received:
+                return
+            if self._session:
+                # the client hanging up ends a session, that is not an error
+                self.close()
+                return
+            raise RuntimeError("Peer closed.")
     
     def _set_selector_events_mask(self, mode):
         """Set selector to listen for events: mode is 'r', 'w', or 'rw'."""
@@ -177,62 +217,144 @@ class Message:
         else:
             raise ValueError(f"Invalid events mask mode {mode!r}.")
         self.selector.modify(self.sock, events, data=self)
-    
-    def _create_message(
-        self, *, content_bytes, content_type, content_encoding
-    ):
-        jsonheader = {
-            "byteorder": sys.byteorder,
-            "content-type": content_type,
-            "content-encoding": content_encoding,
-            "content-length": len(content_bytes),
+
+
+# The functions below know nothing about sockets or selectors, so the selector
+# Message above and the asyncio engine in async_server.py share them.
+# json_encode/json_decode come from Common/libcodec.py.
+
+STRUCTURED_TYPES = ("text/json", libpacked.CONTENT_TYPE) # content types that carry action requests
+
+def is_structured(jsonheader):
+    return jsonheader["content-type"] in STRUCTURED_TYPES
+
+def decode_request(jsonheader, data):
+    """Decode JSON or packed request content into a request dict."""
+    if jsonheader["content-type"] == libpacked.CONTENT_TYPE:
+        return libpacked.decode_request(data)
+    return json_decode(data, jsonheader["content-encoding"])
+
+def check_jsonheader(jsonheader):
+    for reqhdr in (
+        "byteorder",
+        "content-length",
+        "content-type",
+        "content-encoding",
+    ): # sad face
+        if reqhdr not in jsonheader:
+            raise ValueError(f'Missing required header "{reqhdr}".')
+
+def create_message(
+    *, content_bytes, content_type, content_encoding, request_id=None, stream=False
+):
+    return libcodec.encode_frame(
+        content_bytes, content_type, content_encoding, request_id=request_id, stream=stream
+    )
+
+def frame_response(jsonheader, request, content):
+    """Encode content as the response to request and frame it, ready to send."""
+    start = time.perf_counter()
+    message = create_message(
+        **encode_response(jsonheader, request, content), request_id=jsonheader.get("request-id")
+    )
+    framing_stats['encode'].record(time.perf_counter() - start)
+    return message
+
+def encode_response(jsonheader, request, content):
+    """Response for content, packed if the request was and the content has a packed form."""
+    if jsonheader["content-type"] == libpacked.CONTENT_TYPE:
+        content_bytes = libpacked.encode_response(request.get("action"), content)
+        if content_bytes is not None:
+            return {
+                "content_bytes": content_bytes,
+                "content_type": libpacked.CONTENT_TYPE,
+                "content_encoding": libpacked.CONTENT_ENCODING,
+            }
+    content_encoding = "utf-8"
+    return {
+        "content_bytes": json_encode(content, content_encoding),
+        "content_type": "text/json",
+        "content_encoding": content_encoding,
+    }
+
+def create_stream_message(subscription, now=None):
+    """Frame the next telemetry sample for a subscription."""
+    content = subscription.sample(now)
+    start = time.perf_counter()
+    if subscription.packed:
+        response = {
+            "content_bytes": libpacked.encode_response("subscribe", content),
+            "content_type": libpacked.CONTENT_TYPE,
+            "content_encoding": libpacked.CONTENT_ENCODING,
         }
-        jsonheader_bytes = self._json_encode(jsonheader, "utf-8")
-        message_hdr = struct.pack(">H", len(jsonheader_bytes))
-        message = message_hdr + jsonheader_bytes + content_bytes
-        return message
-
-    # this could be where we initialize the guider with just 'initialize'
-    def _create_response_json_content(self):
-        action = self.request.get("action")
-        if action == "search": # make this "initialize"
-            query = self.request.get("value")
-            answer = request_search.get(query) or f"No match for '{query}'."
-            content = {"result": answer}
-        elif action == "initialize": # start maximdl / guider operations
-            # python ./guider_interface.py
-            # command: set
-            # command: calibrate
-            pass
-        elif action == "star": # expose and find star
-            duration = self.request.get("value")
-            # command: expose (duration)
-            # command: starcoords
-        elif action == "disconnect": # disconnect guider and close maximdl
-            # command: sever
-            # disconnected: y
-            pass
-        elif action == "track":
-            duration = self.request.get("value")
-            # command: track (duration)
-        elif action == "stop":
-            # command: guiderstop
-            pass
-        else:
-            content = {"result": f"Error: invalid action '{action}'."}
-        content_encoding = "utf-8"
+    else:
         response = {
-            "content_bytes": self._json_encode(content, content_encoding),
+            "content_bytes": json_encode(content, "utf-8"),
             "content_type": "text/json",
-            "content_encoding": content_encoding,
+            "content_encoding": "utf-8",
         }
-        return response
+    message = create_message(**response, request_id=subscription.request_id, stream=True)
+    framing_stats['encode'].record(time.perf_counter() - start)
+    return message
 
-    def _create_response_binary_content(self):
-        response = {
-            "content_bytes": b"First 10 bytes of request: "
-            + self.request[:10],
-            "content_type": "binary/custom-server-binary-type",
-            "content_encoding": "binary",
-        }
-        return response
\ No newline at end of file
+def is_stream_action(jsonheader, request):
+    """True for subscribe/unsubscribe/ack, which the engines handle per connection."""
+    return (
+        is_structured(jsonheader)
+        and isinstance(request, dict)
+        and request.get("action") in ("subscribe", "unsubscribe", "ack")
+    )
+
+def open_subscription(jsonheader, request, current=None):
+    """Handle subscribe/unsubscribe/ack, returns (response content, Subscription or None).
+
+    ``current`` is the connection's subscription so far; a new subscribe
+    replaces it and unsubscribe ends it. An ack moves the current one's
+    window along and has no response content (None).
+    """
+    if not jsonheader.get("keep-alive"):
+        return {"result": "Error: subscribe needs a keep-alive session."}, None
+    action = request.get("action")
+    if action == "ack":
+        if current is not None:
+            try:
+                current.ack(request.get("value"))
+            except (TypeError, ValueError):
+                pass # a bad ack only leaves the window where it was
+        return None, current
+    if action == "unsubscribe":
+        return {"result": {"subscribed": None}}, None
+    try:
+        hz = telemetry.rate(request.get("value"))
+    except (TypeError, ValueError) as ex:
+        return {"result": f"Error: bad value for 'subscribe': {ex}"}, current
+    subscription = telemetry.Subscription(jsonheader.get("request-id"), hz, dispatcher.cache)
+    subscription.packed = jsonheader["content-type"] == libpacked.CONTENT_TYPE # frames go out as requested
+    return {"result": {"subscribed": hz, "window": subscription.window}}, subscription
+
+def create_response(jsonheader, request):
+    """Build the framed response for a decoded request. May block on MaxIm DL."""
+    if is_stream_action(jsonheader, request):
+        # reaches here outside a session only, where there is nothing to stream to
+        content, _ = open_subscription(jsonheader, request)
+    elif is_structured(jsonheader):
+        content = dispatcher.dispatch(request)
+    else:
+        # Binary or unknown content type
+        return create_message(
+            **_create_response_binary_content(request), request_id=jsonheader.get("request-id")
+        )
+    return frame_response(jsonheader, request, content)
+
+def is_fast(jsonheader, request):
+    """True for cheap reads that can be answered without waiting on MaxIm DL."""
+    return is_structured(jsonheader) and dispatcher.is_fast(request)
+
+def _create_response_binary_content(request):
+    response = {
+        "content_bytes": b"First 10 bytes of request: "
+        + request[:10],
+        "content_type": "binary/custom-server-binary-type",
+        "content_encoding": "binary",
+    }
+    return response
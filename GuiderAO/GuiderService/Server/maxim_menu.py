@@ -1,11 +1,117 @@
-import comtypes.client
 import time
+import threading
+from collections import deque
+try:
+    import comtypes.client # windows only, MaxIm DL is reached over COM
+except ImportError:
+    comtypes = None # lets the module load elsewhere, e.g. with fake_camera.py on Linux
 
-def guider_connect(): # creates the MaxIm.CCDCamera Object
-    Object = comtypes.client.CreateObject("MaxIm.CCDCamera")
-    time.sleep(.5) #extra time to be safe
+# ---- waiting on the guider ----
+# Polling starts fast so short operations return right away, then backs off
+# so long exposures and calibrations don't hammer COM.
+poll_min = 0.01 # first poll interval (s)
+poll_max = 0.25 # longest poll interval (s)
+poll_backoff = 1.5 # interval multiplier after each poll
+wait_timeout = None # longest any wait may take (s), None waits forever
+poll_hook = None # called between polls and during settle delays, the worker refreshes its cached state here
+
+# Safety delays after a wait finishes, in seconds. These were the hard-coded
+# "magical fix" sleeps; wait_stats shows how long the waits really take so
+# they can be tuned from data.
+settle_times = {
+    'create': 0.5, # after creating the camera object, before linking
+    'link': 0.5, # after linking, rohan's magical fix to making GuiderExpose work
+    'pre_expose': 0.5, # guider idle before GuiderExpose
+    'expose': 0.5, # exposure finished
+    'starcoords': 0.5, # before reading the guide star position
+    'calibrate': 5.0, # calibration finished, before reading GuiderCalState
+    'stop': 0.5, # longest time a stop may take to reach idle
+}
+
+class WaitStats:
+    """Records how long each kind of guider wait actually took."""
+    def __init__(self, keep = 1000):
+        self._lock = threading.Lock()
+        self._keep = keep
+        self._waits = {} # label -> deque of (seconds, polls, done)
+
+    def record(self, label, seconds, polls, done):
+        with self._lock:
+            self._waits.setdefault(label, deque(maxlen = self._keep)).append((seconds, polls, done))
+
+    def summary(self):
+        """Per label: count, timeouts, mean/p50/p95/max seconds and mean polls."""
+        with self._lock:
+            waits = {label: list(samples) for label, samples in self._waits.items()}
+        result = {}
+        for label, samples in waits.items():
+            seconds = sorted(sample[0] for sample in samples)
+            result[label] = {
+                'count': len(samples),
+                'timeouts': sum(1 for sample in samples if not sample[2]),
+                'mean': sum(seconds) / len(seconds),
+                'p50': seconds[len(seconds) // 2],
+                'p95': seconds[min(len(seconds) - 1, int(len(seconds) * 0.95))],
+                'max': seconds[-1],
+                'polls': sum(sample[1] for sample in samples) / len(samples),
+            }
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._waits.clear()
+
+wait_stats = WaitStats()
+
+def wait_until(condition, timeout = None, label = 'wait'): # polls condition() with backoff
+    # returns True as soon as condition() is true, False if timeout (s) runs out first
+    start = time.perf_counter()
+    interval = poll_min
+    polls = 0
+    while True:
+        polls += 1
+        if poll_hook is not None:
+            poll_hook()
+        if condition():
+            done = True
+            break
+        elapsed = time.perf_counter() - start
+        if timeout is not None and elapsed >= timeout:
+            done = False
+            break
+        time.sleep(interval if timeout is None else min(interval, timeout - elapsed))
+        interval = min(interval * poll_backoff, poll_max)
+    wait_stats.record(label, time.perf_counter() - start, polls, done)
+    return done
+
+def settle(label): # the safety delay configured for label
+    delay = settle_times.get(label, 0)
+    if delay and poll_hook is None:
+        time.sleep(delay)
+    elif delay:
+        end = time.perf_counter() + delay
+        while (left := end - time.perf_counter()) > 0:
+            poll_hook()
+            time.sleep(min(left, poll_max))
+
+def wait_idle(Object, label, timeout = None): # waits until the guider stops moving and running
+    if timeout is None:
+        timeout = wait_timeout
+    idle = wait_until(
+        lambda: not (Object.GuiderMoving == True or Object.GuiderRunning == True),
+        timeout, label)
+    if not idle:
+        raise TimeoutError(f'Guider still busy after {timeout}s ({label})')
+    settle(label)
+
+def guider_connect(Object = None): # creates the MaxIm.CCDCamera Object, or links a stand-in passed in
+    if Object is None:
+        if comtypes is None:
+            raise RuntimeError('comtypes is not installed, MaxIm DL needs Windows')
+        Object = comtypes.client.CreateObject("MaxIm.CCDCamera")
+    settle('create') #extra time to be safe
     Object.LinkEnabled = True
-    time.sleep(.5) #rohan's magical fix to making GuiderExpose work
+    settle('link') #rohan's magical fix to making GuiderExpose work
     #check link
     if Object.LinkEnabled != True:
         print('Guider not connected, check if plugged in')
@@ -32,10 +138,7 @@ def guider_expose(duration, Object, auto_select = True): # takes autoguider expo
     else:
         pass
     #check moving
-    while Object.GuiderMoving == True or Object.GuiderRunning == True:
-        time.sleep(1)
-        continue
-    time.sleep(.5) # rohan's magical fix to make GuiderExpose work
+    wait_idle(Object, 'pre_expose') # includes rohan's magical fix to make GuiderExpose work
 
     # will pick the brightest star in the sky, will normally be true
     if auto_select == False:
@@ -46,10 +149,7 @@ def guider_expose(duration, Object, auto_select = True): # takes autoguider expo
     
     print(f'Guider connected, exposing for {duration}s')
     Object.GuiderExpose(duration)
-    while Object.GuiderMoving == True or Object.GuiderRunning == True:
-        time.sleep(1)
-        continue
-    time.sleep(.5)
+    wait_idle(Object, 'expose')
 
     #also will print the chosen guide star (if one is found)
     #when the coords are (0.0,0.0) you can assume that no star was found
@@ -57,7 +157,6 @@ def guider_expose(duration, Object, auto_select = True): # takes autoguider expo
         print('Checking for guide star...')
         x = Object.GuiderXStarPosition # x position in image
         y = Object.GuiderYStarPosition # y position in image
-        time.sleep(0.5)
         print(f'Guide star coords: ({x},{y})')
         return Object
     else:
@@ -77,10 +176,7 @@ def guider_calibrate(Object, duration): # calibrates the guider
         case 0: # needs calibration
             print(f'Guider preparing to calibrate: {duration}s exposures')
             Object.GuiderCalibrate(duration)
-            while Object.GuiderMoving == True or Object.GuiderRunning == True:
-                time.sleep(1)
-                continue
-            time.sleep(5)
+            wait_idle(Object, 'calibrate')
             calcode_new = Object.GuiderCalState
             match calcode_new:
                 case 2:
@@ -94,10 +190,7 @@ def guider_calibrate(Object, duration): # calibrates the guider
                     return Object
         case 1: # is calibrating, dont know why this would be raised
             print('Guider currently calibrating')
-            while Object.GuiderMoving == True or Object.GuiderRunning == True:
-                time.sleep(1)
-                continue
-            time.sleep(5)
+            wait_idle(Object, 'calibrate')
             calcode_new = Object.GuiderCalState
             match calcode_new:
                 case 2:
@@ -139,11 +232,12 @@ def guider_stop(Object): #stops guider from completing current task
     else:
         pass
 
-    #Object.GuiderStop()
-    time.sleep(0.5)
+    Object.GuiderStop()
 
-    #check moving
-    if Object.GuiderRunning == True or Object.GuiderMoving == True:
+    #check moving, gives the guider up to settle_times['stop'] to go idle
+    if not wait_until(
+        lambda: not (Object.GuiderRunning == True or Object.GuiderMoving == True),
+        settle_times['stop'], 'stop'):
         print("Error: Guider still operating")
         return Object
     else:
@@ -159,9 +253,7 @@ def cam_status(Object): #gets status code for camera, decode table in scripting
     else:
         pass
     #check guider moving
-    while Object.GuiderMoving == True or Object.GuiderRunning == True:
-        time.sleep(1)
-        continue
+    wait_idle(Object, 'status')
 
     #check camera 1 status if it applies to the situation
     status = Object.CameraStatus
@@ -177,9 +269,7 @@ def guider_track(Object, duration): # initializes guidance of star w/ input expo
     else:
         pass
     #check moving
-    while Object.GuiderMoving == True or Object.GuiderRunning == True:
-        time.sleep(1)
-        continue
+    wait_idle(Object, 'track')
     
     x = Object.GuiderXStarPosition # x position in image
     y = Object.GuiderYStarPosition # y position in image
@@ -199,12 +289,44 @@ def guidestar_coords(Object): #just prints the guidestar coords in case one is c
     else:
         pass
     #check moving
-    while Object.GuiderMoving == True or Object.GuiderRunning == True:
-        time.sleep(1)
-        continue
-    time.sleep(0.5)
+    wait_idle(Object, 'starcoords')
     x = Object.GuiderXStarPosition # x position in image
     y = Object.GuiderYStarPosition # y position in image
-    time.sleep(0.5)
     print(f'Guide star coords: ({x},{y})')
-    return Object
\ No newline at end of file
+    return Object
+
+# Guide directions a pulse can ask for
+pulse_directions = ('north', 'south', 'east', 'west')
+# GuiderMove direction for each guide direction: 0 +X, 1 -X, 2 +Y, 3 -Y.
+# Which sky direction each relay moves depends on how the guider and the
+# mount are wired at SEO, and nobody has checked it yet, so none is set and
+# pulses are refused. Once a calibration has shown it, start the server with
+# e.g. --pulse-axes north=2,south=3,east=0,west=1
+pulse_axes = {}
+
+def guider_move(Object, direction, duration): # pulses the guide relays, duration in s
+    if direction not in pulse_axes: # never move an axis we only guessed
+        raise ValueError(f'no GuiderMove axis set for {direction!r}, see --pulse-axes')
+    #check link
+    if Object.LinkEnabled != True:
+        print('Guider not connected, check if plugged in')
+        Object.Quit()
+        return
+    else:
+        pass
+    Object.GuiderMove(pulse_axes[direction], duration) # returns right away, GuiderMoving until done
+    return Object
+
+def guider_snapshot(Object): #reads the guider state as it is right now, never waits
+    if Object is None: # no camera object, nothing is linked
+        return {'connected': False, 'status': None, 'calcode': None, 'starcoords': None,
+                'error': None, 'running': False, 'moving': False}
+    return {
+        'connected': Object.LinkEnabled == True,
+        'status': Object.CameraStatus,
+        'calcode': Object.GuiderCalState,
+        'starcoords': (Object.GuiderXStarPosition, Object.GuiderYStarPosition),
+        'error': (Object.GuiderXError, Object.GuiderYError), # last guide exposure, pixels
+        'running': Object.GuiderRunning == True,
+        'moving': Object.GuiderMoving == True,
+    }
@@ -0,0 +1,225 @@
+"""
+Single-owner worker thread for the MaxIm.CCDCamera COM object
+
+The functions in maxim_menu.py block while they wait on the guider, and a
+COM object may only be used from the thread that created it. MaximWorker
+owns the camera object on its own thread and runs guider commands from a
+queue one at a time. submit() returns a concurrent.futures.Future, and
+call() is the awaitable version for the asyncio server, so callers never
+block on MaxIm DL themselves.
+
+Given a guider_state.StateCache, the worker is also its refresher: it samples
+the guider whenever the cache is due, between commands and from inside the
+waits of a running command (maxim_menu.poll_hook), since only this thread may
+read the camera.
+"""
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import maxim_menu
+
+try:
+    import comtypes # windows only, each COM thread needs CoInitialize
+except ImportError:
+    comtypes = None
+
+# queued commands run in priority order, so a stop is not stuck behind
+# exposures that were queued before it (the running command still finishes)
+URGENT = 0
+NORMAL = 1
+
+# while refreshes keep failing (e.g. a dead COM link) warn at most this often
+REFRESH_WARN_INTERVAL = 60.0
+
+logger = logging.getLogger("guider.server")
+
+
+class MaximWorker(threading.Thread):
+    """Owns the guider camera object and runs maxim_menu commands from a queue.
+
+    Args:
+        camera_factory: callable returning an unlinked camera object, e.g.
+            fake_camera.FakeCCDCamera. None creates the real MaxIm.CCDCamera.
+        cache: optional guider_state.StateCache to keep refreshed.
+    """
+    def __init__(self, camera_factory=None, cache=None):
+        threading.Thread.__init__(self, name='MaxIm', daemon=True)
+        self.camera_factory = camera_factory
+        self.camera = None # only ever touched from the worker thread
+        self.cache = cache
+        self._refresh_failures = 0 # failed refreshes not warned about yet
+        self._refresh_warned = None # time.monotonic() of the last warning, None while refreshes work
+        if cache is not None:
+            cache.request_refresh = lambda: self.submit('refresh')
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count() # keeps FIFO order within a priority
+        self.commands = {
+            'connect': self._cmd_connect,
+            'disconnect': self._cmd_disconnect,
+            'expose': self._cmd_expose,
+            'calibrate': self._cmd_calibrate,
+            'track': self._cmd_track,
+            'stop': self._cmd_stop,
+            'starcoords': self._cmd_starcoords,
+            'status': self._cmd_status,
+            'calcode': self._cmd_calcode,
+            'pulse': self._cmd_pulse,
+            'snapshot': self._cmd_snapshot,
+            'refresh': self._cmd_refresh,
+        }
+
+    def submit(self, command, *args):
+        """Queue a guider command, returns a Future for its result."""
+        if command not in self.commands:
+            raise ValueError(f'Unknown guider command {command!r}')
+        future = Future()
+        priority = URGENT if command in ('stop', 'refresh') else NORMAL
+        self._queue.put((priority, next(self._seq), command, args, future))
+        return future
+
+    async def call(self, command, *args):
+        """Awaitable submit() for coroutines on the event loop."""
+        return await asyncio.wrap_future(self.submit(command, *args))
+
+    def shutdown(self, wait=True):
+        """Finish the queued commands, then stop the thread."""
+        self._queue.put((NORMAL, next(self._seq), None, (), None))
+        if wait:
+            self.join()
+
+    def run(self):
+        if comtypes is not None:
+            comtypes.CoInitialize()
+        if self.cache is not None:
+            maxim_menu.poll_hook = self._poll
+        try:
+            while True:
+                try:
+                    _, _, command, args, future = self._queue.get(timeout=self._idle_timeout())
+                except queue.Empty:
+                    self._refresh()
+                    continue
+                if command is None:
+                    break
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self.commands[command](*args))
+                except Exception as ex:
+                    future.set_exception(ex)
+                if self.cache is not None and command != 'refresh':
+                    self._refresh() # publish what the command changed
+        finally:
+            if maxim_menu.poll_hook == self._poll:
+                maxim_menu.poll_hook = None
+            if self.camera is not None:
+                maxim_menu.guider_disconnect(self.camera)
+                self.camera = None
+            if comtypes is not None:
+                comtypes.CoUninitialize()
+
+    # ---- cached state refresh, on the worker thread ----
+    def _idle_timeout(self):
+        if self.cache is None:
+            return None
+        return self.cache.until_due()
+
+    def _refresh(self):
+        if self.camera is None:
+            self.cache.publish(maxim_menu.guider_snapshot(None))
+            return
+        try:
+            self.cache.publish(maxim_menu.guider_snapshot(self.camera))
+        except Exception:
+            # leave the old readings in place, they age and max_age readers see it;
+            # publishing nothing only puts the next try an interval away
+            self.cache.publish({})
+            now = time.monotonic()
+            if self._refresh_warned is not None and now - self._refresh_warned < REFRESH_WARN_INTERVAL:
+                self._refresh_failures += 1
+                return
+            if self._refresh_warned is None:
+                logger.warning("Guider state refresh failed", exc_info=True)
+            else:
+                logger.warning("Guider state refresh still failing, %d more failures since the last warning",
+                               self._refresh_failures, exc_info=True)
+            self._refresh_failures = 0
+            self._refresh_warned = now
+            return
+        if self._refresh_warned is not None:
+            logger.info("Guider state refresh working again")
+            self._refresh_failures = 0
+            self._refresh_warned = None
+
+    def _poll(self):
+        # maxim_menu.poll_hook, called from inside waits; other threads' waits are not ours to sample
+        if threading.current_thread() is self and self.cache.due():
+            self._refresh()
+
+    # ---- commands, run on the worker thread ----
+    def _linked(self):
+        if self.camera is None:
+            raise RuntimeError("Guider not connected, send 'connect' first")
+        return self.camera
+
+    def _checked(self, result):
+        # maxim_menu quits the camera and returns None when the link is down
+        if result is None:
+            self.camera = None
+            raise RuntimeError('Guider not connected, check if plugged in')
+        return result
+
+    def _cmd_connect(self):
+        if self.camera is None:
+            camera = self.camera_factory() if self.camera_factory else None
+            self.camera = maxim_menu.guider_connect(camera)
+        return self.camera is not None
+
+    def _cmd_disconnect(self):
+        if self.camera is not None:
+            maxim_menu.guider_disconnect(self.camera)
+            self.camera = None
+        return True
+
+    def _cmd_expose(self, duration):
+        camera = self._checked(maxim_menu.guider_expose(duration, self._linked()))
+        return camera.GuiderXStarPosition, camera.GuiderYStarPosition
+
+    def _cmd_calibrate(self, duration):
+        camera = self._checked(maxim_menu.guider_calibrate(self._linked(), duration))
+        return camera.GuiderCalState
+
+    def _cmd_track(self, duration):
+        self._checked(maxim_menu.guider_track(self._linked(), duration))
+        return True
+
+    def _cmd_stop(self):
+        camera = self._checked(maxim_menu.guider_stop(self._linked()))
+        return not (camera.GuiderRunning or camera.GuiderMoving)
+
+    def _cmd_starcoords(self):
+        camera = self._checked(maxim_menu.guidestar_coords(self._linked()))
+        return camera.GuiderXStarPosition, camera.GuiderYStarPosition
+
+    def _cmd_status(self):
+        return self._checked(maxim_menu.cam_status(self._linked())).CameraStatus
+
+    def _cmd_calcode(self):
+        return self._checked(maxim_menu.guider_calstate(self._linked())).GuiderCalState
+
+    def _cmd_pulse(self, direction, duration):
+        self._checked(maxim_menu.guider_move(self._linked(), direction, duration))
+        return True
+
+    def _cmd_snapshot(self):
+        return maxim_menu.guider_snapshot(self.camera)
+
+    def _cmd_refresh(self):
+        if self.cache is not None:
+            self._refresh()
+        return True
@@ -0,0 +1,78 @@
+"""
+Guide star telemetry subscriptions
+
+A session client sends {"action": "subscribe", "value": <rate in Hz>} and the
+server pushes telemetry frames at that rate, each with the guide star centroid,
+guider error and camera status from the cached guider state (guider_state.py).
+Frames reuse the subscribe request's request-id and carry "stream": true in
+their JSON header. {"action": "unsubscribe"} ends the stream; each connection
+has at most one.
+
+A subscriber that reads slower than its rate is never queued up. It sends
+{"action": "ack", "value": <seq>} as it reads, which gets no response, and
+the server keeps at most `window` frames unacknowledged. Socket buffers alone
+would let a slow reader fall seconds behind. While the window is full no
+frames are made; the next one carries the latest state and counts the
+samples coalesced into it.
+"""
+import time
+
+max_rate = 50.0 # fastest a client may subscribe at (Hz), the cache refresh rate is the real limit
+window = 8 # frames a subscriber may have unacknowledged
+
+
+def rate(value):
+    """Subscription rate in Hz, above 0 and at most max_rate."""
+    hz = float(value)
+    if not 0 < hz <= max_rate:
+        raise ValueError(f'rate must be above 0 and at most {max_rate} Hz, got {value!r}')
+    return hz
+
+
+class Subscription:
+    """One client's telemetry stream: when the next frame is due and what goes in it."""
+    def __init__(self, request_id, hz, cache):
+        self.request_id = request_id
+        self.hz = hz
+        self.period = 1.0 / hz
+        self.cache = cache # guider_state.StateCache
+        self.next_due = time.monotonic()
+        self.seq = 0 # frames sent
+        self.acked = 0 # last frame the subscriber has read
+        self.window = window
+        self.coalesced = 0 # samples skipped because the subscriber was behind, in total
+        self.packed = False # frames in libpacked's binary form instead of JSON
+
+    def ack(self, seq):
+        """The subscriber has read every frame up to seq."""
+        self.acked = max(self.acked, min(int(seq), self.seq))
+
+    @property
+    def behind(self):
+        """True while the window is full, frames due meanwhile are coalesced."""
+        return self.seq - self.acked >= self.window
+
+    def delay(self, now=None):
+        """Seconds until the next frame is due, 0.0 if it already is."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.next_due - now)
+
+    def sample(self, now=None):
+        """Content of the next frame. Ticks missed since the last one are coalesced into it."""
+        now = time.monotonic() if now is None else now
+        if now > self.next_due:
+            missed = int((now - self.next_due) / self.period)
+            self.coalesced += missed
+            self.next_due += missed * self.period
+        self.next_due += self.period
+        self.seq += 1
+        state = self.cache.state
+        return {"telemetry": {
+            "seq": self.seq,
+            "time": time.time(),
+            "centroid": state.starcoords.value,
+            "error": state.error.value,
+            "status": state.status.value,
+            "age": round(now - state.oldest(), 3), # of the oldest value in the frame
+            "coalesced": self.coalesced,
+        }}
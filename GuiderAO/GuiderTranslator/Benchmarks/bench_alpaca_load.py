@@ -0,0 +1,83 @@
+"""
+Alpaca GET latency while long PulseGuides are in flight, per server engine.
+
+Starts the translator with each engine (standin.py), connects the telescope,
+keeps --pulses PulseGuide requests of --pulse-ms running, and meanwhile has
+--clients threads fire IsPulseGuiding/Name/Declination GETs back to back. With
+the 'simple' engine every GET waits behind the pulse being served.
+
+Usage: python bench_alpaca_load.py [--seconds S] [--pulses N] [--pulse-ms MS]
+                                   [--clients N] [engine ...]
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from standin import alpaca, free_port, start_translator, stop_translator
+
+GETS = ('ispulseguiding', 'name', 'declination')
+FAKE_TX = f'{sys.executable} {os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_tx.py")} where'
+
+
+def pulser(port, pulse_ms, stop):
+    direction = 0
+    while not stop.is_set():
+        alpaca(port, 'PUT', 'pulseguide', Direction=direction, Duration=pulse_ms)
+        direction = (direction + 1) % 4
+
+
+def getter(port, stop, latencies):
+    index = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        alpaca(port, 'GET', GETS[index % len(GETS)])
+        latencies.append(time.perf_counter() - start)
+        index += 1
+
+
+def run(engine, args):
+    port = free_port()
+    proc = start_translator(port, engine=engine, mount='tx', where_command=FAKE_TX)
+    try:
+        alpaca(port, 'PUT', 'connected', Connected='True')
+        stop = threading.Event()
+        latencies = []
+        with ThreadPoolExecutor(args.pulses + args.clients) as pool:
+            jobs = [pool.submit(pulser, port, args.pulse_ms, stop) for _ in range(args.pulses)]
+            time.sleep(0.05) # let the first pulse start
+            jobs += [pool.submit(getter, port, stop, latencies) for _ in range(args.clients)]
+            time.sleep(args.seconds)
+            stop.set()
+            for job in jobs:
+                job.result()
+    finally:
+        stop_translator(proc)
+    latencies.sort()
+    ms = [x * 1e3 for x in latencies]
+    print(f'{engine:<9} {len(ms):6d} GETs {len(ms) / args.seconds:8.1f}/s   '
+          f'mean {statistics.fmean(ms):8.2f} ms   p50 {ms[len(ms) // 2]:8.2f} ms   '
+          f'p99 {ms[int(len(ms) * 0.99)]:8.2f} ms   max {ms[-1]:8.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('engines', nargs='*', default=['simple', 'threaded', 'asgi'])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--pulses', type=int, default=1, help='PulseGuides kept in flight')
+    parser.add_argument('--pulse-ms', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=4, help='threads issuing GETs')
+    args = parser.parse_args()
+    for engine in args.engines:
+        if engine == 'asgi' and importlib.util.find_spec('uvicorn') is None:
+            print('asgi      skipped, uvicorn is not installed')
+            continue
+        run(engine, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Requests per second for capability GETs, hand-written responders vs the table.
+
+Builds two Falcon apps in this process around one connected TelescopeDevice:
+'classes' has responders written the way telescope.py used to have them (a
+class per endpoint building a PropertyResponse and json.dumps'ing it every
+time), 'table' has the ones responders.make_responders() generates from
+Property entries, where the constants are served from JSON templates. Each
+request is a WSGI call, so the numbers leave out the HTTP server and socket.
+
+Usage: python bench_capability_gets.py [--seconds S]
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import falcon  # noqa: E402
+from falcon import Request, Response, before  # noqa: E402
+from falcon.testing import create_environ  # noqa: E402
+
+import shr  # noqa: E402
+from exceptions import DriverException, NotConnectedException  # noqa: E402
+from responders import Property, make_responders  # noqa: E402
+from shr import PreProcessRequest, PropertyResponse  # noqa: E402
+from telescope_device import TelescopeDevice  # noqa: E402
+
+ENDPOINTS = {'canslew': 'can_slew', 'aperturearea': 'aperture_area', 'name': 'name',
+             'canpulseguide': 'can_pulse_guide', 'focallength': 'focal_length'}
+
+
+def hand_written(endpoint: str, attr: str, device):
+    """A responder class like the old telescope.py ones"""
+    @before(PreProcessRequest(0))
+    class responder:
+        def on_get(self, req: Request, resp: Response, devnum: int):
+            if not device.connected:
+                resp.text = PropertyResponse(None, req, NotConnectedException()).json
+                return
+            try:
+                val = getattr(device, attr)
+                resp.text = PropertyResponse(val, req).json
+            except Exception as ex:
+                resp.text = PropertyResponse(None, req,
+                                DriverException(0x500, f'Telescope.{endpoint.capitalize()} failed', ex)).json
+    return responder()
+
+
+def build_app(kind: str, device) -> falcon.App:
+    app = falcon.App()
+    if kind == 'classes':
+        responders = {name: hand_written(name, attr, device) for name, attr in ENDPOINTS.items()}
+    else:
+        table = [Property(name, attr, constant=True) for name, attr in ENDPOINTS.items()]
+        responders = make_responders(table, device, 'Telescope', PreProcessRequest(0))
+    for name, responder in responders.items():
+        app.add_route(f'/api/v1/telescope/{{devnum:int(min=0)}}/{name}', responder)
+    return app
+
+
+def run(app, seconds: float) -> tuple:
+    environs = [create_environ(f'/api/v1/telescope/0/{name}', query_string='ClientID=1&ClientTransactionID=7')
+                for name in ENDPOINTS]
+    bodies = set()
+
+    def start_response(status, headers):
+        pass
+
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for environ in environs:
+            env = dict(environ)
+            env['wsgi.input'] = io.BytesIO()
+            body = b''.join(app(env, start_response))
+            bodies.add(body.split(b',', 1)[1])   # drop ServerTransactionID
+        count += len(environs)
+    return count / (time.perf_counter() - start), bodies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    logger = logging.getLogger('bench')
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.INFO)           # Messages are still formatted as in the translator
+    logger.propagate = False
+    shr.set_shr_logger(logger)
+
+    device = TelescopeDevice(logger)
+    device.connected = True
+
+    results = {}
+    for kind in ('classes', 'table'):
+        rate, bodies = run(build_app(kind, device), args.seconds)
+        results[kind] = bodies
+        print(f'{kind:8s} {rate:10.0f} GETs/s')
+    print('same responses:', results['classes'] == results['table'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Property reads on TelescopeDevice from many threads at once.
+
+Each reader thread polls a mix of constants (can_slew, aperture_area,
+focal_length) and state (is_pulse_guiding, tracking) like MaxIm does, while
+one writer thread keeps changing the state. It compares the device as it is
+with the old pattern of taking the device lock for every read.
+
+Usage: python bench_device_contention.py [--seconds S] [threads ...]
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from telescope_device import TelescopeDevice  # noqa: E402
+
+
+class LockedDevice:
+    """The old pattern: every property takes the lock to return a field"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._can_slew = True
+        self._aperture_area = 0.196
+        self._focal_length = 2
+        self._is_pulse_guiding = False
+        self._tracking = True
+
+    def _get(self, name):
+        self._lock.acquire()
+        res = getattr(self, name)
+        self._lock.release()
+        return res
+
+    can_slew = property(lambda self: self._get('_can_slew'))
+    aperture_area = property(lambda self: self._get('_aperture_area'))
+    focal_length = property(lambda self: self._get('_focal_length'))
+    is_pulse_guiding = property(lambda self: self._get('_is_pulse_guiding'),
+                                lambda self, value: self._set('_is_pulse_guiding', value))
+    tracking = property(lambda self: self._get('_tracking'))
+
+    def _set(self, name, value):
+        self._lock.acquire()
+        setattr(self, name, value)
+        self._lock.release()
+
+
+def run(device, threads, seconds):
+    # Every thread checks the deadline itself. With dozens of busy threads the
+    # main thread can wait a long time for the GIL, so it can't be the one to stop them.
+    counts = [0] * threads
+    start = time.perf_counter()
+    deadline = start + seconds
+
+    def reader(index):
+        n = 0
+        while time.perf_counter() < deadline:
+            for _ in range(100):
+                device.can_slew, device.aperture_area, device.focal_length
+                device.is_pulse_guiding, device.tracking
+            n += 500
+        counts[index] = n
+
+    def writer():
+        flag = False
+        while time.perf_counter() < deadline:
+            flag = not flag
+            device.is_pulse_guiding = flag
+            time.sleep(0.0005)
+
+    workers = [threading.Thread(target=reader, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=writer))
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('threads', nargs='*', type=int, default=[1, 4, 16, 64])
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+    print(f'{"threads":>7} {"locked reads/s":>16} {"lock-free reads/s":>18}')
+    for threads in args.threads:
+        locked = run(LockedDevice(), threads, args.seconds)
+        free = run(TelescopeDevice(logging.getLogger('bench')), threads, args.seconds)
+        print(f'{threads:7d} {locked:16,.0f} {free:18,.0f}')
+
+
+if __name__ == '__main__':
+    main()
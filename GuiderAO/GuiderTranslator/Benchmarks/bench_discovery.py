@@ -0,0 +1,188 @@
+"""
+Floods the discovery responder with packets and times its replies.
+
+Runs each responder in a child process listening on a free UDP port instead
+of 32227, logging to a file at INFO as the translator does:
+
+  legacy - the old DiscoveryResponder: a blocking recvfrom() thread that
+           decodes and logs every packet and encodes the reply each time
+  loop   - discovery.DiscoveryResponder: selectors loop, replies encoded
+           once, first packet per client logged and the rest summarised
+
+For each it times --probes single request/reply round trips on a quiet
+responder, then floods it from --senders sockets for --seconds while a probe
+keeps timing round trips, and reports the replies per second, probes lost
+and the child's CPU time per request.
+
+Usage: python bench_discovery.py [--probes N] [--senders N] [--seconds S] [impl ...]
+"""
+import argparse
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+from pulse_timer import percentiles  # noqa: E402
+
+MESSAGE = b'alpacadiscovery1'
+
+
+class LegacyResponder(threading.Thread):
+    """The responder as it was, less the prints"""
+    def __init__(self, ADDR, PORT, discovery_port, logger):
+        threading.Thread.__init__(self, name='Discovery', daemon=True)
+        self.logger = logger
+        self.alpaca_response = "{\"AlpacaPort\": " + str(PORT) + "}"
+        self.rsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.rsock.bind((ADDR, discovery_port))
+        self.tsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.tsock.bind((ADDR, 0))
+        self.start()
+
+    def run(self):
+        while True:
+            data, addr = self.rsock.recvfrom(1024)
+            datascii = str(data, 'ascii')
+            self.logger.info(f'Disc rcv {datascii} from {str(addr)}')
+            if 'alpacadiscovery1' in datascii:
+                self.tsock.sendto(self.alpaca_response.encode(), addr)
+
+
+def serve(impl, discovery_port, logfile):
+    # Child process: run one responder until stdin closes
+    logger = logging.getLogger('discovery-bench')
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(logfile)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+    if impl == 'legacy':
+        LegacyResponder('127.0.0.1', 5555, discovery_port, logger)
+    else:
+        import discovery
+        discovery.logger = logger
+        responder = discovery.DiscoveryResponder('127.0.0.1', 5555, log_interval=1.0,
+                                                 discovery_port=discovery_port)
+    start = time.process_time()
+    print('ready', flush=True)
+    sys.stdin.readline()
+    print(time.process_time() - start, flush=True)
+    if impl != 'legacy':
+        print(responder.counts, file=sys.stderr)
+
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def probe(port, count, interval=0.0, stop=None):
+    # Round trip times in ns, and how many got no reply in 0.5 s
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.5)
+    times, lost = [], 0
+    for _ in range(count):
+        if stop is not None and stop.is_set():
+            break
+        start = time.perf_counter_ns()
+        sock.sendto(MESSAGE, ('127.0.0.1', port))
+        try:
+            sock.recvfrom(64)
+            times.append(time.perf_counter_ns() - start)
+        except socket.timeout:
+            lost += 1
+        time.sleep(interval)
+    sock.close()
+    return times, lost
+
+
+def flood(port, seconds, sent, replies):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.2)
+    end = time.monotonic() + seconds
+
+    def drain():
+        while True:
+            try:
+                sock.recvfrom(64)
+                replies.append(1)
+            except socket.timeout:
+                if time.monotonic() > end:
+                    return
+            except OSError:
+                return
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    n = 0
+    while time.monotonic() < end:
+        for _ in range(50):
+            try:
+                sock.sendto(MESSAGE, ('127.0.0.1', port))
+                n += 1
+            except OSError:
+                pass
+        time.sleep(0)
+    sent.append(n)
+    reader.join()
+    sock.close()
+
+
+def run(impl, args):
+    port = free_udp_port()
+    logfile = os.path.join(tempfile.mkdtemp(prefix='disc-bench-'), 'discovery.log')
+    child = subprocess.Popen([sys.executable, __file__, '--serve', impl, str(port), logfile],
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        assert child.stdout.readline().strip() == 'ready'
+        quiet, quiet_lost = probe(port, args.probes)
+
+        sent, replies = [], []
+        stop = threading.Event()
+        floods = [threading.Thread(target=flood, args=(port, args.seconds, sent, replies))
+                  for _ in range(args.senders)]
+        for t in floods:
+            t.start()
+        threading.Timer(args.seconds, stop.set).start()
+        busy, busy_lost = probe(port, 1_000_000, 0.005, stop)
+    finally:
+        for t in floods:
+            t.join()
+        stop.set()
+        out, err = child.communicate('\n', timeout=30)
+    cpu = float(out.split()[0])
+    requests = len(quiet) + quiet_lost + sum(sent)
+    q, b = percentiles(quiet), percentiles(busy) if busy else {}
+    print(f'{impl:7s} quiet rtt p50 {q["p50"] / 1000:6.1f} us p99 {q["p99"] / 1000:6.1f} us, lost {quiet_lost}')
+    print(f'{"":7s} flood {sum(sent) / args.seconds:8.0f} pkt/s sent, {len(replies) / args.seconds:8.0f} replies/s, '
+          f'probe rtt p50 {b.get("p50", 0) / 1000:7.1f} us p99 {b.get("p99", 0) / 1000:7.1f} us, '
+          f'lost {busy_lost}/{len(busy) + busy_lost}')
+    print(f'{"":7s} cpu {cpu:.2f} s, {cpu / max(1, len(replies) + len(quiet)) * 1e6:.1f} us per reply, '
+          f'log {os.path.getsize(logfile) / 1024:.0f} KiB for {requests} packets')
+    if err.strip():
+        print(f'{"":7s} {err.strip()}')
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        serve(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+        return
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--probes', type=int, default=2000)
+    parser.add_argument('--senders', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('impls', nargs='*', default=['legacy', 'loop'])
+    args = parser.parse_args()
+    for impl in args.impls:
+        run(impl, args)
+
+
+if __name__ == '__main__':
+    main()
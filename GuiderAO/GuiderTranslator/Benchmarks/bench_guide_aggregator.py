@@ -0,0 +1,80 @@
+"""
+Mount commands for a stream of guide pulses, one per pulse vs netted.
+
+Plays a MaxIm-like guide stream into a PulsePipeline: every --cycle seconds
+one RA and one Dec pulse of a small drift plus random seeing jitter, so
+successive pulses often point opposite ways. 'per-pulse' forwards each one
+with MountCommandSink, 'aggregated' nets them with GuideAggregator over
+--window seconds. Both run /bin/true as the mount command, so the cost of
+starting a process per command is real. Prints commands sent, pulses per
+command and the ms of correction asked for against the ms sent.
+
+Usage: python bench_guide_aggregator.py [--seconds S] [--cycle S] [--window S ...]
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pulse_sink import GuideAggregator, MountCommandSink, PulsePipeline  # noqa: E402
+
+TRUE = shutil.which('true') or '/bin/true'
+
+
+def guide_stream(pipeline, seconds: float, cycle: float, seed: int = 1):
+    """Submit the pulses, returns the net ms per axis asked for"""
+    rnd = random.Random(seed)
+    net = {'ra': 0, 'dec': 0}
+    deadline = time.monotonic() + seconds
+    next_cycle = time.monotonic()
+    while next_cycle < deadline:
+        for axis, positive, drift in (('ra', 2, 30), ('dec', 0, -10)):
+            correction = int(drift + rnd.gauss(0, 120))     # ms, + is N or E
+            pipeline.submit(positive if correction >= 0 else positive + 1, abs(correction))
+            net[axis] += correction
+        next_cycle += cycle
+        time.sleep(max(0.0, next_cycle - time.monotonic()))
+    return net
+
+
+def run(name, sink, logger, seconds, cycle):
+    pipeline = PulsePipeline([sink], logger)
+    start = time.perf_counter()
+    net = guide_stream(pipeline, seconds, cycle)
+    pipeline.close()
+    elapsed = time.perf_counter() - start
+    stats = pipeline.stats()
+    if isinstance(sink, GuideAggregator):
+        agg = stats['GuideAggregator']
+        commands, sent_ms, pulse_ms = agg['commands'], agg['sent_ms'], agg['pulse_ms']
+    else:
+        commands = stats['written'] - stats['errors']
+        sent_ms = pulse_ms = None
+    per = stats['submitted'] / commands if commands else 0
+    line = f'{name:18s} {stats["submitted"]:6d} pulses {commands:6d} commands {per:5.1f} per command'
+    if sent_ms is not None:
+        line += f', {pulse_ms} ms asked, {sent_ms} ms sent, {agg["cancelled"]} windows cancelled out'
+    print(line + f', net RA {net["ra"]} Dec {net["dec"]} ms, done after {elapsed:.2f} s')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--cycle', type=float, default=0.05, help='seconds between guide cycles')
+    parser.add_argument('windows', nargs='*', type=float, default=[0.25, 1.0])
+    args = parser.parse_args()
+    logger = logging.getLogger('bench')
+    logger.addHandler(logging.StreamHandler())
+
+    run('per-pulse', MountCommandSink(f'{TRUE} {{direction}} {{duration}}'), logger, args.seconds, args.cycle)
+    for window in args.windows:
+        aggregator = GuideAggregator(f'{TRUE} {{ra_ms}} {{dec_ms}}', logger, window=window, clamp_ms=2000)
+        run(f'aggregated {window:4.2f} s', aggregator, logger, args.seconds, args.cycle)
+
+
+if __name__ == '__main__':
+    main()
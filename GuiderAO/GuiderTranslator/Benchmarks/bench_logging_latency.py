@@ -0,0 +1,129 @@
+"""
+Alpaca request latency with the log written on the request thread vs queued.
+
+Serves GETs (mostly IsPulseGuiding, as MaxIm polls it, plus Tracking and
+Name) through a Falcon app in this process with three logging setups, all
+writing the same format to a file in a temp dir:
+
+  sync    - the file handler on the logger, as before: every request writes
+            and flushes its request and value lines itself
+  queued  - log.py's QueueHandler, a listener thread writes the file
+  sampled - queued, plus log.PollSampler on ispulseguiding
+
+--slow-ms makes each write to the file take that much longer, like a slow
+SD card, network share or virus scanner would.
+
+Usage: python bench_logging_latency.py [--requests N] [--slow-ms MS ...]
+"""
+import argparse
+import io
+import logging
+import logging.handlers
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import falcon  # noqa: E402
+from falcon.testing import create_environ  # noqa: E402
+
+import log  # noqa: E402
+import shr  # noqa: E402
+from responders import Property, make_responders  # noqa: E402
+from shr import PreProcessRequest  # noqa: E402
+from telescope_device import TelescopeDevice  # noqa: E402
+
+POLLS = ['ispulseguiding'] * 4 + ['tracking', 'name']
+
+
+class SlowFileHandler(logging.FileHandler):
+    """FileHandler whose every record takes slow_ms longer to write"""
+    def __init__(self, filename, slow_ms: float):
+        super().__init__(filename)
+        self.slow = slow_ms / 1000
+
+    def emit(self, record):
+        super().emit(record)
+        if self.slow:
+            time.sleep(self.slow)
+
+
+def setup_logging(kind: str, filename: str, slow_ms: float):
+    logger = logging.getLogger(f'bench-{kind}-{slow_ms}')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = SlowFileHandler(filename, slow_ms)
+    handler.setFormatter(logging.Formatter('%(asctime)s.%(msecs)03d %(levelname)s %(message)s',
+                                           '%Y-%m-%dT%H:%M:%S'))
+    listener = None
+    if kind == 'sync':
+        logger.addHandler(handler)
+    else:
+        records = queue.SimpleQueue()
+        queue_handler = log._QueueHandler(records)
+        logger.addHandler(queue_handler)
+        listener = logging.handlers.QueueListener(records, handler)
+        listener.start()
+    shr.sampler = log.PollSampler(['ispulseguiding'], 5.0) if kind == 'sampled' else None
+    shr.set_shr_logger(logger)
+    return logger, listener
+
+
+def build_app(device) -> falcon.App:
+    table = [Property('ispulseguiding', 'is_pulse_guiding'),
+             Property('tracking', 'tracking', field='Tracking', parse=shr.to_bool),
+             Property('name', 'name', constant=True)]
+    app = falcon.App()
+    for name, responder in make_responders(table, device, 'Telescope', PreProcessRequest(0)).items():
+        app.add_route(f'/api/v1/telescope/{{devnum:int(min=0)}}/{name}', responder)
+    return app
+
+
+def run(app, count: int) -> list:
+    environs = [create_environ(f'/api/v1/telescope/0/{name}', query_string='ClientID=1&ClientTransactionID=7')
+                for name in POLLS]
+
+    def start_response(status, headers):
+        pass
+
+    times = []
+    for i in range(count):
+        env = dict(environs[i % len(environs)])
+        env['wsgi.input'] = io.BytesIO()
+        start = time.perf_counter()
+        b''.join(app(env, start_response))
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('slow_ms', nargs='*', type=float, default=[0.0, 1.0])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-log-')
+    print(f'{"":16s} {"mean":>9s} {"p50":>9s} {"p99":>9s} {"lines":>7s}')
+    for slow_ms in args.slow_ms:
+        for kind in ('sync', 'queued', 'sampled'):
+            filename = os.path.join(workdir, f'{kind}-{slow_ms}.log')
+            logger, listener = setup_logging(kind, filename, slow_ms)
+            device = TelescopeDevice(logger)
+            device.connected = True
+            times = run(build_app(device), args.requests)
+            if listener is not None:
+                listener.stop()             # Writes what is still queued
+            for handler in logger.handlers:
+                handler.close()
+            with open(filename) as f:
+                lines = sum(1 for _ in f)
+            p99 = statistics.quantiles(times, n=100)[98]
+            print(f'{kind:8s}{slow_ms:5.1f} ms {statistics.mean(times) * 1e3:7.3f}ms '
+                  f'{statistics.median(times) * 1e3:7.3f}ms {p99 * 1e3:7.3f}ms {lines:7d}')
+
+
+if __name__ == '__main__':
+    main()
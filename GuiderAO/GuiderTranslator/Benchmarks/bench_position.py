@@ -0,0 +1,68 @@
+"""
+Mount position reads through mount_state.MountPositionProvider.
+
+Runs fake_tx.py as the where command and times a read that runs the command
+every time (interval 0, like the old altitude property), a cached read, and
+many threads reading together while the cache expires, which should cost
+one command run per interval rather than one per reader.
+
+Usage: python bench_position.py [--delay SECONDS] [--threads N] [--seconds S]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+from mount_state import MountPositionProvider  # noqa: E402
+
+FAKE_TX = f'{sys.executable} {os.path.join(HERE, "fake_tx.py")} where'
+
+
+def per_read(provider, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        provider.get()
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--delay', type=float, default=0.02, help='seconds fake_tx.py takes')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--interval', type=float, default=0.25)
+    args = parser.parse_args()
+    command = f'{FAKE_TX} {args.delay}'
+
+    uncached = per_read(MountPositionProvider(command, interval=0.0), 10)
+    provider = MountPositionProvider(command, interval=60.0)
+    provider.get()
+    cached = per_read(provider, 100000)
+    print(f'command per read   {uncached * 1e3:10.2f} ms')
+    print(f'cached read        {cached * 1e6:10.2f} us   {provider.get()}')
+
+    provider = MountPositionProvider(command, interval=args.interval)
+    stop = threading.Event()
+    reads = [0] * args.threads
+
+    def reader(index):
+        while not stop.is_set():
+            provider.get()
+            reads[index] += 1
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    print(f'{args.threads} threads, {args.seconds:.0f} s, interval {args.interval} s: '
+          f'{sum(reads)} reads, {provider.refreshes} command runs '
+          f'(at most {int(args.seconds / args.interval) + 1} expected)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Cost of handing a guide pulse to the pulse sink pipeline against the old
+open-and-append of output.txt per pulse, and what a slow sink does to the
+queue (coalesced and dropped pulses).
+
+Usage: python bench_pulse_sink.py [pulses]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pulse_sink import FileSink, PulsePipeline  # noqa: E402
+
+
+def append_per_pulse(filename, direction, duration):
+    # what the pulseguide responder did before
+    with open(filename, 'a') as file:
+        file.write(f'DIRECTION={direction}\tDURATION={duration}\n')
+
+
+class SlowSink:
+    """Stands in for a mount that takes `delay` seconds per batch"""
+    def __init__(self, delay):
+        self.delay = delay
+
+    def write(self, pulses):
+        time.sleep(self.delay)
+
+    def close(self):
+        pass
+
+
+def per_pulse(func, count):
+    start = time.perf_counter()
+    for index in range(count):
+        func(index % 4, 100 + index % 50)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logger = logging.getLogger('bench')
+    with tempfile.TemporaryDirectory() as tmp:
+        old = per_pulse(lambda d, ms: append_per_pulse(os.path.join(tmp, 'old.txt'), d, ms), count)
+        pipeline = PulsePipeline([FileSink(os.path.join(tmp, 'new.txt'))], logger, maxlen=count)
+        new = per_pulse(pipeline.submit, count)
+        pipeline.close()
+        with open(os.path.join(tmp, 'new.txt')) as f:
+            lines = sum(1 for _ in f)
+        print(f'open + append per pulse  {old * 1e6:8.2f} us')
+        print(f'pipeline submit          {new * 1e6:8.2f} us   ({lines} lines written)')
+
+    pipeline = PulsePipeline([SlowSink(0.05)], logger, maxlen=16, batch=4)
+    submit = per_pulse(pipeline.submit, 1000)
+    print(f'submit with a slow sink  {submit * 1e6:8.2f} us   {pipeline.stats()}')
+    pipeline.close(timeout=10)
+    print(f'after close              {pipeline.stats()}')
+
+
+if __name__ == '__main__':
+    main()
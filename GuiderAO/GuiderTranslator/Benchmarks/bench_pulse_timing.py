@@ -0,0 +1,98 @@
+"""
+How late guide pulses end: a threading.Timer per pulse vs PulseTimer.
+
+Starts --pulses pulses of random length between --min-ms and --max-ms, their
+starts spread over --spread seconds, and records for each how long after its
+requested end it was declared over. 'Timer' is the old way (one
+threading.Timer per pulse), 'PulseTimer' the sleep-then-spin thread in
+pulse_timer.py. --load adds threads doing Python work the whole time, like
+busy request threads competing for the GIL.
+
+Usage: python bench_pulse_timing.py [--pulses N] [--spread S] [--load N]
+                                    [--min-ms MS] [--max-ms MS] [--spin-ms MS]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from pulse_timer import PulseTimer, percentiles  # noqa: E402
+
+
+def run_timers(durations, offsets):
+    errors = []
+    lock = threading.Lock()
+    done = threading.Semaphore(0)
+
+    def end(end_ns):
+        late = time.perf_counter_ns() - end_ns
+        with lock:
+            errors.append(late)
+        done.release()
+
+    start = time.perf_counter()
+    for duration, offset in zip(durations, offsets):
+        time.sleep(max(0.0, start + offset - time.perf_counter()))
+        end_ns = time.perf_counter_ns() + int(duration * 1_000_000)
+        timer = threading.Timer(duration / 1000, end, (end_ns,))
+        timer.daemon = True
+        timer.start()
+    for _ in durations:
+        done.acquire()
+    return errors
+
+
+def run_pulse_timer(durations, offsets, spin_ms):
+    timer = PulseTimer(spin_ms, history=len(durations))
+    done = threading.Semaphore(0)
+    start = time.perf_counter()
+    for duration, offset in zip(durations, offsets):
+        time.sleep(max(0.0, start + offset - time.perf_counter()))
+        timer.start(duration, lambda pulse: done.release())
+    for _ in durations:
+        done.acquire()
+    errors = list(timer._errors)
+    timer.close()
+    return errors
+
+
+def busy(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(2000))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pulses', type=int, default=3000)
+    parser.add_argument('--spread', type=float, default=6.0)
+    parser.add_argument('--load', type=int, default=0)
+    parser.add_argument('--min-ms', type=float, default=10)
+    parser.add_argument('--max-ms', type=float, default=2000)
+    parser.add_argument('--spin-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    rnd = random.Random(1)
+    durations = [rnd.uniform(args.min_ms, args.max_ms) for _ in range(args.pulses)]
+    offsets = sorted(rnd.uniform(0, args.spread) for _ in range(args.pulses))
+
+    stop = threading.Event()
+    for _ in range(args.load):
+        threading.Thread(target=busy, args=(stop,), daemon=True).start()
+    print(f'{args.pulses} pulses of {args.min_ms:.0f}-{args.max_ms:.0f} ms, {args.load} busy threads; '
+          f'error = actual - requested end, us')
+    print(f'{"":11s} {"p50":>8s} {"p90":>8s} {"p99":>8s} {"max":>9s} {">1 ms":>7s}')
+    for name, run in (('Timer', lambda: run_timers(durations, offsets)),
+                      ('PulseTimer', lambda: run_pulse_timer(durations, offsets, args.spin_ms))):
+        errors = run()
+        p = percentiles(errors)
+        over = sum(1 for e in errors if e > 1_000_000) / len(errors)
+        print(f'{name:11s} {p["p50"] / 1000:8.1f} {p["p90"] / 1000:8.1f} {p["p99"] / 1000:8.1f} '
+              f'{p["max"] / 1000:9.1f} {over:7.1%}')
+    stop.set()
+
+
+if __name__ == '__main__':
+    main()
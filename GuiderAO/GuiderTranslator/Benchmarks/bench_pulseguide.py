@@ -0,0 +1,60 @@
+"""
+PulseGuide request latency against pulse length.
+
+For each pulse length this times the PulseGuide PUT, which should stay flat
+now that the pulse runs on a timer, and how long IsPulseGuiding stays true
+afterwards, which should match the pulse. It then starts an N and an E pulse
+together to show the two axes overlapping.
+
+Usage: python bench_pulseguide.py [--engine ENGINE] [--repeat N] [ms ...]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from standin import alpaca, free_port, start_translator, stop_translator
+
+
+def is_pulse_guiding(port):
+    return json.loads(alpaca(port, 'GET', 'ispulseguiding'))['Value']
+
+
+def pulse(port, direction, ms):
+    """Seconds the PUT took, and seconds until IsPulseGuiding went false (polled every 2 ms)."""
+    start = time.perf_counter()
+    alpaca(port, 'PUT', 'pulseguide', Direction=direction, Duration=ms)
+    returned = time.perf_counter() - start
+    while is_pulse_guiding(port):
+        time.sleep(0.002)
+    return returned, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('lengths', nargs='*', type=int, default=[0, 10, 100, 500, 2000])
+    parser.add_argument('--engine', default='threaded')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    port = free_port()
+    proc = start_translator(port, engine=args.engine)
+    try:
+        alpaca(port, 'PUT', 'connected', Connected='True')
+        print(f'{"pulse":>8} {"PUT returns":>14} {"pulse ends":>12}')
+        for ms in args.lengths:
+            runs = [pulse(port, index % 4, ms) for index in range(args.repeat)]
+            put = statistics.fmean(r[0] for r in runs)
+            ends = statistics.fmean(r[1] for r in runs)
+            print(f'{ms:6d}ms {put * 1e3:11.2f} ms {ends * 1e3:9.1f} ms')
+        start = time.perf_counter()
+        alpaca(port, 'PUT', 'pulseguide', Direction=0, Duration=300)
+        alpaca(port, 'PUT', 'pulseguide', Direction=2, Duration=300)
+        while is_pulse_guiding(port):
+            time.sleep(0.002)
+        print(f'N 300 ms + E 300 ms together: done after {(time.perf_counter() - start) * 1e3:.1f} ms')
+    finally:
+        stop_translator(proc)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Cost of the field lookups one Alpaca request makes, old scan vs parsed once.
+
+A GET looks up ClientID and ClientTransactionID in PreProcessRequest and
+ClientTransactionID again in PropertyResponse. A PulseGuide PUT also does
+the caseless pair, the exact-case ClientTransactionID in MethodResponse, and
+Direction and Duration in the responder. 'scan' is the old
+get_request_field (a case-folding pass over the parameters, or
+req.get_media(), for every lookup); 'parsed' is shr.get_request_field with
+the fields kept in req.context.fields. Only the lookups are timed, each on
+a fresh falcon Request, and then a single lookup on its own. --profile
+prints a cProfile of both for PUT.
+
+Usage: python bench_request_fields.py [--requests N] [--repeat N] [--profile]
+"""
+import argparse
+import cProfile
+import gc
+import io
+import os
+import pstats
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from falcon import HTTPBadRequest, Request  # noqa: E402
+from falcon.testing import create_environ  # noqa: E402
+
+import shr  # noqa: E402
+
+
+def scan_request_field(name: str, req: Request, caseless: bool = False, default: str = None) -> str:
+    """get_request_field as it was"""
+    lcName = name.lower()
+    if req.method == 'GET':
+        for param in req.params.items():
+            if param[0].lower() == lcName:
+                return param[1]
+        if default is None:
+            raise HTTPBadRequest()
+        return default
+    formdata = req.get_media()
+    if caseless:
+        for fn in formdata.keys():
+            if fn.lower() == lcName:
+                return formdata[fn]
+    else:
+        if name in formdata and formdata[name] != '':
+            return formdata[name]
+    if default is None:
+        raise HTTPBadRequest()
+    return default
+
+
+def get_lookups(get_field, req):
+    if get_field is shr.get_request_field:
+        shr.request_fields(req)             # As PreProcessRequest does first
+    get_field('ClientID', req, True)
+    get_field('ClientTransactionID', req, True)
+    get_field('ClientTransactionID', req, False, 0)
+
+
+def put_lookups(get_field, req):
+    if get_field is shr.get_request_field:
+        shr.request_fields(req)
+    get_field('ClientID', req, True)
+    get_field('ClientTransactionID', req, True)
+    get_field('Direction', req)
+    get_field('Duration', req)
+    get_field('ClientTransactionID', req, False, 0)
+
+
+def make_requests(method: str, count: int) -> list:
+    if method == 'GET':
+        return [Request(create_environ('/api/v1/telescope/0/ispulseguiding',
+                                       query_string='ClientID=1&ClientTransactionID=42'))
+                for _ in range(count)]
+    body = 'Direction=1&Duration=250&ClientID=1&ClientTransactionID=42'
+    return [Request(create_environ('/api/v1/telescope/0/pulseguide', method='PUT', body=body,
+                                   headers={'Content-Type': 'application/x-www-form-urlencoded'}))
+            for _ in range(count)]
+
+
+def time_lookups(get_field, lookups, method: str, count: int) -> float:
+    requests = make_requests(method, count)
+    gc.disable()        # As timeit does, or collecting the prepared requests swamps the lookups
+    start = time.perf_counter()
+    for req in requests:
+        lookups(get_field, req)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--profile', action='store_true')
+    args = parser.parse_args()
+
+    for method, lookups in (('GET', get_lookups), ('PUT', put_lookups)):
+        for kind, get_field in (('scan', scan_request_field), ('parsed', shr.get_request_field)):
+            per_request = min(time_lookups(get_field, lookups, method, args.requests)
+                              for _ in range(args.repeat))      # Best of, as timeit suggests
+            print(f'{method:4s} {kind:7s} {per_request * 1e6:7.2f} us per request')
+
+    # One lookup once the request's fields are there (params/form already parsed)
+    for method in ('GET', 'PUT'):
+        req = make_requests(method, 1)[0]
+        shr.request_fields(req)
+        for kind, get_field in (('scan', scan_request_field), ('parsed', shr.get_request_field)):
+            number = 100000
+            best = min(timeit.repeat(lambda: get_field('ClientTransactionID', req, True),
+                                     number=number, repeat=args.repeat))
+            print(f'{method:4s} {kind:7s} {best / number * 1e9:7.0f} ns per caseless lookup')
+
+    if args.profile:
+        for kind, get_field in (('scan', scan_request_field), ('parsed', shr.get_request_field)):
+            requests = make_requests('PUT', args.requests)
+            profile = cProfile.Profile()
+            profile.enable()
+            for req in requests:
+                put_lookups(get_field, req)
+            profile.disable()
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats('tottime').print_stats(8)
+            print(f'--- PUT {kind}')
+            print(out.getvalue())
+
+
+if __name__ == '__main__':
+    main()
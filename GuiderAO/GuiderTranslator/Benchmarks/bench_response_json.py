@@ -0,0 +1,124 @@
+"""
+PropertyResponse/MethodResponse throughput, old objects vs slotted ones.
+
+'old' is the response as it was: a plain object json.dumps'd through its
+__dict__, the ServerTransactionID bumped under a Lock and the value logged
+with an f-string whether INFO is on or not. 'slotted' is shr.PropertyResponse
+with the json module, 'orjson' the same with orjson (if installed). Each is
+run with the logger at INFO (records made, then thrown away) and at
+WARNING, and for a few typical values. 'json-log' is slotted with
+shr.record_fields on, as with [logging] format = 'json', where every value
+record also carries the remote/endpoint/value fields. Then threads take ServerTransactionIDs
+from the Lock counter and from shr.getNextTransId and check none repeat.
+
+Usage: python bench_response_json.py [--responses N] [--threads N]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from falcon import Request  # noqa: E402
+from falcon.testing import create_environ  # noqa: E402
+
+import shr  # noqa: E402
+from exceptions import Success  # noqa: E402
+
+VALUES = {'bool': True, 'float': 54.3125, 'string': 'SEO Telescope', 'rates': [0]}
+
+_lock = threading.Lock()
+_stid = 0
+
+
+def locked_trans_id() -> int:
+    global _stid
+    with _lock:
+        _stid += 1
+    return _stid
+
+
+class OldPropertyResponse:
+    """PropertyResponse as it was"""
+    def __init__(self, value, req, err=Success()):
+        self.ServerTransactionID = locked_trans_id()
+        self.ClientTransactionID = int(shr.get_request_field('ClientTransactionID', req, False, 0))
+        if err.Number == 0 and value is not None:
+            self.Value = value
+            shr.logger.info(f'{req.remote_addr} <- {str(value)}')
+        self.ErrorNumber = err.Number
+        self.ErrorMessage = err.Message
+
+    @property
+    def json(self) -> str:
+        return json.dumps(self.__dict__)
+
+
+def rate(response_class, value, req, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        response_class(value, req).json
+    return count / (time.perf_counter() - start)
+
+
+def trans_ids(next_id, threads: int, each: int) -> tuple:
+    """IDs/s taken by threads at once, and whether any were handed out twice"""
+    results = [None] * threads
+
+    def take(index):
+        results[index] = [next_id() for _ in range(each)]
+
+    workers = [threading.Thread(target=take, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    ids = [i for result in results for i in result]
+    return len(ids) / elapsed, len(set(ids)) != len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--responses', type=int, default=50000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    logger = logging.getLogger('bench')
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    shr.set_shr_logger(logger)
+
+    req = Request(create_environ('/api/v1/telescope/0/altitude', query_string='ClientID=1&ClientTransactionID=7'))
+    shr.request_fields(req)
+
+    fast_dumps = shr.dumps
+    kinds = [('old', OldPropertyResponse, json.dumps), ('slotted', shr.PropertyResponse, json.dumps)]
+    if shr.orjson is not None:
+        kinds.append(('orjson', shr.PropertyResponse, fast_dumps))
+    else:
+        print('orjson is not installed, skipping it')
+    kinds.append(('json-log', shr.PropertyResponse, json.dumps))
+
+    print(f'{"":8s}' + ''.join(f'{name:>12s}' for name in VALUES) + '   responses/s')
+    for level in (logging.INFO, logging.WARNING):
+        logger.setLevel(level)
+        for kind, response_class, dumps in kinds:
+            shr.dumps = dumps                   # response_json looks it up on every call
+            shr.record_fields = kind == 'json-log'
+            rates = [rate(response_class, value, req, args.responses) for value in VALUES.values()]
+            print(f'{kind:8s}' + ''.join(f'{r:12.0f}' for r in rates) + f'   logger at {logging.getLevelName(level)}')
+    shr.dumps = fast_dumps
+    shr.record_fields = False
+
+    for kind, next_id in (('Lock', locked_trans_id), ('count', shr.getNextTransId)):
+        per_second, repeated = trans_ids(next_id, args.threads, args.responses)
+        print(f'{kind:8s} {per_second:12.0f} IDs/s from {args.threads} threads, repeats: {repeated}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Slews through the Alpaca endpoint, with the simulated mount and with tx.
+
+Starts the translator (standin.py) with [device] mount = 'simulated' and
+then 'tx' with fake_tx.py standing in for tx (FAKE_TX_STATE keeps its mount
+between runs). For each it times SlewToCoordinatesAsync, polls Slewing and
+RightAscension the way a client does until the slew is over, and times
+the polls, then does a synchronous SlewToCoordinates and an AbortSlew in
+the middle of a slew.
+
+Usage: python bench_slew.py [--rate DEG_PER_S] [--poll-ms MS] [mount ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from standin import alpaca, free_port, start_translator, stop_translator
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FAKE_TX = f'{sys.executable} {os.path.join(HERE, "fake_tx.py")}'
+
+
+def value(port, name):
+    return json.loads(alpaca(port, 'GET', name)).get('Value')
+
+
+def timed(port, method, name, **fields):
+    start = time.perf_counter()
+    reply = json.loads(alpaca(port, method, name, **fields))
+    return time.perf_counter() - start, reply
+
+
+def slew_async(port, ra, dec, poll):
+    put, reply = timed(port, 'PUT', 'slewtocoordinatesasync', RightAscension=ra, Declination=dec)
+    assert reply['ErrorNumber'] == 0, reply
+    polls = []
+    start = time.perf_counter()
+    while True:
+        took, reply = timed(port, 'GET', 'slewing')
+        polls.append(took)
+        if not reply['Value']:
+            break
+        polls.append(timed(port, 'GET', 'rightascension')[0])
+        time.sleep(poll)
+    return put, time.perf_counter() - start, polls
+
+
+def run(mount, rate, poll):
+    settings = {'mount': mount, 'sim_slew_rate': rate, 'slew_poll': 0.1}
+    if mount == 'tx':
+        state = os.path.join(tempfile.mkdtemp(prefix='fake-tx-'), 'mount.json')
+        os.environ['FAKE_TX_STATE'] = state
+        os.environ['FAKE_TX_RATE'] = str(rate)
+        settings.update(where_command=f'{FAKE_TX} where', position_interval=0.1,
+                        slew_command=f'{FAKE_TX} point ra={{ra_hms}} dec={{dec_dms}}',
+                        sync_command=f'{FAKE_TX} sync ra={{ra_hms}} dec={{dec_dms}}',
+                        abort_command=f'{FAKE_TX} stop')
+    port = free_port()
+    proc = start_translator(port, **settings)
+    try:
+        alpaca(port, 'PUT', 'connected', Connected='True')
+        alpaca(port, 'PUT', 'synctocoordinates', RightAscension=2.0, Declination=10.0)
+        put, elapsed, polls = slew_async(port, 4.0, 40.0, poll)     # 30 degrees each way
+        expected = 30.0 / rate + value(port, 'slewsettletime')
+        print(f'{mount:9s} async PUT {put * 1e3:6.1f} ms, slew over after {elapsed:5.2f} s '
+              f'(expected {expected:4.2f} s), {len(polls)} polls median {statistics.median(polls) * 1e3:5.1f} ms '
+              f'max {max(polls) * 1e3:5.1f} ms')
+        print(f'{"":9s} now at RA {value(port, "rightascension"):.4f} Dec {value(port, "declination"):.4f}, '
+              f'target {value(port, "targetrightascension")} {value(port, "targetdeclination")}')
+        took, reply = timed(port, 'PUT', 'slewtocoordinates', RightAscension=3.0, Declination=25.0)
+        print(f'{"":9s} sync slew of 15 degrees took {took:5.2f} s, error {reply["ErrorNumber"]}')
+        alpaca(port, 'PUT', 'slewtocoordinatesasync', RightAscension=6.0, Declination=80.0)
+        threading.Event().wait(0.5)
+        took, reply = timed(port, 'PUT', 'abortslew')
+        state = json.loads(json.loads(alpaca(port, 'PUT', 'action', Action='slewstate'))['Value'])
+        print(f'{"":9s} abort took {took * 1e3:5.1f} ms, slewing {value(port, "slewing")}, state {state["state"]}, '
+              f'stopped at Dec {value(port, "declination"):.2f}')
+    finally:
+        stop_translator(proc)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rate', type=float, default=10.0, help='slew rate, degrees per second')
+    parser.add_argument('--poll-ms', type=float, default=50.0, help='time between client polls')
+    parser.add_argument('mounts', nargs='*', default=['simulated', 'tx'])
+    args = parser.parse_args()
+    for mount in args.mounts:
+        run(mount, args.rate, args.poll_ms / 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+How long after a (re)start the translator answers Alpaca requests.
+
+Copies a translator tree to a temp dir (as standin.py does), starts app.py
+and polls GET /management/apiversions every 2 ms from the moment the
+process is spawned, then does a device GET. This includes Python's own
+startup, which --profile-startup can't see. --tree runs another copy of
+the translator, e.g. an older commit from `git archive`, to compare.
+
+Usage: python bench_startup.py [--runs N] [--engine ENGINE] [--tree DIR ...]
+"""
+import argparse
+import glob
+import http.client
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from standin import TRANSLATOR, free_port
+
+
+def get(port, uri) -> int:
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        conn.request('GET', uri)
+        return conn.getresponse().status
+    finally:
+        conn.close()
+
+
+def start_once(tree, engine):
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix='translator-')
+    for path in glob.glob(os.path.join(tree, '*.py')) + [os.path.join(tree, 'config.toml')]:
+        shutil.copy(path, workdir)
+    config_path = os.path.join(workdir, 'config.toml')
+    with open(config_path) as f:
+        config = f.read()
+    config = config.replace('port = 5555', f'port = {port}').replace("ip_address = ''", "ip_address = '127.0.0.1'")
+    config = config.replace("engine = 'threaded'", f"engine = '{engine}'")
+    with open(config_path, 'w') as f:
+        f.write(config)
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, 'app.py'], cwd=workdir,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                if get(port, '/management/apiversions') == 200:
+                    break
+            except OSError:
+                if proc.poll() is not None or time.perf_counter() - start > 15:
+                    raise RuntimeError(f'{tree} did not start')
+                time.sleep(0.002)
+        first = time.perf_counter() - start
+        get(port, '/api/v1/telescope/0/connected')
+        device = time.perf_counter() - start
+        return first, device
+    finally:
+        proc.terminate()
+        proc.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--engine', default='threaded')
+    parser.add_argument('--tree', action='append', default=[], help='translator dir, default this one')
+    args = parser.parse_args()
+    for tree in args.tree or [TRANSLATOR]:
+        runs = [start_once(tree, args.engine) for _ in range(args.runs)]
+        first = [r[0] * 1000 for r in runs]
+        device = [r[1] * 1000 for r in runs]
+        print(f'{os.path.abspath(tree)}: first answer median {statistics.median(first):6.1f} ms '
+              f'(min {min(first):6.1f}, max {max(first):6.1f}), first device GET {statistics.median(device):6.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
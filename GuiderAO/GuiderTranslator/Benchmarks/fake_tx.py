@@ -0,0 +1,71 @@
+"""Stand-in for the mount's 'tx' command.
+
+Usage: python fake_tx.py where [delay seconds]
+       python fake_tx.py point ra=<h:m:s> dec=<d:m:s>
+       python fake_tx.py sync ra=<h:m:s> dec=<d:m:s>
+       python fake_tx.py stop
+
+'where' prints a mount position in tx's key=value form. Without a state file
+it is always the same one. With FAKE_TX_STATE set to a file name, 'point'
+starts a slew there at FAKE_TX_RATE degrees per second (default 3), 'sync'
+and 'stop' set the position, and 'where' reports the slew as it goes.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from mount import SimulatedMount, dms, hms  # noqa: E402
+from mount_state import _number  # noqa: E402
+
+STATE = os.environ.get('FAKE_TX_STATE')
+RATE = float(os.environ.get('FAKE_TX_RATE', '3.0'))
+
+
+def load() -> SimulatedMount:
+    # The mount as it was left, with its clock carried over to this process
+    mount = SimulatedMount(RATE, 5.575539, 22.014500)
+    if STATE and os.path.exists(STATE):
+        with open(STATE) as f:
+            saved = json.load(f)
+        mount._start, mount._target = tuple(saved['start']), tuple(saved['target'])
+        mount._duration = saved['duration']
+        mount._started = time.monotonic() - (time.time() - saved['started'])
+    return mount
+
+
+def save(mount: SimulatedMount):
+    with open(STATE, 'w') as f:
+        json.dump({'start': mount._start, 'target': mount._target, 'duration': mount._duration,
+                   'started': time.time() - (time.monotonic() - mount._started)}, f)
+
+
+def coordinates(args) -> tuple:
+    words = dict(arg.split('=', 1) for arg in args)
+    return _number(words['ra']), _number(words['dec'])
+
+
+if __name__ == '__main__':
+    command = sys.argv[1]
+    if command == 'where':
+        time.sleep(float(sys.argv[2]) if len(sys.argv) > 2 else 0.0)  # the real command talks to the mount
+        if not STATE:
+            print('done where ra=05:34:31.94 dec=+22:00:52.2 equinox=2000.000 ha=-01:12:03.5 '
+                  'secz=1.231 alt=54.312 az=123.405 slewing=0')
+        else:
+            position = load().status()
+            print(f'done where ra={hms(position.right_ascension)} dec={dms(position.declination)} '
+                  f'equinox=2000.000 alt=54.312 az=123.405 slewing={int(position.slewing)}')
+    elif command in ('point', 'sync', 'stop') and STATE:
+        mount = load()
+        if command == 'point':
+            mount.slew(*coordinates(sys.argv[2:]))
+        elif command == 'sync':
+            mount.sync(*coordinates(sys.argv[2:]))
+        else:
+            mount.abort()
+        save(mount)
+        print(f'done {command}')
+    else:
+        sys.exit(f'fake_tx: {command} needs FAKE_TX_STATE' if STATE is None else f'fake_tx: bad command {command}')
@@ -0,0 +1,72 @@
+"""Start the translator (app.py) on localhost from a scratch copy, so the benchmarks can pick its config."""
+import glob
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TRANSLATOR = os.path.join(HERE, '..')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_translator(port, **settings):
+    """Copy the translator to a temp dir, set [network] port and the given settings
+    (any section) in its config.toml, run it and wait until it accepts.
+
+    The logs end up in the temp dir, not the repo.
+    """
+    workdir = tempfile.mkdtemp(prefix='translator-')
+    for path in glob.glob(os.path.join(TRANSLATOR, '*.py')) + [os.path.join(TRANSLATOR, 'config.toml')]:
+        shutil.copy(path, workdir)
+    config_path = os.path.join(workdir, 'config.toml')
+    with open(config_path) as f:
+        config = f.read()
+    config = re.sub(r'(?m)^port = .*$', f'port = {port}', config)
+    config = re.sub(r"(?m)^ip_address = .*$", "ip_address = '127.0.0.1'", config)
+    for key, value in settings.items():
+        config = re.sub(rf'(?m)^{key} = .*$', f'{key} = {value!r}', config)
+    with open(config_path, 'w') as f:
+        f.write(config)
+    proc = subprocess.Popen([sys.executable, 'app.py'], cwd=workdir,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    proc.workdir = workdir
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    stop_translator(proc)
+    raise RuntimeError('translator did not start')
+
+
+def stop_translator(proc):
+    proc.terminate()
+    proc.wait()
+    shutil.rmtree(proc.workdir, ignore_errors=True)
+
+
+def alpaca(port, method, name, timeout=30, **fields):
+    """One Alpaca request to telescope 0, returns the decoded JSON response."""
+    fields = {'ClientID': 1, 'ClientTransactionID': 1, **fields}
+    url = f'http://127.0.0.1:{port}/api/v1/telescope/0/{name}'
+    data = urllib.parse.urlencode(fields)
+    if method == 'GET':
+        request = urllib.request.Request(f'{url}?{data}')
+    else:
+        request = urllib.request.Request(url, data=data.encode(), method=method)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
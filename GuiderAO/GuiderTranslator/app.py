@@ -52,16 +52,20 @@
 # 23-May-2023   rbd 0.2 Refactoring for  multiple ASCOM device type support
 #               GitHub issue #1
 #
+from startup import profile     # First, so the imports are timed too (python app.py --profile-startup)
 import sys
+import threading
 import traceback
-import inspect
-from wsgiref.simple_server import WSGIRequestHandler, make_server
+from wsgiref.simple_server import WSGIRequestHandler
+profile.mark('imports: python, wsgiref')
+from falcon import Request, Response, App, HTTPInternalServerError
+profile.mark('imports: falcon')
 
 # -- isort wants the above line to be blank --
 # Controller classes (for routing)
 import discovery
+import engines
 import exceptions
-from falcon import Request, Response, App, HTTPInternalServerError
 import management
 import setup
 import log
@@ -73,6 +77,7 @@ from shr import set_shr_logger
 # FOR EACH ASCOM DEVICE #
 #########################
 import telescope
+profile.mark('imports: translator modules')
 #--------------
 API_VERSION = 1
 #--------------
@@ -115,31 +120,22 @@ class LoggingWSGIRequestHandler(WSGIRequestHandler):
         #    log.logger.info(f'{self.client_address[0]} <- {format%args}')
 
 #-----------------------
-# Magic routing function
+# Routing function
 # ----------------------
 def init_routes(app: App, devname: str, module):
-    """Initialize Falcon routing from URI to responser classses
-
-    Inspects a module and finds all classes, assuming they are Falcon
-    responder classes, and calls Falcon to route the corresponding
-    Alpaca URI to each responder. This is done by creating the
-    URI template from the responder class name.
+    """Initialize Falcon routing from URI to responders
 
-    Note that it is sufficient to create the controller instance
-    directly from the type returned by inspect.getmembers() since
-    the instance is saved within Falcon as its resource controller.
-    The responder methods are called with an additional 'devno'
-    parameter, containing the device number from the URI. Reject
-    negative device numbers.
+    The device module builds its responders from a table of its Alpaca
+    endpoints (see :py:mod:`responders`) and keeps them in its
+    ``responders`` dict, {endpoint name: responder}. Each is routed to
+    its Alpaca URI.
 
     Args:
         app (App): The instance of the Falcon processor app
-        devname (str): The name of the device (e.g. 'rotator")
-        module (module): Module object containing responder classes
+        devname (str): The name of the device (e.g. 'telescope")
+        module (module): Device module with the ``responders`` dict
 
     Notes:
-        * The call to app.add_route() creates the single instance of the
-          router class right in the call, as the second parameter.
         * The device number is extracted from the URI by using an
           **int** placeholder in the URI template, and also using
           a format converter to assure that the number is not
@@ -148,10 +144,8 @@ def init_routes(app: App, devname: str, module):
 
     """
 
-    memlist = inspect.getmembers(module, inspect.isclass)
-    for cname,ctype in memlist:
-        if ctype.__module__ == module.__name__:    # Only classes *defined* in the module
-            app.add_route(f'/api/v{API_VERSION}/{devname}/{{devnum:int(min=0)}}/{cname.lower()}', ctype())  # type() creates instance!
+    for name, responder in module.responders.items():
+        app.add_route(f'/api/v{API_VERSION}/{devname}/{{devnum:int(min=0)}}/{name}', responder)
 
 
 def custom_excepthook(exc_type, exc_value, exc_traceback):
@@ -209,8 +203,50 @@ def falcon_uncaught_exception_handler(req: Request, resp: Response, ex: BaseExce
 # ===========
 # APP STARTUP
 # ===========
-def main():
-    """ Application startup"""
+def start_background(logger):
+    """What the Alpaca endpoint doesn't need to answer: discovery and the
+    config.toml watcher. Started once the server socket is listening."""
+    # ---------
+    # DISCOVERY
+    # ---------
+    _DSC = DiscoveryResponder(Config.ip_address, Config.port, Config.discovery_interfaces,
+                              Config.discovery_ports, Config.discovery_log_interval)
+
+    def apply_discovery_config(changes: dict):
+        _DSC.log_interval = changes.get('discovery_log_interval', _DSC.log_interval)
+        if 'discovery_ports' in changes:
+            _DSC.set_ports(Config.port, changes['discovery_ports'])
+    Config.subscribe(apply_discovery_config, 'discovery_log_interval', 'discovery_ports')
+
+    # -------------------------------------------
+    # CONFIG.TOML CHANGES WHILE RUNNING (config.py)
+    # -------------------------------------------
+    for warning in Config.warnings:
+        logger.warning(warning)
+    Config.watch(logger)
+    profile.mark('discovery, config watcher')
+
+
+def profile_requests(port: int):
+    """The first requests after startup, for --profile-startup"""
+    import http.client
+    for what, uri in (('first request (apiversions)', '/management/apiversions'),
+                      ('first device GET (connected)', f'/api/v{API_VERSION}/telescope/0/connected'),
+                      ('second device GET (connected)', f'/api/v{API_VERSION}/telescope/0/connected')):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        conn.request('GET', uri)
+        conn.getresponse().read()
+        conn.close()
+        profile.mark(what)
+
+
+def main(profile_only: bool = False):
+    """ Application startup
+
+    With profile_only (``python app.py --profile-startup``) it starts up as
+    usual, makes a few requests, prints where the time went and returns
+    instead of serving.
+    """
 
     logger = log.init_logging()
     # Share this logger throughout
@@ -218,27 +254,39 @@ def main():
     exceptions.logger = logger
     discovery.logger = logger
     set_shr_logger(logger)
+    profile.mark('config, logging')
 
     #########################
     # FOR EACH ASCOM DEVICE #
     #########################
     telescope.logger = logger
+    telescope.start_telescope_device(logger)
+    profile.mark('telescope device')
 
     # -----------------------------
     # Last-Chance Exception Handler
     # -----------------------------
     sys.excepthook = custom_excepthook
 
-    # ---------
-    # DISCOVERY
-    # ---------
-    _DSC = DiscoveryResponder(Config.ip_address, Config.port)
-
     # ----------------------------------
     # MAIN HTTP/REST API ENGINE (FALCON)
     # ----------------------------------
-    # falcon.App instances are callable WSGI apps
-    falc_app = App()
+    engine = Config.engine
+    if engine not in engines.ENGINES:
+        logger.error(f'Unknown server engine {engine!r} in config.toml, using threaded')
+        engine = 'threaded'
+    if engine == 'asgi':
+        try:
+            import uvicorn  # noqa: F401  (checked here so we can fall back)
+        except ImportError:
+            logger.error('The asgi engine needs uvicorn (pip install uvicorn), using threaded')
+            engine = 'threaded'
+    # falcon.App instances are callable WSGI apps, AlpacaASGIApp runs the
+    # same responders on a thread pool under asyncio
+    if engine == 'asgi':
+        falc_app = engines.AlpacaASGIApp(threads=Config.threads)
+    else:
+        falc_app = App()
     #
     # Initialize routes for each endpoint the magic way
     #
@@ -258,17 +306,38 @@ def main():
     # Install the unhandled exception processor. See above,
     #
     falc_app.add_error_handler(Exception, falcon_uncaught_exception_handler)
+    profile.mark('app and routes')
 
     # ------------------
     # SERVER APPLICATION
     # ------------------
-    # Using the lightweight built-in Python wsgi.simple_server
-    with make_server(Config.ip_address, Config.port, falc_app, handler_class=LoggingWSGIRequestHandler) as httpd:
-        logger.info(f'==STARTUP== Serving on {Config.ip_address}:{Config.port}. Time stamps are UTC.')
+    if engine == 'asgi':
+        start_background(logger)
+        logger.info(f'==STARTUP== Serving on {Config.ip_address}:{Config.port} ({engine} engine) after '
+                    f'{profile.summary()}. Time stamps are UTC.')
+        if profile_only:
+            print(profile.report())     # uvicorn binds inside serve_asgi, not timed
+            return
+        engines.serve_asgi(falc_app, Config.ip_address, Config.port)
+        return
+    # Using the lightweight built-in Python wsgi.simple_server, with a thread pool unless 'simple'
+    with engines.make_wsgi_server(engine, Config.ip_address, Config.port, falc_app,
+                                  LoggingWSGIRequestHandler, Config.threads) as httpd:
+        profile.mark('server socket')
+        # Listening now, requests wait in the backlog until serve_forever
+        start_background(logger)
+        logger.info(f'==STARTUP== Serving on {Config.ip_address}:{Config.port} ({engine} engine) after '
+                    f'{profile.summary()}. Time stamps are UTC.')
+        if profile_only:
+            threading.Thread(target=httpd.serve_forever, daemon=True).start()
+            profile_requests(httpd.server_address[1])
+            httpd.shutdown()
+            print(profile.report())
+            return
         # Serve until process is killed
         httpd.serve_forever()
 
 # ========================
 if __name__ == '__main__':
-    main()
+    main(profile_only='--profile-startup' in sys.argv[1:])
 # ========================
@@ -0,0 +1,61 @@
+# asgi_engine.py - The [server] engine = 'asgi' backend: falcon.asgi.App
+# served by uvicorn, with the (sync) responders run on a thread pool. Only
+# imported when that engine is used, see engines.py.
+
+import asyncio
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+import falcon.asgi
+
+
+class ThreadedResource:
+    """Async stand-in for a (sync) Falcon responder class under the ASGI app
+
+    Each on_get/on_put of the wrapped resource, @before hooks and all, is
+    awaited on the app's thread pool, so the event loop never blocks on the
+    device. A PUT's form is read here, on the loop, and left in
+    req.context.form for shr.get_request_field.
+    """
+
+    def __init__(self, resource, pool: ThreadPoolExecutor):
+        self.resource = resource
+        for method in ('get', 'put'):
+            responder = getattr(resource, f'on_{method}', None)
+            if responder is not None:
+                setattr(self, f'on_{method}', self._threaded(responder, pool))
+
+    @staticmethod
+    def _threaded(responder, pool):
+        async def on_method(req, resp, **params):
+            if req.method == 'PUT':
+                req.context.form = await req.get_media()
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(pool, functools.partial(responder, req, resp, **params))
+        return on_method
+
+
+class AlpacaASGIApp(falcon.asgi.App):
+    """falcon.asgi.App that takes the same resources and error handler as the WSGI App"""
+
+    def __init__(self, threads: int = 8, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='alpaca')
+
+    def add_route(self, uri_template, resource, **kwargs):
+        super().add_route(uri_template, ThreadedResource(resource, self.pool), **kwargs)
+
+    def add_error_handler(self, exception, handler=None):
+        if handler is not None and not inspect.iscoroutinefunction(handler):
+            sync_handler = handler
+
+            async def handler(req, resp, ex, params, ws=None):
+                sync_handler(req, resp, ex, params)
+        super().add_error_handler(exception, handler)
+
+
+def serve_asgi(app: AlpacaASGIApp, host: str, port: int):
+    """Serve the ASGI app with uvicorn until the process is killed"""
+    import uvicorn      # Only needed for this engine
+    uvicorn.run(app, host=host or '0.0.0.0', port=port, log_level='warning')
@@ -37,43 +37,252 @@
 # 27-Dec-2022   rbd 0.1 Move shared logger construction and global
 #               var here. MIT license and module header. No mcast.
 #
-import sys
-import toml
+# config.toml is read the first time a Config value is used, and checked
+# against SETTINGS: every setting has a section, a type and a default (used
+# when the file leaves it out). Config.watch() then stats the file every
+# [server] config_poll seconds. When it changes it is read again, and the
+# settings marked live are updated in place and handed to the callbacks
+# given to Config.subscribe(), which push them into the running objects
+# (log level, pulse timing, position cache, slew polling...). A changed
+# setting that isn't live is logged as needing a restart and left as it is,
+# and a file that doesn't pass the checks is logged and ignored.
+#
+import os
 import logging
+import threading
+import time
+from collections import namedtuple
+from logging import Logger
+import toml
+
+Setting = namedtuple('Setting', 'section key kind default live')
+
+def _level(value) -> int:
+    level = logging.getLevelName(str(value).upper())    # Not documented but works (!!!!)
+    if not isinstance(level, int):
+        raise ValueError(f'{value!r} is not a log level')
+    return level
+
+def _choice(*choices):
+    def check(value) -> str:
+        if value not in choices:
+            raise ValueError(f'{value!r} is not one of {", ".join(choices)}')
+        return value
+    return check
+
+def _list_of(kind):
+    def check(value) -> list:
+        if not isinstance(value, list) or not all(isinstance(v, kind) for v in value):
+            raise ValueError(f'{value!r} is not a list of {kind.__name__}')
+        return value
+    return check
+
+# Config attribute -> where it is in config.toml, what it must be, its
+# default, and whether a change is applied without a restart
+SETTINGS = {
+    # Network
+    'ip_address':               Setting('network', 'ip_address', str, '', False),
+    'port':                     Setting('network', 'port', int, 5555, False),
+    'discovery_interfaces':     Setting('network', 'discovery_interfaces', _list_of(str), [], False),
+    'discovery_ports':          Setting('network', 'discovery_ports', _list_of(int), [], True),
+    'discovery_log_interval':   Setting('network', 'discovery_log_interval', float, 60.0, True),
+    # Server
+    'location':                 Setting('server', 'location', str, 'Anywhere on Earth', True),
+    'verbose_driver_exceptions': Setting('server', 'verbose_driver_exceptions', bool, True, True),
+    'engine':                   Setting('server', 'engine', _choice('simple', 'threaded', 'asgi'), 'threaded', False),
+    'threads':                  Setting('server', 'threads', int, 8, False),
+    'config_poll':              Setting('server', 'config_poll', float, 2.0, True),
+    # Device
+    'pulse_log':                Setting('device', 'pulse_log', str, 'output.txt', False),
+    'pulse_command':            Setting('device', 'pulse_command', str, '', True),
+    'pulse_queue':              Setting('device', 'pulse_queue', int, 64, False),
+    'pulse_spin_ms':            Setting('device', 'pulse_spin_ms', float, 2.0, True),
+    'guide_command':            Setting('device', 'guide_command', str, '', True),
+    'guide_window':             Setting('device', 'guide_window', float, 0.5, True),
+    'guide_clamp_ms':           Setting('device', 'guide_clamp_ms', int, 2000, True),
+    'where_command':            Setting('device', 'where_command', str, 'tx where', False),
+    'position_interval':        Setting('device', 'position_interval', float, 1.0, True),
+    'mount':                    Setting('device', 'mount', _choice('tx', 'simulated'), 'simulated', False),
+    'slew_command':             Setting('device', 'slew_command', str, '', False),
+    'sync_command':             Setting('device', 'sync_command', str, '', False),
+    'abort_command':            Setting('device', 'abort_command', str, '', True),
+    'slew_poll':                Setting('device', 'slew_poll', float, 0.5, True),
+    'slew_timeout':             Setting('device', 'slew_timeout', float, 300.0, True),
+    'sim_slew_rate':            Setting('device', 'sim_slew_rate', float, 3.0, True),
+    # Logging
+    'log_level':                Setting('logging', 'log_level', _level, 'INFO', True),
+    'log_to_stdout':            Setting('logging', 'log_to_stdout', bool, False, False),
+    'max_size_mb':              Setting('logging', 'max_size_mb', int, 5, False),
+    'num_keep_logs':            Setting('logging', 'num_keep_logs', int, 1, False),
+    'log_format':               Setting('logging', 'format', _choice('text', 'json'), 'text', False),
+    'sample_endpoints':         Setting('logging', 'sample_endpoints', _list_of(str), [], True),
+    'sample_interval':          Setting('logging', 'sample_interval', float, 5.0, True),
+}
+
+
+class ConfigError(Exception):
+    """config.toml can't be read or a value in it is wrong"""
+
+
+def _check(name: str, setting: Setting, value):
+    kind = setting.kind
+    if kind is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(kind, type):
+        if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+            raise ConfigError(f'[{setting.section}] {setting.key} = {value!r} should be {kind.__name__}')
+        return value
+    try:
+        return kind(value)
+    except ValueError as ex:
+        raise ConfigError(f'[{setting.section}] {setting.key}: {ex}') from None
+
+
+def parse(text: str) -> tuple:
+    """The Config values in a config.toml text, and warnings about keys nobody reads
+
+    Raises ConfigError for bad TOML or a value of the wrong kind.
+    """
+    try:
+        raw = toml.loads(text)
+    except toml.TomlDecodeError as ex:
+        raise ConfigError(f'config.toml: {ex}') from None
+    values = {}
+    for name, setting in SETTINGS.items():
+        value = raw.get(setting.section, {}).get(setting.key, setting.default)
+        values[name] = _check(name, setting, value)
+    known = {(s.section, s.key) for s in SETTINGS.values()}
+    warnings = [f'[{section}] {key} in config.toml is not a setting'
+                for section, items in raw.items() if isinstance(items, dict)
+                for key in items if (section, key) not in known]
+    return values, warnings
+
+
+class _Config:
+    """Device configuration in ``config.toml``
+
+    Values are attributes (``Config.port``), read from the file on first use.
+    """
+    def __init__(self, path: str):
+        self._path = path
+        self._stamp = None              # (mtime_ns, size) of the file last read
+        self._read_values = None
+        self._lock = threading.Lock()
+        self._subscribers = []          # (callback, names or None for all)
+        self._watcher = None
+        self._logger = None
+        self.warnings = []              # unknown keys, for the log once it is up
+
+    def __getattr__(self, name: str):
+        # Only gets here before the first load, after it the values are
+        # plain instance attributes
+        if name.startswith('_') or name not in SETTINGS:
+            raise AttributeError(name)
+        self.load()
+        return self.__dict__[name]
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _read(self) -> tuple:
+        with open(self._path, encoding='utf-8') as f:
+            stat = os.fstat(f.fileno())
+            return parse(f.read()) + ((stat.st_mtime_ns, stat.st_size),)
+
+    def load(self):
+        """Read config.toml, errors here are fatal"""
+        with self._lock:
+            if self._stamp is not None:
+                return
+            try:
+                values, self.warnings, stamp = self._read()
+            except OSError as ex:
+                raise ConfigError(f'Can\'t read {self._path}: {ex}') from None
+            self.__dict__.update(values)
+            self._read_values = values  # as last read, the restart-only ones may differ from ours
+            self._stamp = stamp
+
+    def values(self) -> dict:
+        """All current settings by Config attribute name"""
+        if self._stamp is None:
+            self.load()
+        return {name: self.__dict__[name] for name in SETTINGS}
+
+    def subscribe(self, callback, *names):
+        """Call callback(changes) on the watcher thread when any of names
+        (all settings if none are given) change, with {name: new value}
+        of the ones that did"""
+        with self._lock:
+            self._subscribers.append((callback, frozenset(names) or None))
+
+    def reload(self) -> dict:
+        """Read config.toml again if it changed, apply the live settings
+        that did and tell the subscribers. Returns the ones applied."""
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return {}                   # being replaced by an editor, try again next time
+        if (stat.st_mtime_ns, stat.st_size) == self._stamp:
+            return {}
+        try:
+            values, warnings, stamp = self._read()
+        except (OSError, ConfigError) as ex:
+            self._stamp = (stat.st_mtime_ns, stat.st_size)     # once per edit
+            self._log('error', f'config.toml not reloaded: {ex}')
+            return {}
+        with self._lock:
+            self._stamp = stamp
+            read, self._read_values = self._read_values, values
+            changes = {}
+            for name, value in values.items():
+                if value == read[name]:
+                    continue
+                if SETTINGS[name].live:
+                    changes[name] = value
+                else:
+                    self._log('warning', f'{name} changed in config.toml, restart to apply it')
+            self.__dict__.update(changes)
+            subscribers = list(self._subscribers)
+        for warning in warnings:
+            if warning not in self.warnings:
+                self._log('warning', warning)
+        self.warnings = warnings
+        if changes:
+            self._log('info', f'config.toml reloaded: {changes}')
+        for callback, names in subscribers:
+            wanted = changes if names is None else {k: v for k, v in changes.items() if k in names}
+            if wanted:
+                try:
+                    callback(wanted)
+                except Exception as ex:
+                    self._log('error', f'Applying {wanted} failed: {ex}')
+        return changes
+
+    def _log(self, level: str, message: str):
+        if self._logger is not None:
+            getattr(self._logger, level)(message)
+
+    def watch(self, logger: Logger):
+        """Check config.toml for changes every config_poll seconds on a daemon thread"""
+        self._logger = logger
+        if self._watcher is None:
+            self.load()
+            self._watcher = threading.Thread(target=self._watch, name='config-watch', daemon=True)
+            self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.config_poll if self.config_poll > 0 else 5.0)
+            if self.config_poll > 0:
+                self.reload()
+
+
+Config = _Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.toml'))
 
-#
-# This slimy hack is for Sphinx which, despite the toml.load() being
-# run only once on the first import, it can't deal with _dict not being
-# initialized or ?!?!?!?!? If you try to use getcwd() in the file name
-# here, it will also choke Sphinx. This cost me a day.
-#
-_dict = {}
-_dict = toml.load(f'{sys.path[0]}/config.toml')    # Errors here are fatal.
 def get_toml(sect: str, item: str):
-    if not _dict is {}:
-        return _dict[sect][item]
-    else:
-        return ''
-
-class Config:
-    """Device configuration in ``config.toml``"""
-    # ---------------
-    # Network Section
-    # ---------------
-    ip_address: str = get_toml('network', 'ip_address')
-    port: int = get_toml('network', 'port')
-    # --------------
-    # Server Section
-    # --------------
-    location: str = get_toml('server', 'location')
-    verbose_driver_exceptions: bool = get_toml('server', 'verbose_driver_exceptions')
-    # --------------
-    # Device Section
-    # --------------
-    # ---------------
-    # Logging Section
-    # ---------------
-    log_level: int = logging.getLevelName(get_toml('logging', 'log_level'))  # Not documented but works (!!!!)
-    log_to_stdout: str = get_toml('logging', 'log_to_stdout')
-    max_size_mb: int = get_toml('logging', 'max_size_mb')
-    num_keep_logs: int = get_toml('logging', 'num_keep_logs')
+    """The checked value of [sect] item, '' if there is no such setting"""
+    for name, setting in SETTINGS.items():
+        if (setting.section, setting.key) == (sect, item):
+            return getattr(Config, name)
+    return ''
@@ -41,20 +41,36 @@
 # 25-Dec-2022   rbd 0.1 Logging typing for intellisense
 # 27-Dec-2022   rbd 0.1 MIT license and module header. No mcast on device, duh!
 #
+#
+# One thread answers discovery on every socket from a selectors loop. There
+# is a receive socket per address in [network] discovery_interfaces (or just
+# ip_address), and a packet on any of them gets one reply per Alpaca port
+# (port plus [network] discovery_ports), encoded once at startup and sent
+# back from the socket it came in on. Packets are read until the socket is
+# empty before going back to select(). The first packet from a client is
+# logged, the rest are counted and summarised every
+# discovery_log_interval seconds.
+#
 import os
+import selectors
 import socket                                           # for discovery responder
+import time
 from threading import Thread                            # Same here
-from logging import Logger
+from logging import Logger, DEBUG
 
 logger: Logger = None
 def set_disc_logger(lgr) -> logger:
     global logger
     logger = lgr
 
+DISCOVERY_PORT = 32227
+DISCOVERY_MESSAGE = b'alpacadiscovery1'
+
 class DiscoveryResponder(Thread):
     """Alpaca device discovery responder """
 
-    def __init__(self, ADDR, PORT):
+    def __init__(self, ADDR, PORT, interfaces: list = (), ports: list = (),
+                 log_interval: float = 60.0, discovery_port: int = DISCOVERY_PORT):
         """ The Alpaca Discovery responder runs in a separate thread and is invoked
         by a 1-line call during app startup::
 
@@ -62,48 +78,107 @@ class DiscoveryResponder(Thread):
 
         where the ``ip_address`` and ``port`` come from the :doc:`/config`
         ``Config`` object and ultimately from the config file ``config.toml``.
+        ``interfaces`` are more addresses to listen on and ``ports`` more
+        Alpaca ports to announce.
         """
         Thread.__init__(self, name='Discovery')
         # TODO See https://stackoverflow.com/a/32372627/159508
         # It's a sledge hammer technique to bind to ' ' for sending multicast
         # The right way is to bind to the broadcast address for the current
         # subnet.
-        self.device_address = (ADDR, 32227)    # Listen at multicast address, not ' '
-        self.alpaca_response  = "{\"AlpacaPort\": " + str(PORT) + "}"
-        self.rsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.rsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  #share address
-        if os.name != 'nt':
-            # needed on Linux and OSX to share port with net core. Remove on windows
-            self.rsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
-        try:
-            self.rsock.bind(self.device_address)
-            print(self.rsock)
-        except:
-            logger.error('Discovery responder: failure to bind receive socket')
-            self.rsock.close()
-            self.rsock = 0
-            raise
-
-        self.tsock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.tsock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  #share address
-        try:
-             self.tsock.bind((ADDR, 0))
-             print(self.tsock)
-        except:
-            logger.error('Discovery responder: failure to bind send socket')
-            self.tsock.close()
-            self.tsock = 0
-            raise
+        self.set_ports(PORT, ports)
+        self.log_interval = log_interval
+        self.counts = {'requests': 0, 'replies': 0, 'ignored': 0, 'errors': 0}
+        self._clients = set()           # addresses seen since the last summary
+        self._logged = 0                # counts['requests'] at the last summary
+        self._selector = selectors.DefaultSelector()
+        self.socks = []
+        for address in dict.fromkeys([ADDR, *interfaces]):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  #share address
+            if os.name != 'nt':
+                # needed on Linux and OSX to share port with net core. Remove on windows
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            try:
+                sock.bind((address, discovery_port))   # Listen at multicast address, not ' '
+            except OSError:
+                logger.error(f'Discovery responder: failure to bind receive socket on {address!r}')
+                sock.close()
+                self.close()
+                raise
+            sock.setblocking(False)
+            self._selector.register(sock, selectors.EVENT_READ)
+            self.socks.append(sock)
+            logger.info(f'Discovery responder listening on {sock.getsockname()}')
 
         # OK start the listener
         self.daemon = True
         self.start()
 
+    def set_ports(self, PORT, ports: list = ()):
+        """Announce these Alpaca ports from now on"""
+        self.replies = [f'{{"AlpacaPort": {port}}}'.encode('ascii')
+                        for port in dict.fromkeys([PORT, *ports])]
+
     def run(self):
         """Discovery responder forever loop"""
+        next_summary = time.monotonic() + self.log_interval
+        while self.socks:
+            try:
+                events = self._selector.select(self.log_interval)
+            except (OSError, ValueError):
+                break                   # closed under us
+            for key, _ in events:
+                self._drain(key.fileobj)
+            now = time.monotonic()
+            if now >= next_summary:
+                self._summary()
+                next_summary = now + self.log_interval
+
+    def _drain(self, sock: socket.socket):
+        # Answer everything waiting on this socket
+        counts = self.counts
         while True:
-            data, addr = self.rsock.recvfrom(1024)
-            datascii = str(data, 'ascii')
-            logger.info(f'Disc rcv {datascii} from {str(addr)}')
-            if 'alpacadiscovery1' in datascii:
-                self.tsock.sendto(self.alpaca_response.encode(), addr)
+            try:
+                data, addr = sock.recvfrom(1024)
+            except BlockingIOError:
+                return
+            except OSError as ex:
+                counts['errors'] += 1
+                logger.error(f'Discovery receive failed: {ex}')
+                return
+            counts['requests'] += 1
+            if DISCOVERY_MESSAGE not in data:
+                counts['ignored'] += 1
+                if logger.isEnabledFor(DEBUG):
+                    logger.debug(f'Disc ignored {data[:64]!r} from {addr}')
+                continue
+            if addr not in self._clients:
+                self._clients.add(addr)
+                logger.info(f'Disc rcv {data[:64]!r} from {addr}')
+            for reply in self.replies:
+                try:
+                    sock.sendto(reply, addr)
+                    counts['replies'] += 1
+                except OSError as ex:  # full send buffer or unreachable, the client asks again
+                    counts['errors'] += 1
+                    if logger.isEnabledFor(DEBUG):
+                        logger.debug(f'Disc reply to {addr} failed: {ex}')
+
+    def _summary(self):
+        requests = self.counts['requests'] - self._logged
+        if requests:
+            logger.info(f'Discovery: {requests} requests from {len(self._clients)} clients '
+                        f'in the last {self.log_interval:g} s, totals {self.counts}')
+        self._logged = self.counts['requests']
+        self._clients.clear()
+
+    def close(self):
+        socks, self.socks = self.socks, []
+        for sock in socks:
+            try:
+                self._selector.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+            sock.close()
+        self._selector.close()
@@ -0,0 +1,58 @@
+# engines.py - HTTP server backends for the Alpaca endpoint, chosen with
+# [server] engine in config.toml:
+#
+#   simple   - wsgiref.simple_server, one request at a time (the original)
+#   threaded - wsgiref with a pool of worker threads, so a PulseGuide that is
+#              still running doesn't hold up IsPulseGuiding and the other GETs
+#   asgi     - falcon.asgi.App served by uvicorn (pip install uvicorn). The
+#              responders stay as they are and run on a thread pool.
+#
+# The number of worker threads for 'threaded' and 'asgi' is [server] threads.
+# The asgi pieces are in asgi_engine.py: falcon.asgi and asyncio are a good
+# part of the startup time, so they are only imported when that engine is
+# used (engines.AlpacaASGIApp etc. still work, see __getattr__ below).
+
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIServer, make_server
+
+ENGINES = ('simple', 'threaded', 'asgi')
+
+
+class ThreadPoolWSGIServer(WSGIServer):
+    """wsgiref server handing each connection to a fixed pool of threads"""
+
+    def __init__(self, server_address, handler_class, threads: int = 8):
+        super().__init__(server_address, handler_class)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='alpaca')
+
+    def process_request(self, request, client_address):
+        # Same as socketserver.ThreadingMixIn but the threads are reused
+        self._pool.submit(self._process_request_thread, request, client_address)
+
+    def _process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def make_wsgi_server(engine: str, host: str, port: int, app, handler_class, threads: int = 8):
+    """Make the wsgiref server for the 'simple' or 'threaded' engine"""
+    if engine == 'threaded':
+        return make_server(host, port, app, server_class=functools.partial(ThreadPoolWSGIServer, threads=threads),
+                           handler_class=handler_class)
+    return make_server(host, port, app, handler_class=handler_class)
+
+
+def __getattr__(name: str):
+    if name in ('ThreadedResource', 'AlpacaASGIApp', 'serve_asgi'):
+        import asgi_engine
+        return getattr(asgi_engine, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
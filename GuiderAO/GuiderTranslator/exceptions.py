@@ -89,7 +89,7 @@ class ActionNotImplementedException:
         self.number = 0x40C
         self.message = message
         cname = self.__class__.__name__
-        logger.error(f'{cname}: {message}')
+        logger.error('%s: %s', cname, message)
 
     @property
     def Number(self) -> int:
@@ -141,7 +141,7 @@ class DriverException:
             * Logs the constructed ``DriverException`` message
         """
         if number <= 0x500 and number >= 0xFFF:
-            logger.error(f'Programmer error, bad DriverException number {hex(number)}, substituting 0x500')
+            logger.error('Programmer error, bad DriverException number %s, substituting 0x500', hex(number))
             number = 0x500
         self.number = number
         cname = self.__class__.__name__
@@ -180,7 +180,7 @@ class InvalidOperationException:
         self.number = 0x40B
         self.message = message
         cname = self.__class__.__name__
-        logger.error(f'{cname}: {message}')
+        logger.error('%s: %s', cname, message)
 
     @property
     def Number(self) -> int:
@@ -208,7 +208,7 @@ class InvalidValueException:
         self.number = 0x401
         self.message = message
         cname = self.__class__.__name__
-        logger.error(f'{cname}: {message}')
+        logger.error('%s: %s', cname, message)
 
     @property
     def Number(self) -> int:
@@ -236,7 +236,7 @@ class NotConnectedException:
         self.number = 0x407
         self.message = message
         cname = self.__class__.__name__
-        logger.error(f'{cname}: {message}')
+        logger.error('%s: %s', cname, message)
 
     @property
     def Number(self) -> int:
@@ -263,7 +263,7 @@ class NotImplementedException:
         self.number = 0x400
         self.message = message
         cname = self.__class__.__name__
-        logger.error(f'{cname}: {message}')
+        logger.error('%s: %s', cname, message)
 
     @property
     def Number(self) -> int:
@@ -290,7 +290,7 @@ class ParkedException:
         self.number = 0x408
         self.message = message
         cname = self.__class__.__name__
-        logger.error(f'{cname}: {message}')
+        logger.error('%s: %s', cname, message)
 
     @property
     def Number(self) -> int:
@@ -317,7 +317,7 @@ class SlavedException:
         self.number = 0x409
         self.message = message
         cname = self.__class__.__name__
-        logger.error(f'{cname}: {message}')
+        logger.error('%s: %s', cname, message)
 
     @property
     def Number(self) -> int:
@@ -345,7 +345,7 @@ class ValueNotSetException:
         self.number = 0x402
         self.message = message
         cname = self.__class__.__name__
-        logger.error(f'{cname}: {message}')
+        logger.error('%s: %s', cname, message)
 
     @property
     def Number(self) -> int:
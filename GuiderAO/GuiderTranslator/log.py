@@ -34,17 +34,85 @@
 # Edit History:
 # 01-Jan-2023   rbd 0.1 Initial edit, moved from config.py
 # 15-Jan-2023   rbd 0.1 Documentation. No logic changes.
+# Records go through a queue to a listener thread that writes them, with
+# sampling for polled endpoints and an optional JSON format.
 
+import atexit
+import json
 import logging
 import logging.handlers
+import queue
+import threading
 import time
 from config import Config
+import shr
 
 global logger
 #logger: logging.Logger = None  # Master copy (root) of the logger
 logger = None                   # Safe on Python 3.7 but no intellisense in VSCode etc.
+listener: logging.handlers.QueueListener = None     # Writes the queued records, see init_logging()
 
-def init_logging():
+# Fields that shr.log_request() and shr.log_value() put on their records
+# (logger.info(..., extra=...)) when the format is json, in the order it
+# writes them
+RECORD_FIELDS = ('remote', 'method', 'endpoint', 'value')
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves the formatting to the listener thread
+
+    The stock prepare() formats the message on the calling thread so the
+    record can be pickled. Ours never leaves the process, so the request
+    thread only builds the record and puts it on the queue.
+    """
+    def prepare(self, record):
+        return record
+
+
+class PollSampler:
+    """Rate limit for the lines of endpoints that clients poll
+
+    MaxIm asks IsPulseGuiding (and others) many times a second. For an
+    endpoint in the list, only the first line of each kind (request,
+    returned value) per interval is logged, and it says how many like it
+    were left out since the last one. shr asks allow() before it makes the
+    record, so the lines left out cost next to nothing.
+    """
+    def __init__(self, endpoints, interval: float):
+        self.endpoints = frozenset(endpoints)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._last = {}                 # (endpoint, msg) -> [time logged, lines left out since]
+
+    def allow(self, endpoint: str, msg: str):
+        """None to leave the line out, else how many were left out before it"""
+        if endpoint not in self.endpoints:
+            return 0
+        key = (endpoint, msg)
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last[0] < self.interval:
+                last[1] += 1
+                return None
+            self._last[key] = [now, 0]
+        return last[1] if last is not None else 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, message and the RECORD_FIELDS it has"""
+    def format(self, record) -> str:
+        out = {'time': self.formatTime(record, self.datefmt) + f'.{int(record.msecs):03d}Z',
+               'level': record.levelname, 'message': record.getMessage()}
+        for field in RECORD_FIELDS:
+            if hasattr(record, field):
+                out[field] = getattr(record, field)
+        if record.exc_info:
+            out['exception'] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+def init_logging(filename: str = 'Guider_Controller.log'):
     """ Create the logger - called at app startup
 
         **MASTER LOGGER**
@@ -52,8 +120,13 @@ def init_logging():
         This single logger is used throughout. The module name (the param for get_logger())
         isn't needed and would be 'root' anyway, sort of useless. Also the default date-time
         is local time, and not ISO-8601. We log in UTC/ISO format, and with fractional seconds.
-        Finally our config options allow for suppression of logging to stdout, and for this
-        we remove the default stdout handler. Thank heaven that Python logging is thread-safe!
+        Finally our config options allow for suppression of logging to stdout.
+
+        The logger itself only has a QueueHandler. Records are put on a queue and a
+        QueueListener thread formats them and writes them to the rotating log file (and
+        stdout), so no request waits on the disk. :py:class:`PollSampler`, asked by shr
+        before it logs, thins out the records of the ``[logging] sample_endpoints``. The
+        level and the sampling follow changes to config.toml (:py:meth:`config.Config.watch`).
 
         This logger is passed around throughout the app and may be used throughout. The
         :py:class:`config.Config` class has options to control the number of back generations
@@ -64,29 +137,57 @@ def init_logging():
         Customized Python logger.
 
     """
+    global listener
 
-    logging.basicConfig(level=Config.log_level)
-    logger = logging.getLogger()                # Root logger, see above
-    formatter = logging.Formatter('%(asctime)s.%(msecs)03d %(levelname)s %(message)s', '%Y-%m-%dT%H:%M:%S')
+    if Config.log_format == 'json':
+        formatter = JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S')
+    else:
+        formatter = logging.Formatter('%(asctime)s.%(msecs)03d %(levelname)s %(message)s', '%Y-%m-%dT%H:%M:%S')
     formatter.converter = time.gmtime           # UTC time
-    logger.handlers[0].setFormatter(formatter)  # This is the stdout handler, level set above
-    # Add a logfile handler, same formatter and level
-    handler = logging.handlers.RotatingFileHandler('Guider_Controller.log',
+    handlers = []
+    # The logfile handler, same formatter and level
+    handler = logging.handlers.RotatingFileHandler(filename,
                                                     mode='a',
                                                     delay=True,     # Prevent creation of empty logs
                                                     maxBytes=Config.max_size_mb * 1000000,
                                                     backupCount=Config.num_keep_logs)
-    handler.setLevel(Config.log_level)
     handler.setFormatter(formatter)
     handler.doRollover()                                            # Always start with fresh log
-    logger.addHandler(handler)
-    if not Config.log_to_stdout:
-        """
-            This allows control of logging to stdout by simply
-            removing the stdout handler from the logger's
-            handler list. It's always handler[0] as created
-            by logging.basicConfig()
-        """
-        logger.debug('Logging to stdout disabled in settings')
-        logger.removeHandler(logger.handlers[0])    # This is the stdout handler
-    return logger
\ No newline at end of file
+    handlers.append(handler)
+    if Config.log_to_stdout:
+        handler = logging.StreamHandler()
+        handler.setFormatter(formatter)
+        handlers.append(handler)
+
+    logger = logging.getLogger()                # Root logger, see above
+    logger.setLevel(Config.log_level)
+    for handler in list(logger.handlers):       # Anything set up before us
+        logger.removeHandler(handler)
+    records = queue.SimpleQueue()
+    queue_handler = _QueueHandler(records)
+    logger.addHandler(queue_handler)
+    # Always there so sample_endpoints can be set while running, with none it passes everything
+    sampler = PollSampler(Config.sample_endpoints, Config.sample_interval)
+    shr.sampler = sampler
+    shr.record_fields = Config.log_format == 'json'
+
+    def apply_config(changes: dict):
+        if 'log_level' in changes:
+            logger.setLevel(changes['log_level'])
+        if 'sample_endpoints' in changes:
+            sampler.endpoints = frozenset(changes['sample_endpoints'])
+        if 'sample_interval' in changes:
+            sampler.interval = changes['sample_interval']
+    Config.subscribe(apply_config, 'log_level', 'sample_endpoints', 'sample_interval')
+    listener = logging.handlers.QueueListener(records, *handlers)
+    listener.start()
+    atexit.register(stop_logging)
+    return logger
+
+
+def stop_logging():
+    """Write out the records still queued and stop the listener thread"""
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
@@ -0,0 +1,242 @@
+# mount.py - Slews and syncs, sent to the mount by a command backend.
+#
+# TelescopeDevice hands SlewToCoordinates and the rest to a SlewMachine. It
+# starts the slew on the backend and then follows it on its own thread:
+#
+#   idle -> slewing -> settling -> idle
+#              |  \
+#              |   `-> failed   (backend error or [device] slew_timeout)
+#              `-----> aborted  (AbortSlew, or replaced by a new slew)
+#
+# Every step is written into the device state (slewing, right_ascension,
+# declination), so Slewing, RightAscension and Declination polls during a
+# slew are answered from memory and never wait on the mount.
+#
+# Backends ([device] mount in config.toml):
+#   TxMount        - runs [device] slew_command, sync_command and
+#                    abort_command, and follows the slew with the where
+#                    command (mount_state.MountPositionProvider)
+#   SimulatedMount - moves at [device] sim_slew_rate degrees per second,
+#                    nothing leaves the process. For trying the driver out.
+
+from threading import Event, Lock, Thread
+from logging import Logger
+import subprocess
+import time
+
+from mount_state import MountPositionProvider, Position
+
+SLEW_STATES = ('idle', 'slewing', 'settling', 'aborted', 'failed')
+
+
+def hms(hours: float) -> str:
+    """05:34:31.94 style hours (RA)"""
+    seconds = round(hours * 3600.0, 2) % 86400.0
+    return f'{int(seconds // 3600):02d}:{int(seconds % 3600 // 60):02d}:{seconds % 60:05.2f}'
+
+
+def dms(degrees: float) -> str:
+    """+22:00:52.2 style degrees (Dec)"""
+    sign = '-' if degrees < 0 else '+'
+    seconds = round(abs(degrees) * 3600.0, 1)
+    return f'{sign}{int(seconds // 3600):02d}:{int(seconds % 3600 // 60):02d}:{seconds % 60:04.1f}'
+
+
+def separation(ra1: float, dec1: float, ra2: float, dec2: float) -> float:
+    """Rough distance in degrees, good enough to tell if a slew has arrived"""
+    dra = (ra1 - ra2) * 15.0
+    if dra > 180.0:
+        dra -= 360.0
+    elif dra < -180.0:
+        dra += 360.0
+    return max(abs(dra), abs(dec1 - dec2))
+
+
+class TxMount:
+    """The SEO mount, driven by running commands
+
+    The commands are format strings with {ra} (hours) and {dec} (degrees) as
+    decimals, or {ra_hms} and {dec_dms} sexagesimal. They are split on
+    spaces and run without a shell. An empty command means the mount can't
+    do that.
+    """
+    def __init__(self, slew_command: str, sync_command: str, abort_command: str,
+                 where: MountPositionProvider, timeout: float = 10.0):
+        self.slew_command = slew_command
+        self.sync_command = sync_command
+        self.abort_command = abort_command
+        self.where = where
+        self.timeout = timeout
+
+    def _run(self, command: str, ra: float = 0.0, dec: float = 0.0):
+        if not command:
+            raise RuntimeError('No mount command configured for this')
+        args = command.format(ra=ra, dec=dec, ra_hms=hms(ra), dec_dms=dms(dec)).split()
+        subprocess.run(args, timeout=self.timeout, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def slew(self, ra: float, dec: float):
+        self._run(self.slew_command, ra, dec)
+        self.where.invalidate()
+
+    def sync(self, ra: float, dec: float):
+        self._run(self.sync_command, ra, dec)
+        self.where.invalidate()
+
+    def abort(self):
+        self._run(self.abort_command)
+        self.where.invalidate()
+
+    def status(self) -> Position:
+        # slewing is None if the where output doesn't say
+        return self.where.get()
+
+
+class SimulatedMount:
+    """A mount that moves at a fixed rate and exists only in memory"""
+    def __init__(self, rate: float = 3.0, ra: float = 0.0, dec: float = 0.0):
+        self.rate = rate                # degrees per second on each axis
+        self._lock = Lock()
+        self._start = (ra, dec)
+        self._target = (ra, dec)
+        self._started = time.monotonic()
+        self._duration = 0.0
+
+    def _now(self, now: float) -> tuple:
+        # Where it is at now, and whether it is still moving
+        if now - self._started >= self._duration:
+            return self._target, False
+        part = (now - self._started) / self._duration
+        (ra0, dec0), (ra1, dec1) = self._start, self._target
+        dra = ra1 - ra0
+        if dra > 12.0:                  # the short way round
+            dra -= 24.0
+        elif dra < -12.0:
+            dra += 24.0
+        return ((ra0 + dra * part) % 24.0, dec0 + (dec1 - dec0) * part), True
+
+    def slew(self, ra: float, dec: float):
+        with self._lock:
+            now = time.monotonic()
+            (ra0, dec0), _ = self._now(now)
+            self._start = (ra0, dec0)
+            self._target = (ra, dec)
+            self._started = now
+            self._duration = separation(ra0, dec0, ra, dec) / self.rate
+
+    def sync(self, ra: float, dec: float):
+        with self._lock:
+            self._start = self._target = (ra, dec)
+            self._duration = 0.0
+
+    def abort(self):
+        with self._lock:
+            (ra, dec), _ = self._now(time.monotonic())
+            self._start = self._target = (ra, dec)
+            self._duration = 0.0
+
+    def status(self) -> Position:
+        with self._lock:
+            now = time.monotonic()
+            (ra, dec), slewing = self._now(now)
+        return Position(None, None, ra, dec, now, slewing)
+
+
+class SlewMachine:
+    """Runs one slew at a time on a background thread
+
+    update is TelescopeDevice._update, called with the state fields that
+    changed. A new slew or abort() ends the one in progress.
+    """
+    def __init__(self, backend, update, logger: Logger, poll: float = 0.5, settle: float = 0.0,
+                 timeout: float = 300.0, tolerance: float = 1 / 60):
+        self.backend = backend
+        self.update = update
+        self.logger = logger
+        self.poll = poll                # seconds between backend.status() calls
+        self.settle = settle            # seconds after arriving before Slewing goes false
+        self.timeout = timeout
+        self.tolerance = tolerance      # degrees, arrived if the mount doesn't say it is slewing
+        self.state = 'idle'
+        self.error = None               # what made the last slew fail
+        self.target = None              # (ra, dec) of the last slew
+        self._lock = Lock()
+        self._stop = None               # Event ending the slew in progress
+        self._done = Event()
+        self._done.set()
+
+    def start(self, ra: float, dec: float):
+        """Start a slew and return at once"""
+        stop = Event()
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()        # its thread sees it and leaves the state to us
+            self._stop = stop
+            self._done = done = Event()
+            self.state = 'slewing'
+            self.error = None
+            self.target = (ra, dec)
+            self.update(slewing=True, target_right_ascension=ra, target_declination=dec)
+        Thread(target=self._run, args=(ra, dec, stop, done), name='slew', daemon=True).start()
+        self.logger.info('Slew to RA %s Dec %s', hms(ra), dms(dec))
+
+    def wait(self, timeout: float = None):
+        """Wait until the current slew is over, RuntimeError if it failed"""
+        self._done.wait(timeout)
+        if self.state == 'failed':
+            raise RuntimeError(f'Slew failed: {self.error}')
+
+    def abort(self):
+        with self._lock:
+            stop = self._stop
+            self._stop = None
+            if stop is not None:
+                stop.set()
+                self.state = 'aborted'
+            self.update(slewing=False)
+        self.backend.abort()
+        self.logger.info('Slew aborted')
+
+    def sync(self, ra: float, dec: float):
+        self.backend.sync(ra, dec)
+        self.update(right_ascension=ra, declination=dec)
+        self.logger.info('Synced to RA %s Dec %s', hms(ra), dms(dec))
+
+    def _finish(self, stop: Event, done: Event, state: str, error: Exception = None):
+        with self._lock:
+            if not stop.is_set():       # still the current slew
+                self._stop = None
+                self.state = state
+                self.error = error
+                self.update(slewing=False)
+        done.set()
+
+    def _run(self, ra: float, dec: float, stop: Event, done: Event):
+        deadline = time.monotonic() + self.timeout
+        try:
+            self.backend.slew(ra, dec)
+            while not stop.wait(self.poll):
+                position = self.backend.status()
+                with self._lock:
+                    if stop.is_set():
+                        break
+                    self.update(right_ascension=position.right_ascension, declination=position.declination)
+                if position.slewing is False or (position.slewing is None and separation(
+                        position.right_ascension, position.declination, ra, dec) <= self.tolerance):
+                    break
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f'Not there after {self.timeout} s')
+            if stop.is_set():
+                done.set()
+                return
+            with self._lock:
+                if not stop.is_set():
+                    self.state = 'settling'
+            if not stop.wait(self.settle):
+                self._finish(stop, done, 'idle')
+                self.logger.info('Slew done')
+            else:
+                done.set()
+        except Exception as ex:
+            self._finish(stop, done, 'failed', ex)
+            self.logger.error('Slew to RA %s Dec %s failed: %s', hms(ra), dms(dec), ex)
@@ -0,0 +1,112 @@
+# mount_state.py - Cached mount position for the Alpaca position properties.
+#
+# MountPositionProvider runs the mount's 'where' command ([device]
+# where_command, 'tx where' at SEO) at most once per [device]
+# position_interval seconds and parses altitude, azimuth, RA and Dec out of
+# it in one pass. Altitude, Azimuth, RightAscension and Declination are all
+# served from that snapshot. When the snapshot is too old the first caller
+# runs the command and any others arriving meanwhile wait for its result
+# instead of starting their own.
+#
+# The output is read as key=value words, e.g.
+#   done where ra=05:34:31.9 dec=+22:00:52 alt=54.31 az=123.40 ...
+# ra is in hours and dec, alt and az in degrees, either decimal or
+# sexagesimal (h:m:s / d:m:s). slewing=0/1, if there, says whether the mount
+# is moving (mount.SlewMachine follows slews with it). Other words are ignored.
+
+from collections import namedtuple
+from threading import Condition
+import subprocess
+import time
+
+# time is time.monotonic(), slewing None if the mount didn't say
+Position = namedtuple('Position', 'altitude azimuth right_ascension declination time slewing', defaults=(None,))
+
+# keys in the where output for each Position field
+_KEYS = {
+    'altitude': ('alt', 'altitude'),
+    'azimuth': ('az', 'azimuth'),
+    'right_ascension': ('ra',),
+    'declination': ('dec',),
+}
+
+
+def _number(text: str) -> float:
+    """Decimal or sexagesimal (d:m:s) number"""
+    if ':' not in text:
+        return float(text)
+    parts = text.split(':')
+    sign = -1.0 if parts[0].strip().startswith('-') else 1.0
+    value = 0.0
+    for scale, part in zip((1.0, 60.0, 3600.0), parts):
+        value += abs(float(part)) / scale
+    return sign * value
+
+
+def parse_where(output: str, stamp: float = None) -> Position:
+    """Position from the where command's output. ValueError if a field is missing."""
+    words = dict(word.split('=', 1) for word in output.split() if '=' in word)
+    values = {}
+    for field, keys in _KEYS.items():
+        for key in keys:
+            if key in words:
+                values[field] = _number(words[key])
+                break
+        else:
+            raise ValueError(f'No {field} in mount position {output.strip()!r}')
+    if 'slewing' in words:
+        values['slewing'] = words['slewing'] not in ('0', 'false', 'no')
+    return Position(time=time.monotonic() if stamp is None else stamp, **values)
+
+
+class MountPositionProvider:
+    """Mount position, refreshed by running a command at most once per interval"""
+    def __init__(self, command: str, interval: float = 1.0, timeout: float = 5.0):
+        self.command = command
+        self.interval = interval
+        self.timeout = timeout
+        self.refreshes = 0              # times the command was run
+        self._cond = Condition()
+        self._position = None
+        self._refreshing = False
+        self._error = None              # exception of the last refresh, handed to its waiters
+
+    def _run_command(self) -> Position:
+        process = subprocess.run(self.command.split(), stdout=subprocess.PIPE,
+                                 timeout=self.timeout, check=True)
+        return parse_where(process.stdout.decode('utf-8'))
+
+    def invalidate(self):
+        """Make the next get() run the command, e.g. after the mount was told to move"""
+        with self._cond:
+            if not self._refreshing:
+                self._position = None
+
+    def get(self) -> Position:
+        """The cached position, refreshed first if it is older than interval"""
+        with self._cond:
+            position = self._position
+            if position is not None and time.monotonic() - position.time < self.interval:
+                return position
+            if self._refreshing:        # someone else is running the command, share their result
+                while self._refreshing:
+                    self._cond.wait()
+                if self._position is not position:
+                    return self._position
+                raise self._error
+            self._refreshing = True
+            self._error = None
+        try:
+            position = self._run_command()
+        except Exception as ex:
+            with self._cond:
+                self._error = ex
+                self._refreshing = False
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._position = position
+            self.refreshes += 1
+            self._refreshing = False
+            self._cond.notify_all()
+        return position
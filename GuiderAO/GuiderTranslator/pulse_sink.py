@@ -0,0 +1,265 @@
+# pulse_sink.py - Where guide pulses go after PulseGuide has started them.
+#
+# TelescopeDevice.pulse_guide hands each pulse to a PulsePipeline, which only
+# appends it to a bounded queue, so the responder never waits on a file or
+# on the mount. A worker thread takes the queued pulses in batches and gives
+# each batch to every sink:
+#
+#   FileSink         - appends DIRECTION=..\tDURATION=.. lines to a file (the
+#                      old output.txt), one write and flush per batch
+#   MountCommandSink - runs [device] pulse_command once per pulse to move
+#                      the mount, a format string like
+#                      '<program> {direction} {duration}'
+#   GuideAggregator  - nets the pulses of each [device] guide_window seconds
+#                      into one RA/Dec offset and runs [device] guide_command
+#                      once for it
+#
+# When the queue is full a new pulse is merged into the newest queued pulse
+# on the same axis (N 100 ms + S 40 ms -> N 60 ms) and counted as coalesced.
+# If there is none it is dropped and counted. stats() reports the counts.
+
+from collections import deque, namedtuple
+from logging import Logger
+from threading import Condition, Thread
+import subprocess
+import time
+
+from telescope_device import DIRECTION_NAMES, PULSE_AXES
+
+Pulse = namedtuple('Pulse', 'direction duration time')     # direction 0-3 (GuideDirections), ms, time.time()
+
+_SIGN = {0: 1, 1: -1, 2: 1, 3: -1}     # N and E positive, for coalescing
+
+
+def coalesce(older: Pulse, newer: Pulse) -> Pulse:
+    """One pulse with the net motion of two pulses on the same axis"""
+    net = _SIGN[older.direction] * older.duration + _SIGN[newer.direction] * newer.duration
+    positive = older.direction - older.direction % 2   # N or E
+    return Pulse(positive if net >= 0 else positive + 1, abs(net), newer.time)
+
+
+class FileSink:
+    """Appends each batch of pulses to a text file"""
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = open(filename, 'a', buffering=64 * 1024)
+
+    def write(self, pulses: list):
+        self._file.write(''.join(f'DIRECTION={p.direction}\tDURATION={p.duration}\n' for p in pulses))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class MountCommandSink:
+    """Forwards each pulse to the mount by running a command
+
+    The command is a format string with {direction} (N/S/E/W), {code} (0-3)
+    and {duration} (ms). It is split on spaces and run without a shell.
+    """
+    def __init__(self, command: str, timeout: float = 5.0):
+        self.command = command
+        self.timeout = timeout
+
+    def write(self, pulses: list):
+        for p in pulses:
+            args = self.command.format(direction=DIRECTION_NAMES[p.direction], code=p.direction,
+                                       duration=p.duration).split()
+            subprocess.run(args, timeout=self.timeout, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def close(self):
+        pass
+
+
+class GuideAggregator:
+    """Sends the net correction of each window of pulses as one mount command
+
+    MaxIm sends a pulse per axis every guide cycle, and opposing pulses
+    partly cancel. The first pulse after a quiet spell opens a window of
+    window seconds. When it ends the pulses are netted per axis (N and E
+    positive), each axis is clamped to clamp_ms, and the command is run
+    once, unless everything cancelled out. The command is a format string
+    with {ra_ms} and {dec_ms} (signed ms) and {ra_arcsec} and {dec_arcsec}
+    (the same at the guide rates rates() returns, in degrees per second).
+    """
+    def __init__(self, command: str, logger: Logger, window: float = 0.5, clamp_ms: int = 2000,
+                 rates=lambda: (0.005, 0.005), timeout: float = 5.0):
+        self.command = command
+        self.logger = logger
+        self.window = window
+        self.clamp_ms = clamp_ms
+        self.rates = rates
+        self.timeout = timeout
+        self._cond = Condition()
+        self._net = {'ra': 0, 'dec': 0}
+        self._count = 0                 # pulses in the open window
+        self._deadline = None           # time.monotonic() the open window ends, None if none is open
+        self._closed = False
+        self._counts = {'pulses': 0, 'commands': 0, 'cancelled': 0, 'clamped': 0, 'max_replaced': 0, 'errors': 0,
+                        'pulse_ms': 0, 'sent_ms': 0}
+        self._worker = Thread(target=self._run, name='guide-aggregator', daemon=True)
+        self._worker.start()
+
+    def write(self, pulses: list):
+        with self._cond:
+            for p in pulses:
+                self._net[PULSE_AXES[p.direction]] += _SIGN[p.direction] * p.duration
+            self._count += len(pulses)
+            self._counts['pulses'] += len(pulses)
+            self._counts['pulse_ms'] += sum(p.duration for p in pulses)
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.window
+                self._cond.notify()
+
+    def stats(self) -> dict:
+        """Pulses in, commands out, windows that cancelled out, commands clamped, pulses per
+        command, and the ms of pulses in against the ms sent after netting"""
+        with self._cond:
+            counts = dict(self._counts)
+        counts['replaced_per_command'] = round(counts['pulses'] / counts['commands'], 2) if counts['commands'] else 0
+        return counts
+
+    def _take(self) -> tuple:
+        # Under the lock: the open window's net per axis and pulse count, and start over
+        net, count = self._net, self._count
+        self._net = {'ra': 0, 'dec': 0}
+        self._count = 0
+        self._deadline = None
+        return net, count
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (self._deadline is None or time.monotonic() < self._deadline):
+                    self._cond.wait(None if self._deadline is None else self._deadline - time.monotonic())
+                if self._closed and self._deadline is None:
+                    return
+                net, count = self._take()
+            self._send(net, count)
+
+    def _send(self, net: dict, count: int):
+        clamped = False
+        for axis in net:
+            if abs(net[axis]) > self.clamp_ms:
+                net[axis] = self.clamp_ms if net[axis] > 0 else -self.clamp_ms
+                clamped = True
+        if net['ra'] == 0 and net['dec'] == 0:
+            with self._cond:
+                self._counts['cancelled'] += 1
+            return
+        ra_rate, dec_rate = self.rates()
+        args = self.command.format(ra_ms=net['ra'], dec_ms=net['dec'],
+                                   ra_arcsec=round(net['ra'] / 1000 * ra_rate * 3600, 3),
+                                   dec_arcsec=round(net['dec'] / 1000 * dec_rate * 3600, 3)).split()
+        try:
+            subprocess.run(args, timeout=self.timeout, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception as ex:
+            with self._cond:
+                self._counts['errors'] += 1
+            self.logger.error('Guide command failed: %s', ex)
+            return
+        with self._cond:
+            self._counts['commands'] += 1
+            self._counts['clamped'] += clamped
+            self._counts['sent_ms'] += abs(net['ra']) + abs(net['dec'])
+            self._counts['max_replaced'] = max(self._counts['max_replaced'], count)
+
+    def close(self):
+        """Send the open window now and stop"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join(self.timeout)
+
+
+class PulsePipeline:
+    """Bounded queue of pulses and the worker thread feeding them to the sinks"""
+    def __init__(self, sinks: list, logger: Logger, maxlen: int = 64, batch: int = 32):
+        self.sinks = sinks
+        self.logger = logger
+        self.maxlen = maxlen
+        self.batch = batch
+        self._pending = deque()
+        self._swaps = []                # (old, new) sinks for the worker to swap between batches
+        self._cond = Condition()
+        self._closed = False
+        self._counts = {'submitted': 0, 'written': 0, 'coalesced': 0, 'dropped': 0, 'errors': 0}
+        self._worker = Thread(target=self._run, name='pulse-sink', daemon=True)
+        self._worker.start()
+
+    def submit(self, direction: int, duration: int) -> bool:
+        """Queue a pulse without waiting. False if it had to be dropped."""
+        pulse = Pulse(direction, duration, time.time())
+        with self._cond:
+            self._counts['submitted'] += 1
+            if len(self._pending) < self.maxlen:
+                self._pending.append(pulse)
+                self._cond.notify()
+                return True
+            axis = PULSE_AXES[direction]
+            for index in range(len(self._pending) - 1, -1, -1):    # newest first
+                if PULSE_AXES[self._pending[index].direction] == axis:
+                    self._pending[index] = coalesce(self._pending[index], pulse)
+                    self._counts['coalesced'] += 1
+                    return True
+            self._counts['dropped'] += 1
+            return False
+
+    def stats(self) -> dict:
+        """Pulses submitted, queued now, written to the sinks, coalesced, dropped, and sink errors,
+        plus the stats of a sink that has them (GuideAggregator) under its class name"""
+        with self._cond:
+            stats = {**self._counts, 'queued': len(self._pending)}
+        for sink in self.sinks:
+            if hasattr(sink, 'stats'):
+                stats[sink.__class__.__name__] = sink.stats()
+        return stats
+
+    def replace_sink(self, old, new):
+        """Swap sink old for new, either may be None. The worker does it between
+        batches and then closes old, so no batch is half written to a closed sink."""
+        with self._cond:
+            if not self._closed:
+                self._swaps.append((old, new))
+                self._cond.notify()
+                return
+        if new is not None:             # too late, nothing would write to it
+            new.close()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed and not self._swaps:
+                    self._cond.wait()
+                swaps, self._swaps = self._swaps, []
+                for old, new in swaps:
+                    self.sinks = [sink for sink in self.sinks if sink is not old] + ([new] if new is not None else [])
+                pulses = [self._pending.popleft() for _ in range(min(self.batch, len(self._pending)))]
+            for old, new in swaps:
+                if old is not None:
+                    old.close()         # a GuideAggregator sends its open window first
+            if not pulses:
+                if swaps:
+                    continue
+                return                  # closed and drained
+            for sink in self.sinks:
+                try:
+                    sink.write(pulses)
+                except Exception as ex:
+                    with self._cond:
+                        self._counts['errors'] += 1
+                    self.logger.error(f'{sink.__class__.__name__} failed: {ex}')
+            with self._cond:
+                self._counts['written'] += len(pulses)
+
+    def close(self, timeout: float = 5.0):
+        """Write what is still queued, then stop the worker and close the sinks"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join(timeout)
+        for sink in self.sinks:
+            sink.close()
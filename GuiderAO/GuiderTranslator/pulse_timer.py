@@ -0,0 +1,131 @@
+# pulse_timer.py - Ends guide pulses on time, and keeps score of how well.
+#
+# TelescopeDevice.pulse_guide used a threading.Timer per pulse, which wakes
+# up whenever the OS gets round to it: a few ms late is common and at 10-50 ms
+# guide pulses that is a large part of the pulse. PulseTimer has one thread
+# for all pulses. It sleeps until [device] pulse_spin_ms before the next
+# pulse ends, then spins on time.perf_counter_ns (yielding the GIL) until
+# the end, and calls the pulse's callback.
+#
+# Every pulse that ran to its end is recorded as requested vs actual length,
+# and stats() gives the percentiles of the error in microseconds over the
+# last `history` pulses (the pulsetiming Action).
+
+from collections import deque
+from logging import Logger
+from threading import Condition, Thread
+import heapq
+import itertools
+import time
+
+
+class TimedPulse:
+    """One running pulse, what PulseTimer.start() returns"""
+    __slots__ = ('end_ns', 'start_ns', 'duration_ms', 'callback', 'tag', 'cancelled', 'ended')
+
+    def __init__(self, start_ns: int, duration_ms: float, callback, tag):
+        self.start_ns = start_ns
+        self.duration_ms = duration_ms
+        self.end_ns = start_ns + int(duration_ms * 1_000_000)
+        self.callback = callback        # called as callback(pulse) when it ends
+        self.tag = tag                  # anything the caller wants back, e.g. the axis
+        self.cancelled = False
+        self.ended = False
+
+
+def percentiles(values: list, points=(50, 90, 99)) -> dict:
+    """{'p50': .., 'p90': .., 'p99': .., 'min': .., 'max': ..} of a list of numbers"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    out = {f'p{p}': ordered[min(len(ordered) - 1, len(ordered) * p // 100)] for p in points}
+    out['min'] = ordered[0]
+    out['max'] = ordered[-1]
+    return out
+
+
+class PulseTimer:
+    """One thread ending every pulse, sleep then spin"""
+    def __init__(self, spin_ms: float = 2.0, history: int = 10000, logger: Logger = None):
+        self.logger = logger
+        self.spin_ns = int(spin_ms * 1_000_000)
+        self._cond = Condition()
+        self._heap = []                 # (end_ns, seq, TimedPulse)
+        self._seq = itertools.count()
+        self._closed = False
+        self._errors = deque(maxlen=history)    # actual - requested, ns
+        self._counts = {'ended': 0, 'cancelled': 0}
+        self._worker = Thread(target=self._run, name='pulse-timer', daemon=True)
+        self._worker.start()
+
+    def start(self, duration_ms: float, callback, tag=None) -> TimedPulse:
+        """Start a pulse now, callback(pulse) is called duration_ms later on the timer thread"""
+        pulse = TimedPulse(time.perf_counter_ns(), duration_ms, callback, tag)
+        with self._cond:
+            heapq.heappush(self._heap, (pulse.end_ns, next(self._seq), pulse))
+            if self._heap[0][2] is pulse:           # ends before whatever we were waiting for
+                self._cond.notify()
+        return pulse
+
+    def cancel(self, pulse: TimedPulse):
+        """Drop a pulse that has not ended yet, its callback is not called"""
+        with self._cond:
+            if not pulse.cancelled and not pulse.ended:
+                pulse.cancelled = True
+                self._counts['cancelled'] += 1
+
+    def stats(self) -> dict:
+        """Pulses ended and cancelled, and the error of the recent ones in microseconds"""
+        with self._cond:
+            errors = list(self._errors)
+            counts = dict(self._counts)
+        counts['error_us'] = {k: round(v / 1000, 1) for k, v in percentiles(errors).items()}
+        return counts
+
+    def _due(self) -> int:
+        # Under the lock: wait until the next pulse is within spin_ns of its
+        # end and return that end, or None once closed
+        while True:
+            if self._closed:
+                return None
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                self._cond.wait()
+                continue
+            end_ns = self._heap[0][0]
+            remaining = end_ns - time.perf_counter_ns()
+            if remaining <= self.spin_ns:
+                return end_ns
+            self._cond.wait((remaining - self.spin_ns) / 1e9)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                end_ns = self._due()
+            if end_ns is None:
+                return
+            while time.perf_counter_ns() < end_ns:
+                time.sleep(0)           # Spin, but let the request threads have the GIL
+            now = time.perf_counter_ns()
+            ended = []
+            with self._cond:
+                while self._heap and self._heap[0][0] <= now:
+                    pulse = heapq.heappop(self._heap)[2]
+                    if not pulse.cancelled:
+                        pulse.ended = True
+                        ended.append(pulse)
+                        self._errors.append(now - pulse.end_ns)
+                self._counts['ended'] += len(ended)
+            for pulse in ended:
+                try:
+                    pulse.callback(pulse)
+                except Exception as ex:
+                    if self.logger is not None:
+                        self.logger.error('Pulse end callback failed: %s', ex)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join(1.0)
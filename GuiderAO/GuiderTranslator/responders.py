@@ -0,0 +1,222 @@
+# responders.py - Alpaca responders generated from a table.
+#
+# A device module lists its endpoints as Property and Method entries and
+# make_responders() turns them into Falcon responders, {endpoint: responder}
+# for app.init_routes. Each responder does what the hand-written classes did:
+# the PreProcessRequest checks, the Connected check, parsing the fields,
+# calling the device, and answering with a PropertyResponse/MethodResponse
+# that carries the Alpaca error if anything failed. A device call that raises
+# NotImplementedError is answered with NotImplementedException.
+#
+# A constant Property is read once, when the responders are made, and its
+# success response is kept as a JSON template. A GET then only fills in the
+# two transaction IDs.
+
+from falcon import HTTPError, Request, Response
+from exceptions import (DriverException, InvalidValueException,
+                        NotConnectedException, NotImplementedException)
+from shr import (MethodResponse, PropertyResponse, get_request_field, getNextTransId, log_value,
+                 response_json)
+import shr
+
+
+class AlpacaError(Exception):
+    """Raised by a device call to answer with a particular Alpaca error
+
+    ``error`` is one of the exception classes in exceptions.py, e.g.
+    ``raise AlpacaError(InvalidOperationException('Parked'))``.
+    """
+    def __init__(self, error):
+        super().__init__(error.Message)
+        self.error = error
+
+
+class Property:
+    """An Alpaca property: GET reads it, PUT (if it has a field) sets it.
+
+    Args:
+        name:       Endpoint, lower case (e.g. 'canslew')
+        attr:       Device attribute read by GET and set by PUT
+        value:      Fixed value instead of attr
+        field:      Form field holding the new value for PUT, None for read-only
+        parse:      Converts the field text. ValueError -> InvalidValueException
+        settable:   False if a PUT is routed but answers NotImplementedException
+        constant:   Value never changes, GET is served from a template
+        connection: False if it works while disconnected
+        implemented: False to answer NotImplementedException
+    """
+    __slots__ = ('name', 'attr', 'value', 'field', 'parse', 'settable', 'constant', 'connection', 'implemented')
+
+    def __init__(self, name: str, attr: str = None, value=None, field: str = None, parse=None,
+                 settable: bool = True, constant: bool = False, connection: bool = True,
+                 implemented: bool = True):
+        self.name = name
+        self.attr = attr
+        self.value = value
+        self.field = field
+        self.parse = parse
+        self.settable = settable
+        self.constant = constant
+        self.connection = connection
+        self.implemented = implemented
+
+
+class Method:
+    """An Alpaca method, a PUT with fields that calls the device.
+
+    Args:
+        name:       Endpoint, lower case (e.g. 'pulseguide')
+        call:       Device method name, or a function, called with the parsed
+                    fields in order. What it returns is the response Value.
+                    None for a placeholder that succeeds without doing anything.
+        fields:     (field name, parse) pairs, or (field name, parse, default)
+                    for optional ones
+        connection: False if it works while disconnected
+        implemented: False to answer NotImplementedException
+    """
+    __slots__ = ('name', 'call', 'fields', 'connection', 'implemented')
+
+    def __init__(self, name: str, call: str = None, fields: tuple = (), connection: bool = True,
+                 implemented: bool = True):
+        self.name = name
+        self.call = call
+        self.fields = fields
+        self.connection = connection
+        self.implemented = implemented
+
+
+def _template(value) -> str:
+    # PropertyResponse.json with the transaction IDs left as %d. The IDs come
+    # first, so the first -1 and -2 in the JSON are them.
+    body = response_json(-1, -2, value, 0, '').replace('%', '%%')
+    return body.replace('-1', '%d', 1).replace('-2', '%d', 1)
+
+
+class _Responder:
+    def __init__(self, spec, device, devtype: str, preprocess):
+        self.spec = spec
+        self.device = device
+        self.preprocess = preprocess        # shr.PreProcessRequest for this device type
+        self.failed = f'{devtype}.{spec.name.capitalize()} failed'
+
+    @staticmethod
+    def _error(req: Request, error) -> str:
+        if req.method == 'GET':
+            return PropertyResponse(None, req, error).json
+        return MethodResponse(req, error).json
+
+    def _not_ready(self, req: Request):
+        # The error answer if the device can't be used right now, else None
+        if not self.spec.implemented:
+            return self._error(req, NotImplementedException())
+        if self.spec.connection and not self.device.connected:
+            return self._error(req, NotConnectedException())
+        return None
+
+    def _parse(self, req: Request, field: str, parse, default=None):
+        text = get_request_field(field, req, default=default)   # Raises 400 bad request if missing
+        try:
+            return parse(text)
+        except ValueError as ex:
+            raise AlpacaError(InvalidValueException(f'{field} "{text}" not valid: {ex}'))
+
+
+class PropertyResponder(_Responder):
+    def __init__(self, spec: Property, device, devtype: str, preprocess):
+        super().__init__(spec, device, devtype, preprocess)
+        self.template = None
+        if spec.constant and spec.implemented:
+            self.value = self._read()
+            self.template = _template(self.value)
+
+    def _read(self):
+        if self.spec.attr is None:
+            return self.spec.value
+        return getattr(self.device, self.spec.attr)
+
+    def on_get(self, req: Request, resp: Response, devnum: int):
+        self.preprocess(req, resp, self, {'devnum': devnum})
+        error = self._not_ready(req)
+        if error is not None:
+            resp.text = error
+            return
+        if self.template is not None:
+            client_id = int(get_request_field('ClientTransactionID', req, False, 0))
+            resp.text = self.template % (getNextTransId(), client_id)
+            log_value(req, self.value)
+            return
+        try:
+            resp.text = PropertyResponse(self._read(), req).json
+        except AlpacaError as ex:
+            resp.text = PropertyResponse(None, req, ex.error).json
+        except Exception as ex:
+            resp.text = PropertyResponse(None, req, DriverException(0x500, self.failed, ex)).json
+
+
+class SettablePropertyResponder(PropertyResponder):
+    def on_put(self, req: Request, resp: Response, devnum: int):
+        self.preprocess(req, resp, self, {'devnum': devnum})
+        error = self._not_ready(req)
+        if error is not None:
+            resp.text = error
+            return
+        if not self.spec.settable:
+            resp.text = MethodResponse(req, NotImplementedException(f'{self.spec.field} cannot be set')).json
+            return
+        try:
+            value = self._parse(req, self.spec.field, self.spec.parse)
+            setattr(self.device, self.spec.attr, value)
+            shr.logger.info('%s set to %s', self.spec.field, value)
+            resp.text = MethodResponse(req).json
+        except AlpacaError as ex:
+            resp.text = MethodResponse(req, ex.error).json
+        except HTTPError:
+            raise                           # 400 Bad Request for a missing field or bad bool
+        except Exception as ex:
+            resp.text = MethodResponse(req, DriverException(0x500, self.failed, ex)).json
+
+
+class MethodResponder(_Responder):
+    def on_put(self, req: Request, resp: Response, devnum: int):
+        self.preprocess(req, resp, self, {'devnum': devnum})
+        error = self._not_ready(req)
+        if error is not None:
+            resp.text = error
+            return
+        try:
+            args = [self._parse(req, *field) for field in self.spec.fields]
+            value = None
+            call = self.spec.call
+            if isinstance(call, str):
+                value = getattr(self.device, call)(*args)
+            elif call is not None:
+                value = call(*args)
+            resp.text = MethodResponse(req, value=value).json
+        except AlpacaError as ex:
+            resp.text = MethodResponse(req, ex.error).json
+        except NotImplementedError as ex:       # e.g. a slew while CanSlew is false
+            resp.text = MethodResponse(req, NotImplementedException(str(ex))).json
+        except HTTPError:
+            raise                           # 400 Bad Request for a missing field or bad bool
+        except Exception as ex:
+            resp.text = MethodResponse(req, DriverException(0x500, self.failed, ex)).json
+
+
+def make_responders(table: list, device, devtype: str, preprocess) -> dict:
+    """{endpoint name: responder} for each Property/Method in table
+
+    Args:
+        table:      Property and Method entries
+        device:     Object the attrs and calls are looked up on
+        devtype:    'Telescope' etc., for the error messages
+        preprocess: shr.PreProcessRequest(maxdev) run before every request
+    """
+    responders = {}
+    for spec in table:
+        if isinstance(spec, Method):
+            responders[spec.name] = MethodResponder(spec, device, devtype, preprocess)
+        elif spec.field is not None:
+            responders[spec.name] = SettablePropertyResponder(spec, device, devtype, preprocess)
+        else:
+            responders[spec.name] = PropertyResponder(spec, device, devtype, preprocess)
+    return responders
@@ -58,11 +58,11 @@
 # 01-Jun-2023   rbd 0.3 Issue #2 Do not return empty Value field in property
 #               response, and omit Value if error is not success().
 
-from threading import Lock
+import itertools
 from exceptions import Success
 import json
 from falcon import Request, Response, HTTPBadRequest
-from logging import Logger
+from logging import INFO, Logger
 
 logger: Logger = None
 #logger = None                   # Safe on Python 3.7 but no intellisense in VSCode etc.
@@ -73,6 +73,14 @@ def set_shr_logger(lgr):
     global logger
     logger = lgr
 
+# Set by log.init_logging(). record_fields: put remote, method, endpoint and
+# value on the request/value records (only the JSON format writes them, and
+# extra= costs as much again as the rest of logger.info). sampler: a
+# log.PollSampler that decides before the record is made whether a polled
+# endpoint's line is logged at all.
+record_fields = False
+sampler = None
+
 # --------------------------
 # Alpaca Device/Server Info
 # --------------------------
@@ -102,39 +110,95 @@ def to_bool(str: str) -> bool:
 # caseless (mostly for the ClientID and ClientTransactionID)
 # ---------------------------------------------------------
 def get_request_field(name: str, req: Request, caseless: bool = False, default: str = None) -> str:
-    bad_desc = f'Missing, empty, or misspelled parameter "{name}"'
-    lcName = name.lower()
-    if req.method == 'GET':
-        for param in req.params.items():        # [name,value] tuples
-            if param[0].lower() == lcName:
-                return param[1]
-        if default == None:
-            raise HTTPBadRequest(title=_bad_title, description=bad_desc)                # Missing or incorrect casing
-        return default                          # not in args, return default
+    fields = getattr(req.context, 'fields', None)
+    if fields is None:                          # First lookup in this request
+        fields = request_fields(req)
+    if req.method == 'GET' or caseless:         # GET is always caseless
+        value = fields.get_caseless(name)
+        if value is not None:
+            return value
     else:                                       # Assume PUT since we never route other methods
-        formdata = req.get_media()
-        if caseless:
-            for fn in formdata.keys():
-                if fn.lower() == lcName:
-                    return formdata[fn]
-        else:
-            if name in formdata and formdata[name] != '':
-                return formdata[name]
-        if default == None:
-            raise HTTPBadRequest(title=_bad_title, description=bad_desc)                # Missing or incorrect casing
-        return default
+        value = fields.exact.get(name)
+        if value is not None and value != '':
+            return value
+    if default == None:
+        bad_desc = f'Missing, empty, or misspelled parameter "{name}"'
+        raise HTTPBadRequest(title=_bad_title, description=bad_desc)                    # Missing or incorrect casing
+    return default
+
+#
+# The query parameters (GET) or form fields (PUT) of a request, read once and
+# kept in req.context.fields. PreProcessRequest, the responder and the
+# Property/MethodResponse all look fields up here, so the form isn't fetched
+# and the parameters aren't scanned again for every field.
+#
+class RequestFields:
+    """A request's fields as given (exact), looked up by exact or any case"""
+    __slots__ = ('exact', '_caseless')
+
+    def __init__(self, data: dict):
+        self.exact = data
+        self._caseless = None           # by lower-cased name, made on the first miss in exact
+
+    def get_caseless(self, name: str):
+        # Clients nearly always send the names as the spec spells them, so
+        # try that first and only fold the case when it isn't there
+        value = self.exact.get(name)
+        if value is not None:
+            return value
+        caseless = self._caseless
+        if caseless is None:
+            caseless = self._caseless = {}
+            for field, value in self.exact.items():
+                caseless.setdefault(field.lower(), value)   # First one wins, as in the old scan
+        return caseless.get(name.lower())
+
+def request_fields(req: Request) -> RequestFields:
+    fields = getattr(req.context, 'fields', None)
+    if fields is None:
+        fields = req.context.fields = RequestFields(req.params if req.method == 'GET' else get_form(req))
+    return fields
+
+#
+# PUT form data. The ASGI engine reads it before the responder runs
+# (req.get_media() is a coroutine there), see asgi_engine.ThreadedResource
+#
+def get_form(req: Request) -> dict:
+    form = getattr(req.context, 'form', None)
+    if form is None:
+        return req.get_media()
+    return form
 
 #
 # Log the request as soon as the resource handler gets it so subsequent
 # logged messages are in the right order. Logs PUT body as well.
 #
 def log_request(req: Request):
-    msg = f'{req.remote_addr} -> {req.method} {req.path}'
+    if not logger.isEnabledFor(INFO):
+        return
+    remote = req.remote_addr
+    endpoint = _endpoint(req)
+    fields = {'remote': remote, 'method': req.method, 'endpoint': endpoint} if record_fields else None
     if req.query_string != '':
-        msg += f'?{req.query_string}'
-    logger.info(msg)
+        _log_info(endpoint, fields, '%s -> %s %s?%s', remote, req.method, req.path, req.query_string)
+    else:
+        _log_info(endpoint, fields, '%s -> %s %s', remote, req.method, req.path)
     if req.method == 'PUT' and req.content_length != 0:
-        logger.info(f'{req.remote_addr} -> {req.media}')
+        _log_info(endpoint, fields, '%s -> %s', remote, get_form(req))
+
+def _endpoint(req: Request) -> str:
+    return req.path.rsplit('/', 1)[-1].lower()
+
+def _log_info(endpoint: str, fields: dict, msg: str, *args):
+    # logger.info(), unless the sampler leaves this line out
+    if sampler is not None and endpoint in sampler.endpoints:
+        skipped = sampler.allow(endpoint, msg)
+        if skipped is None:
+            return
+        if skipped:
+            msg += ' (%d more not logged)'
+            args += (skipped,)
+    logger.info(msg, *args, extra=fields)
 
 # ------------------------------------------------
 # Incoming Pre-Logging and Request Quality Control
@@ -194,14 +258,32 @@ class PreProcessRequest():
     # and format converter. This is the device number from the URI
     #
     def __call__(self, req: Request, resp: Response, resource, params):
+        request_fields(req)                         # Parse the fields once, for every lookup after this
         log_request(req)                            # Log even a bad request
         self._check_request(req, params['devnum'])   # Raises to 400 error on check failure
 
+# -------------
+# JSON Encoding
+# -------------
+# orjson if it is installed (pip install orjson), it is several times
+# faster than the json module for these small responses. Same JSON either way
+# except orjson leaves out the spaces after : and ,
+try:
+    import orjson
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    orjson = None
+    dumps = json.dumps
+
 # ------------------
 # PropertyResponse
 # ------------------
 class PropertyResponse():
     """JSON response for an Alpaca Property (GET) Request"""
+    __slots__ = ('ServerTransactionID', 'ClientTransactionID', 'Value', 'ErrorNumber', 'ErrorMessage')
+
     def __init__(self, value, req: Request, err = Success()):
         """Initialize a ``PropertyResponse`` object.
 
@@ -217,22 +299,26 @@ class PropertyResponse():
         """
         self.ServerTransactionID = getNextTransId()
         self.ClientTransactionID = int(get_request_field('ClientTransactionID', req, False, 0))  #Caseless on GET
+        self.Value = None
         if err.Number == 0 and not value is None:
             self.Value = value
-            logger.info(f'{req.remote_addr} <- {str(value)}')
+            log_value(req, value)
         self.ErrorNumber = err.Number
         self.ErrorMessage = err.Message
 
     @property
     def json(self) -> str:
         """Return the JSON for the Property Response"""
-        return json.dumps(self.__dict__)
+        return response_json(self.ServerTransactionID, self.ClientTransactionID, self.Value,
+                             self.ErrorNumber, self.ErrorMessage)
 
 # --------------
 # MethodResponse
 # --------------
 class MethodResponse():
     """JSON response for an Alpaca Method (PUT) Request"""
+    __slots__ = ('ServerTransactionID', 'ClientTransactionID', 'Value', 'ErrorNumber', 'ErrorMessage')
+
     def __init__(self, req: Request, err = Success(), value = None): # value useless unless Success
         """Initialize a MethodResponse object.
 
@@ -249,9 +335,10 @@ class MethodResponse():
         # This is crazy ... if casing is incorrect here, we're supposed to return the default 0
         # even if the caseless check coming in returned a valid number. This is for PUT only.
         self.ClientTransactionID = int(get_request_field('ClientTransactionID', req, False, 0))
+        self.Value = None
         if err.Number == 0 and not value is None:
             self.Value = value
-            logger.info(f'{req.remote_addr} <- {str(value)}')
+            log_value(req, value)
         self.ErrorNumber = err.Number
         self.ErrorMessage = err.Message
 
@@ -259,17 +346,37 @@ class MethodResponse():
     @property
     def json(self) -> str:
         """Return the JSON for the Method Response"""
-        return json.dumps(self.__dict__)
+        return response_json(self.ServerTransactionID, self.ClientTransactionID, self.Value,
+                             self.ErrorNumber, self.ErrorMessage)
+
+#
+# The response JSON, leaving out Value if it is None (Issue #2 above)
+#
+def response_json(server_id: int, client_id: int, value, number: int, message: str) -> str:
+    if value is None:
+        return dumps({'ServerTransactionID': server_id, 'ClientTransactionID': client_id,
+                      'ErrorNumber': number, 'ErrorMessage': message})
+    return dumps({'ServerTransactionID': server_id, 'ClientTransactionID': client_id,
+                  'Value': value, 'ErrorNumber': number, 'ErrorMessage': message})
+
+#
+# Log a returned value at INFO. Nothing is formatted when INFO is off, and
+# otherwise only on log.py's listener thread.
+#
+def log_value(req: Request, value):
+    if logger.isEnabledFor(INFO):
+        remote = req.remote_addr
+        endpoint = _endpoint(req)
+        fields = {'remote': remote, 'endpoint': endpoint, 'value': value} if record_fields else None
+        _log_info(endpoint, fields, '%s <- %s', remote, value)
 
 
 # -------------------------------
 # Thread-safe ServerTransactionID
 # -------------------------------
-_lock = Lock()
-_stid = 0
+# next() on an itertools.count is a single C call, so two threads can't get
+# the same ID, and no lock is needed
+_stid = itertools.count(1)
 
 def getNextTransId() -> int:
-    with _lock:
-        global _stid
-        _stid += 1
-    return _stid
+    return next(_stid)
@@ -0,0 +1,44 @@
+# startup.py - Where the translator's startup time goes.
+#
+# app.py imports this before anything else and marks each step of getting
+# the Alpaca endpoint up (imports, logging, discovery, routes, the server
+# socket). The total is logged with the ==STARTUP== line, and
+# `python app.py --profile-startup` prints the whole table, times the first
+# requests and exits instead of serving. Python's own startup, before
+# app.py runs, isn't in it; `python -X importtime app.py --profile-startup`
+# breaks the imports down further.
+
+import time
+
+
+class StartupProfile:
+    """Time between marks since this module was imported"""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._last = self.start
+        self.steps = []                 # (what, seconds)
+
+    def mark(self, what: str):
+        """The time since the last mark went into what"""
+        now = time.perf_counter()
+        self.steps.append((what, now - self._last))
+        self._last = now
+
+    def total(self) -> float:
+        return self._last - self.start
+
+    def summary(self) -> str:
+        """One line for the log: total and the slowest steps"""
+        slowest = sorted(self.steps, key=lambda step: -step[1])[:3]
+        return f'{self.total() * 1000:.0f} ms (' + ', '.join(f'{what} {took * 1000:.0f}' for what, took in slowest) + ')'
+
+    def report(self) -> str:
+        total = self.total() or 1e-9
+        lines = [f'{"step":40s} {"ms":>8s} {"share":>6s}']
+        for what, took in self.steps:
+            lines.append(f'{what:40s} {took * 1000:8.1f} {took / total:6.1%}')
+        lines.append(f'{"total":40s} {self.total() * 1000:8.1f}')
+        return '\n'.join(lines)
+
+
+profile = StartupProfile()
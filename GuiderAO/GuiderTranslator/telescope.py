@@ -12,57 +12,22 @@
 #
 # ??-???-????   abc Initial edit
 
-from falcon import Request, Response, HTTPBadRequest, before
 from logging import Logger
 import logging
-from shr import PropertyResponse, MethodResponse, PreProcessRequest, \
-                get_request_field, to_bool
-from exceptions import *        # Nothing but exception classes 
-from telescope_device import TelescopeDevice
-
-def write_numbers_to_file(direction, num1, duration, num2, filename):
-    with open(filename, 'a') as file:
-        file.write(f'DIRECTION={num1}\tDURATION={num2}\n')
-
-# Add a proper logger
-
-logger: Logger = None
-
-def configure_logger(log_file, log_level=logging.INFO):
-    # Create a logger
-    logger = logging.getLogger('my_logger')
-    logger.setLevel(log_level)
-
-    # Create a file handler and set the level to log to the file
-    file_handler = logging.FileHandler(log_file, mode = 'a')
-    file_handler.setLevel(log_level)
-
-    # Create a console handler and set the level to log to the console
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
-
-    # Create a formatter to format the log messages
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-    # Add the formatter to the handlers
-    file_handler.setFormatter(formatter)
-    console_handler.setFormatter(formatter)
-
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-
-    return logger
-
-log_file ='telescope.log'
-logger = configure_logger(log_file)
-
-Logger = logger
-
-#Used to test guider output
-def write_numbers_to_file(dir, dur, filename):
-    with open(filename, 'a') as file:
-        file.write(f'DIRECTION={dir}\tDURATION={dur}\n')
+from shr import PreProcessRequest, to_bool
+from exceptions import ActionNotImplementedException
+from responders import AlpacaError, Method, Property, make_responders
+from telescope_device import TelescopeDevice, PULSE_AXES, SEO_CAPABILITIES
+from pulse_sink import PulsePipeline, FileSink, GuideAggregator, MountCommandSink
+from mount_state import MountPositionProvider
+from mount import SimulatedMount, SlewMachine, TxMount
+from pulse_timer import PulseTimer
+from config import Config
+import json
+
+# The root logger, app.main() sets it (with its queued handlers) before it
+# calls start_telescope_device().
+logger: Logger = logging.getLogger()
 
 
 # ----------------------
@@ -96,1549 +61,219 @@ class TelescopeMetadata:
 # TELESCOPE DEVICE CLASS
 # --------------------
 tel_dev = None
-def start_telescope_device(logger: logger):
-    logger = logger
-    global tel_dev
-    tel_dev = TelescopeDevice(logger)
-
-start_telescope_device(logger)
-# --------------------
-# RESOURCE CONTROLLERS
-# --------------------
-
-dummy = True #TODO: Replace all "if not dummy" with queries to see if telescope is available
-@before(PreProcessRequest(maxdev))
-class Action:
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        resp.text = MethodResponse(req, NotImplementedException()).json
-
-@before(PreProcessRequest(maxdev))
-class CommandBlind:
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        resp.text = MethodResponse(req, NotImplementedException()).json
-
-@before(PreProcessRequest(maxdev))
-class CommandBool:
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        resp.text = MethodResponse(req, NotImplementedException()).json
-
-@before(PreProcessRequest(maxdev))
-class CommandString():
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        resp.text = MethodResponse(req, NotImplementedException()).json
-
-@before(PreProcessRequest(maxdev))
-class Description():
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        resp.text = PropertyResponse(TelescopeMetadata.Description, req).json
-
-@before(PreProcessRequest(maxdev))
-class DriverInfo():
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        resp.text = PropertyResponse(TelescopeMetadata.Info, req).json
-
-@before(PreProcessRequest(maxdev))
-class InterfaceVersion():
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        resp.text = PropertyResponse(TelescopeMetadata.InterfaceVersion, req).json
-
-@before(PreProcessRequest(maxdev))
-class DriverVersion():
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        resp.text = PropertyResponse(TelescopeMetadata.Version, req).json
-
-@before(PreProcessRequest(maxdev))
-class Name():
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        resp.text = PropertyResponse(TelescopeMetadata.Name, req).json
-
-@before(PreProcessRequest(maxdev))
-class SupportedActions():
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        resp.text = PropertyResponse([], req).json  # Not PropertyNotImplemented
-
-@before(PreProcessRequest(maxdev))
-class connected:
-    """
-    Retrieves or sets the connected state of the device
-
-    * Set True to connect to the device hardware. Set False to disconnect
-      from the device hardware. Client can also read the property to check
-      whether it is connected. This reports the current hardware state.
-    * Multiple calls setting Connected to true or false must not cause
-      an error.
-    """
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        resp.text = PropertyResponse(tel_dev.connected, req).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        conn_str = get_request_field('Connected', req)
-        conn = to_bool(conn_str)              # Raises 400 Bad Request if str to bool fails
-
-        try:
-            # ----------------------
-            tel_dev.connected = conn
-            # ----------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req, # Put is actually like a method :-(
-                            DriverException(0x500, f'{self.__class__.__name__} failed', ex)).json
-            
-@before(PreProcessRequest(maxdev))
-class alignmentmode:
-
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.alignment_mode
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Alignmentmode failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class altitude:
-    # The Altitude above the local horizon of the telescope's 
-    # current position (degrees, positive up)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.altitude #TODO: Query the telescope for its altitude
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Altitude failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class aperturearea:
-    # The area of the telescope's aperture, 
-    # taking into account any obstructions (square meters)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.aperture_area #Area of the SEO Telescope mirror
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Aperturearea failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class aperturediameter:
-    # The telescope's effective aperture diameter (meters)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.aperture_diameter #Aperture diameter of SEO telescope
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Aperturediameter failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class athome:
-    # True if the telescope is stopped in the Home position. 
-    # Set only following a FindHome() operation, and reset with any slew operation. 
-    # This property must be False if the telescope does not support homing.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.at_home # Query the Telescope to see if it is in the home position
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Athome failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class atpark:
-    # True if the telescope has been put into the parked state by the Park() method. 
-    # Set False by calling the Unpark() method.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.at_park # Query the telescope if it is in the park position
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Atpark failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class azimuth:
-    # The azimuth at the local horizon of the telescope's current position 
-    # (degrees, North-referenced, positive East/clockwise).
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.azimuth # Query the telescope to get its Azimuth
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Azimuth failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canfindhome:
-    # True if this telescope is capable of programmed finding its home position
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_find_home # Query the telescope to see if it can find home
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canfindhome failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canpark:
-    # True if this telescope is capable of programmed parking (Park()method)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_park # Query the telescope to see if it can park
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canpark failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canpulseguide:
-    # True if this telescope is capable of software-pulsed guiding 
-    # (via the PulseGuide(GuideDirections, Int32) method)
-    # This is what we use to implement movement of SEO Telescope
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_pulse_guide # Query the telescope to see if it can pulse guide
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canpulseguide failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class cansetdeclinationrate:
-    # True if the DeclinationRate property can be changed to 
-    # provide offset tracking in the declination axis.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_set_declination_rate # Query the telescope to see if it can set declination rate
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Cansetdeclinationrate failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class cansetguiderates:
-    # True if the guide rate properties used for 
-    # PulseGuide(GuideDirections, Int32) can be adjusted.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_set_guide_rates # Query the telescope to see if it can set guide rates 
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Cansetguiderates failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class cansetpark:
-    # True if this telescope is capable of programmed 
-    # setting of its park position (SetPark() method)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_set_park # Query the telescope to see if it can set park 
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Cansetpark failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class cansetpierside:
-    # True if the SideOfPier property can be set, 
-    # meaning that the mount can be forced to flip.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_set_pier_side # Query the telescope to see if it can set pier side 
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Cansetpierside failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class cansetrightascensionrate:
-    # True if the RightAscensionRate property can be changed to 
-    # provide offset tracking in the right ascension axis.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_set_right_ascension_rate # Query the telescope to see if it can set right ascension rate 
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Cansetrightascensionrate failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class cansettracking:
-    # True if the Tracking property can be changed, 
-    # turning telescope sidereal tracking on and off.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_set_tracking # Query the telescope to see if it can set tracking
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Cansettracking failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canslew:
-    # True if this telescope is capable of programmed slewing 
-    # (synchronous or asynchronous) to equatorial coordinates
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_slew # Query the telescope to see if it can slew
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canslew failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canslewaltaz:
-    # True if this telescope is capable of programmed slewing 
-    # (synchronous or asynchronous) to local horizontal coordinates
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = False # Will only slew to equatorial coordinates
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canslewaltaz failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canslewaltazasync:
-    # True if this telescope is capable of programmed asynchronous 
-    # slewing to local horizontal coordinates
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_slew_alt_az_async # Query the telescope to see if it can slew to altaz asynchronously
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canslewaltazasync failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canslewasync:
-    # True if this telescope is capable of programmed asynchronous 
-    # slewing to equatorial coordinates.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_slew_async # Query the telescope to see if it can slew asynchronously
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canslewasync failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class cansync:
-    # True if this telescope is capable of programmed synching 
-    # to equatorial coordinates.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_sync # Query the telescope to see if it can sync
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Cansync failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class cansyncaltaz:
-
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_sync_alt_az # Query the telescope to see if it can sync to altaz
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Cansyncaltaz failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canunpark:
-
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.can_unpark # Query the telescope to see if it can unpark
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canunpark failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class declination:
-    # The declination (degrees) of the telescope's current equatorial coordinates, 
-    # in the coordinate system given by the EquatorialSystem property. 
-    # Reading the property will raise an error if the value is unavailable.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.declination # Query the telescope for the declination
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Declination failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class declinationrate:
-    # The declination tracking rate (arcseconds per SI second, default = 0.0)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.declination_rate # Query the telescope for the declination rate
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Declinationrate failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        declinationratestr = get_request_field('DeclinationRate', req)      # Raises 400 bad request if missing
-        try:
-            declinationrate = float(declinationratestr)
-            tel_dev.declination_rate = declinationrate
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'DeclinationRate " + declinationratestr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        try:
-            pass
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Declinationrate failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class doesrefraction:
-    # True if the telescope or driver applies atmospheric refraction to coordinates.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.does_refraction # Query the telescope for the refraction status
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Doesrefraction failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        doesrefractionstr = get_request_field('DoesRefraction', req)      # Raises 400 bad request if missing
-        doesrefraction = to_bool(doesrefractionstr)                       # Same here
-
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Doesrefraction failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class equatorialsystem:
-    # Equatorial coordinate system used by this telescope (e.g. Topocentric or J2000).
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.equatorial_system # Query the telescope for the equatorial system
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Equatorialsystem failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class focallength:
-    # The telescope's focal length, meters
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = 2 #TODO: Check for SEO
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Focallength failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class guideratedeclination:
-    # The current Declination movement rate offset for telescope guiding (degrees/sec)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.guide_rate_declination # Query the telescope for the guide rate
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Guideratedeclination failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        guideratedeclinationstr = get_request_field('GuideRateDeclination', req)      # Raises 400 bad request if missing
-        try:
-            guideratedeclination = float(guideratedeclinationstr)
-            tel_dev.guide_rate_declination = guideratedeclination
-            logger.info(f'GuideRateDeclination set to {guideratedeclination}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'GuideRateDeclination " + guideratedeclinationstr + " not a valid number.')).json
-            return
-
-@before(PreProcessRequest(maxdev))
-class guideraterightascension:
-    # The current Right Ascension movement rate offset for telescope guiding (degrees/sec)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.guide_rate_right_ascension # Query the telescope for the guide rate
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Guideraterightascension failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        guideraterightascensionstr = get_request_field('GuideRateRightAscension', req)      # Raises 400 bad request if missing
-        try:
-            guideraterightascension = float(guideraterightascensionstr)
-            tel_dev.guide_rate_right_ascension = guideraterightascension
-            logger.info(f'GuideRateRightAscension set to {guideraterightascension}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'GuideRateRightAscension " + guideraterightascensionstr + " not a valid number.')).json
-            return
-
-@before(PreProcessRequest(maxdev))
-class ispulseguiding:
-    # True if a PulseGuide(GuideDirections, Int32) command is in progress, False otherwise
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.is_pulse_guiding # Query the telescope for the pulse guiding status
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Ispulseguiding failed', ex)).json       
-
-@before(PreProcessRequest(maxdev))
-class rightascension:
-    # The right ascension (hours) of the telescope's current equatorial coordinates, 
-    # in the coordinate system given by the EquatorialSystem property
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.right_ascension # Query the telescope for the right ascension
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Rightascension failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class rightascensionrate:
-    # The right ascension tracking rate offset from sidereal 
-    # (seconds per sidereal second, default = 0.0)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.right_ascension_rate # Query the telescope for the right ascension rate
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Rightascensionrate failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        rightascensionratestr = get_request_field('RightAscensionRate', req)      # Raises 400 bad request if missing
-        try:
-            rightascensionrate = float(rightascensionratestr)
-            tel_dev.right_ascension_rate = rightascensionrate
-            logger.info(f'RightAscensionRate set to {rightascensionrate}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'RightAscensionRate " + rightascensionratestr + " not a valid number.')).json
-            return
-
-@before(PreProcessRequest(maxdev))
-class sideofpier:
-    # Indicates the pointing state of the mount.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.side_of_pier # Query the telescope for the side of pier
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Sideofpier failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        sideofpierstr = get_request_field('SideOfPier', req)      # Raises 400 bad request if missing
-        try:
-            sideofpier = int(sideofpierstr)
-            tel_dev.side_of_pier = sideofpier
-            logger.info(f'SideOfPier set to {sideofpier}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'SideOfPier " + sideofpierstr + " not a valid number.')).json
-            return
-
-@before(PreProcessRequest(maxdev))
-class siderealtime:
-    # The local apparent sidereal time from the telescope's internal clock (hours, sidereal)
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.sidereal_time # Query the telescope for the sidereal time
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Siderealtime failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class siteelevation:
-    # The elevation above mean sea level (meters) of the 
-    # site at which the telescope is located
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.site_elevation # Query the telescope for the site elevation
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Siteelevation failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        siteelevationstr = get_request_field('SiteElevation', req)      # Raises 400 bad request if missing
-        try:
-            siteelevation = float(siteelevationstr)
-            tel_dev.site_elevation = siteelevation
-            logger.info(f'SiteElevation set to {siteelevation}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'SiteElevation " + siteelevationstr + " not a valid number.')).json
-            return
-
-@before(PreProcessRequest(maxdev))
-class sitelatitude:
-    # The geodetic(map) latitude (degrees, positive North, WGS84) of the site at which the telescope is located.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val =  tel_dev.site_latitude # Query the telescope for the site latitude
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Sitelatitude failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        sitelatitudestr = get_request_field('SiteLatitude', req)      # Raises 400 bad request if missing
-        try:
-            sitelatitude = float(sitelatitudestr)
-            tel_dev.site_latitude = sitelatitude
-            logger.info(f'SiteLatitude set to {sitelatitude}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'SiteLatitude " + sitelatitudestr + " not a valid number.')).json
-            return
-
-@before(PreProcessRequest(maxdev))
-class sitelongitude:
-    # The longitude (degrees, positive East, WGS84) of the site at which the telescope is located.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.site_longitude # Query the telescope for the site longitude
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Sitelongitude failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        sitelongitudestr = get_request_field('SiteLongitude', req)      # Raises 400 bad request if missing
-        try:
-            sitelongitude = float(sitelongitudestr)
-            tel_dev.site_longitude = sitelongitude
-            logger.info(f'SiteLongitude set to {sitelongitude}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'SiteLongitude " + sitelongitudestr + " not a valid number.')).json
-            return
-@before(PreProcessRequest(maxdev))
-class slewing:
-    # True if telescope is in the process of moving in response to one of the Slew methods 
-    # or the MoveAxis(TelescopeAxes, Double) method, False at all other times.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.slewing # Query the telescope for the slewing state 
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Slewing failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class slewsettletime:
-    # Specifies a post-slew settling time (sec.).
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.slew_settle_time # Query the telescope for the slew settle time
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Slewsettletime failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        slewsettletimestr = get_request_field('SlewSettleTime', req)      # Raises 400 bad request if missing
-        try:
-            slewsettletime = int(slewsettletimestr)
-            tel_dev.slew_settle_time = slewsettletime
-            logger.info(f'SlewSettleTime set to {slewsettletime}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'SlewSettleTime " + slewsettletimestr + " not a valid number.')).json
-            return
-
-@before(PreProcessRequest(maxdev))
-class targetdeclination:
-    # The declination (degrees, positive North) for the target 
-    # of an equatorial slew or sync operation
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.target_declination # Query the telescope for the target declination
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Targetdeclination failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        targetdeclinationstr = get_request_field('TargetDeclination', req)      # Raises 400 bad request if missing
-        try:
-            targetdeclination = float(targetdeclinationstr)
-            tel_dev.target_declination = targetdeclination
-            logger.info(f'TargetDeclination set to {targetdeclination}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'TargetDeclination " + targetdeclinationstr + " not a valid number.')).json
-            return
-        
-@before(PreProcessRequest(maxdev))
-class targetrightascension:
-    # The right ascension (hours) for the target of an equatorial slew or sync operation
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.target_right_ascension # Query the telescope for the target right ascension
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Targetrightascension failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        targetrightascensionstr = get_request_field('TargetRightAscension', req)      # Raises 400 bad request if missing
-        try:
-            targetrightascension = float(targetrightascensionstr)
-            tel_dev.target_right_ascension = targetrightascension
-            logger.info(f'TargetRightAscension set to {targetrightascension}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'TargetRightAscension " + targetrightascensionstr + " not a valid number.')).json
-            return
-        
-@before(PreProcessRequest(maxdev))
-class tracking:
-    # The state of the telescope's sidereal tracking drive.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.tracking # Query the telescope for the tracking state
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Tracking failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return   
-        trackingstr = get_request_field('Tracking', req) 
-        try:
-            # -----------------------------
-            tracking = to_bool(trackingstr)
-            tel_dev.tracking = tracking
-            logger.info(f'Tracking set to {tracking}')                
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Tracking failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class trackingrate:
-# The current tracking rate of the telescope's sidereal drive
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.tracking_rate # Query the telescope for the tracking rate
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Trackingrate failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        trackingratestr = get_request_field('TrackingRate', req)      # Raises 400 bad request if missing
-        try:
-            trackingrate = int(trackingratestr)
-            tel_dev.tracking_rate = trackingrate
-            logger.info(f'TrackingRate set to {trackingrate}')
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'TrackingRate " + trackingratestr + " not a valid number.')).json
-            return
-
-@before(PreProcessRequest(maxdev))
-class trackingrates:
-    # Returns a collection of supported DriveRates values that 
-    # describe the permissible values of the TrackingRate property for this telescope type.
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.tracking_rates # Query the telescope for the tracking rates
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Trackingrates failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class utcdate:
-    # The UTC date/time of the telescope's internal clock
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = tel_dev.utc_date # Query the telescope for the UTC date/time
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Utcdate failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        utcdatestr = get_request_field('UTCDate', req)      # Raises 400 bad request if missing
-        try:
-            utcdate = {cvtfunc}(utcdatestr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'UTCDate " + utcdatestr + " not a valid number.')).json
-            return
-
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Utcdate failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Utcdate failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class abortslew:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Abortslew failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class axisrates:
-
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            pass
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Axisrates failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class canmoveaxis:
-
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            val = True #Query Aster
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Canmoveaxis failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class destinationsideofpier:
-
-    def on_get(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # ----------------------
-            pass
-            # ----------------------
-            resp.text = PropertyResponse(val, req).json
-        except Exception as ex:
-            resp.text = PropertyResponse(None, req,
-                            DriverException(0x500, 'Telescope.Destinationsideofpier failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class findhome:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Findhome failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class moveaxis:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        axisstr = get_request_field('Axis', req)      # Raises 400 bad request if missing
-        try:
-            axis = int(axisstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Axis " + axisstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        ratestr = get_request_field('Rate', req)      # Raises 400 bad request if missing
-        try:
-            rate = float(ratestr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Rate " + ratestr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Moveaxis failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Moveaxis failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class park:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Park failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class pulseguide:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        directionstr = get_request_field('Direction', req)      # Raises 400 bad request if missing
-        try:
-            direction = int(directionstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Direction " + directionstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        durationstr = get_request_field('Duration', req)      # Raises 400 bad request if missing
-        try:
-            duration = int(durationstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Duration " + durationstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        try:
-            write_numbers_to_file(direction, duration, "output.txt")
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Pulseguide failed', ex)).json
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        directionstr = get_request_field('Direction', req)      # Raises 400 bad request if missing
-        try:
-            direction = int(directionstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Direction " + directionstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        durationstr = get_request_field('Duration', req)      # Raises 400 bad request if missing
-        try:
-            duration = int(durationstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Duration " + durationstr + " not a valid number.')).json
-            return
-        try:
-            # -----------------------------
-            tel_dev.pulse_guide(direction, duration)
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Pulseguide failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class setpark:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Setpark failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class slewtoaltaz:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        azimuthstr = get_request_field('Azimuth', req)      # Raises 400 bad request if missing
-        try:
-            azimuth = int(azimuthstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Azimuth " + azimuthstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        altitudestr = get_request_field('Altitude', req)      # Raises 400 bad request if missing
-        try:
-            altitude = int(altitudestr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Altitude " + altitudestr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Slewtoaltaz failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class slewtoaltazasync:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        azimuthstr = get_request_field('Azimuth', req)      # Raises 400 bad request if missing
-        try:
-            azimuth = int(azimuthstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Azimuth " + azimuthstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        altitudestr = get_request_field('Altitude', req)      # Raises 400 bad request if missing
-        try:
-            altitude = int(altitudestr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Altitude " + altitudestr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Slewtoaltazasync failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class slewtocoordinates:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        rightascensionstr = get_request_field('RightAscension', req)      # Raises 400 bad request if missing
-        try:
-            rightascension = int(rightascensionstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'RightAscension " + rightascensionstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        declinationstr = get_request_field('Declination', req)      # Raises 400 bad request if missing
-        try:
-            declination = int(declinationstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Declination " + declinationstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Slewtocoordinates failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class slewtocoordinatesasync:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        rightascensionstr = get_request_field('RightAscension', req)      # Raises 400 bad request if missing
-        try:
-            rightascension = int(rightascensionstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'RightAscension " + rightascensionstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        declinationstr = get_request_field('Declination', req)      # Raises 400 bad request if missing
-        try:
-            declination = int(declinationstr)
-        except:
-            resp.text = MethodResponse(req,
-                            InvalidValueException(f'Declination " + declinationstr + " not a valid number.')).json
-            return
-        ### RANGE CHECK AS NEEDED ###       # Raise Alpaca InvalidValueException with details!
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Slewtocoordinatesasync failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class slewtotarget:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Slewtotarget failed', ex)).json
-
-@before(PreProcessRequest(maxdev))
-class slewtotargetasync:
-
-    def on_put(self, req: Request, resp: Response, devnum: int):
-        if not tel_dev.connected:
-            resp.text = PropertyResponse(None, req,
-                            NotConnectedException()).json
-            return
-        try:
-            # -----------------------------
-            ### DEVICE OPERATION(PARAM) ###
-            # -----------------------------
-            resp.text = MethodResponse(req).json
-        except Exception as ex:
-            resp.text = MethodResponse(req,
-                            DriverException(0x500, 'Telescope.Slewtotargetasync failed', ex)).json
-
-
-
+pulses = None   # PulsePipeline, where started guide pulses are logged and sent to the mount
+slews = None    # SlewMachine running the slews, on the [device] mount backend
+def mount_sink(logger: Logger):
+    """The sink that moves the mount for [device] guide_command or pulse_command, None for neither"""
+    if Config.guide_command:
+        # Both would move the mount for the same pulses, so guide_command wins
+        if Config.pulse_command:
+            logger.error('pulse_command and guide_command are both set in config.toml, each pulse would move '
+                         'the mount twice. Ignoring pulse_command, set it to \'\'.')
+        return GuideAggregator(Config.guide_command, logger, Config.guide_window, Config.guide_clamp_ms,
+                               lambda: (tel_dev.guide_rate_right_ascension, tel_dev.guide_rate_declination))
+    if Config.pulse_command:
+        return MountCommandSink(Config.pulse_command)
+    return None
+
+def start_telescope_device(logger: Logger):
+    """Build the device and its responders, app.main calls this once the log is up"""
+    global tel_dev, pulses, slews, responders
+    sinks = []
+    if Config.pulse_log:
+        sinks.append(FileSink(Config.pulse_log))
+    mounter = mount_sink(logger)
+    if mounter is not None:
+        sinks.append(mounter)
+    pulses = PulsePipeline(sinks, logger, maxlen=Config.pulse_queue)
+    position = None
+    if Config.where_command:
+        position = MountPositionProvider(Config.where_command, Config.position_interval)
+    capabilities = SEO_CAPABILITIES
+    if Config.mount == 'tx' and position is not None:
+        backend = TxMount(Config.slew_command, Config.sync_command, Config.abort_command, position)
+        # Only slew or sync the real mount with a command for it
+        capabilities = capabilities.replace(can_slew=bool(Config.slew_command), can_slew_async=bool(Config.slew_command),
+                                            can_sync=bool(Config.sync_command))
+        if not Config.slew_command or not Config.sync_command:
+            logger.warning('slew_command or sync_command is empty, CanSlew %s, CanSync %s',
+                           capabilities.can_slew, capabilities.can_sync)
+    else:
+        if Config.mount == 'tx':
+            logger.error('The tx mount needs where_command to follow slews, simulating the mount')
+        backend = SimulatedMount(Config.sim_slew_rate)
+        position = None         # Position comes from the simulated slews
+    timer = PulseTimer(Config.pulse_spin_ms, logger=logger)
+    tel_dev = TelescopeDevice(logger, pulses, position, capabilities, timer=timer)
+    slews = SlewMachine(backend, tel_dev._update, logger, poll=Config.slew_poll,
+                        settle=tel_dev.slew_settling_time, timeout=Config.slew_timeout)
+    tel_dev.mount = slews
+
+    def apply_config(changes: dict):
+        # The [device] settings that can change while running, see config.SETTINGS
+        nonlocal mounter
+        if 'pulse_spin_ms' in changes:
+            timer.spin_ns = int(changes['pulse_spin_ms'] * 1_000_000)
+        if 'pulse_command' in changes or 'guide_command' in changes:
+            # The pipeline swaps the mount sink between batches and closes the old one
+            old = mounter
+            mounter = mount_sink(logger)
+            pulses.replace_sink(old, mounter)
+        if isinstance(mounter, GuideAggregator):
+            mounter.window = changes.get('guide_window', mounter.window)
+            mounter.clamp_ms = changes.get('guide_clamp_ms', mounter.clamp_ms)
+        if position is not None and 'position_interval' in changes:
+            position.interval = changes['position_interval']
+        if isinstance(backend, TxMount):
+            backend.abort_command = changes.get('abort_command', backend.abort_command)
+        else:
+            backend.rate = changes.get('sim_slew_rate', backend.rate)
+        slews.poll = changes.get('slew_poll', slews.poll)
+        slews.timeout = changes.get('slew_timeout', slews.timeout)
+    Config.subscribe(apply_config)
+    responders = make_responders(ENDPOINTS, tel_dev, 'Telescope', PreProcessRequest(maxdev))
+
+# -------------------
+# PARAMETER PARSING
+# -------------------
+# Raise ValueError for a bad value, which is answered with InvalidValueException
+
+def guide_direction(text: str) -> int:
+    direction = int(text)
+    if direction not in PULSE_AXES:
+        raise ValueError(f'{direction} is not a GuideDirections value')
+    return direction
+
+def right_ascension(text: str) -> float:
+    hours = float(text)
+    if not 0.0 <= hours < 24.0:
+        raise ValueError('must be 0 to 24 hours')
+    return hours
+
+def declination(text: str) -> float:
+    degrees = float(text)
+    if not -90.0 <= degrees <= 90.0:
+        raise ValueError('must be -90 to 90 degrees')
+    return degrees
+
+def pulse_duration(text: str) -> int:
+    duration = int(text)
+    if duration < 0:
+        raise ValueError('must not be negative')
+    return duration
+
+# -------------
+# ACTIONS
+# -------------
+# Action() names this driver supports, see SupportedActions
+
+def run_action(name: str, parameters: str) -> str:
+    if name.lower() == 'pulsestats':   # JSON counts of pulses submitted, queued, written, coalesced, dropped,
+                                        # and the GuideAggregator's
+        return json.dumps(pulses.stats())
+    if name.lower() == 'pulsetiming':  # JSON pulses ended/cancelled and their timing error percentiles, us
+        return json.dumps(tel_dev.timer.stats())
+    if name.lower() == 'slewstate':    # JSON state, target and error of the last slew
+        return json.dumps({'state': slews.state, 'target': slews.target,
+                           'error': None if slews.error is None else str(slews.error)})
+    raise AlpacaError(ActionNotImplementedException())
+
+ACTIONS = ['pulsestats', 'pulsetiming', 'slewstate']
+
+# -------------------
+# ALPACA ENDPOINTS
+# -------------------
+# One entry per endpoint, see responders.py. constant=True GETs are answered
+# from a JSON template made at startup.
+ENDPOINTS = [
+    # Common to all device types, answered while disconnected
+    Method('action', run_action, fields=(('Action', str), ('Parameters', str, '')), connection=False),
+    Method('commandblind', implemented=False, connection=False),
+    Method('commandbool', implemented=False, connection=False),
+    Method('commandstring', implemented=False, connection=False),
+    Property('description', value=TelescopeMetadata.Description, constant=True, connection=False),
+    Property('driverinfo', value=TelescopeMetadata.Info, constant=True, connection=False),
+    Property('interfaceversion', value=TelescopeMetadata.InterfaceVersion, constant=True, connection=False),
+    Property('driverversion', value=TelescopeMetadata.Version, constant=True, connection=False),
+    Property('name', value=TelescopeMetadata.Name, constant=True, connection=False),
+    Property('supportedactions', value=ACTIONS, constant=True, connection=False),
+    Property('connected', 'connected', field='Connected', parse=to_bool, connection=False),
+
+    # Capabilities (TelescopeDevice.capabilities)
+    Property('alignmentmode', 'alignment_mode', constant=True),
+    Property('aperturearea', 'aperture_area', constant=True),
+    Property('aperturediameter', 'aperture_diameter', constant=True),
+    Property('canfindhome', 'can_find_home', constant=True),
+    Property('canpark', 'can_park', constant=True),
+    Property('canpulseguide', 'can_pulse_guide', constant=True),
+    Property('cansetdeclinationrate', 'can_set_declination_rate', constant=True),
+    Property('cansetguiderates', 'can_set_guide_rates', constant=True),
+    Property('cansetpark', 'can_set_park', constant=True),
+    Property('cansetpierside', 'can_set_pier_side', constant=True),
+    Property('cansetrightascensionrate', 'can_set_right_ascension_rate', constant=True),
+    Property('cansettracking', 'can_set_tracking', constant=True),
+    Property('canslew', 'can_slew', constant=True),
+    Property('canslewaltaz', 'can_slew_alt_az', constant=True),
+    Property('canslewaltazasync', 'can_slew_alt_az_async', constant=True),
+    Property('canslewasync', 'can_slew_async', constant=True),
+    Property('cansync', 'can_sync', constant=True),
+    Property('cansyncaltaz', value=False, constant=True),      # Only syncs to equatorial coordinates
+    Property('canunpark', 'can_unpark', constant=True),
+    Property('canmoveaxis', value=True, constant=True),
+    Property('equatorialsystem', 'equatorial_system', constant=True),
+    Property('focallength', 'focal_length', constant=True),
+    Property('trackingrates', 'tracking_rates', constant=True),
+    # Settable in ITelescope, fixed for SEO so a PUT answers NotImplementedException
+    Property('declinationrate', 'declination_rate', constant=True, field='DeclinationRate', parse=float, settable=False),
+    Property('doesrefraction', 'does_refraction', constant=True, field='DoesRefraction', parse=to_bool, settable=False),
+    Property('rightascensionrate', 'right_ascension_rate', constant=True, field='RightAscensionRate', parse=float, settable=False),
+    Property('sideofpier', 'side_of_pier', constant=True, field='SideOfPier', parse=int, settable=False),
+    Property('siteelevation', 'site_elevation', constant=True, field='SiteElevation', parse=float, settable=False),
+    Property('sitelatitude', 'site_latitude', constant=True, field='SiteLatitude', parse=float, settable=False),
+    Property('sitelongitude', 'site_longitude', constant=True, field='SiteLongitude', parse=float, settable=False),
+    Property('slewsettletime', 'slew_settling_time', constant=True, field='SlewSettleTime', parse=int, settable=False),
+    Property('trackingrate', 'tracking_rate', constant=True, field='TrackingRate', parse=int, settable=False),
+
+    # State
+    Property('altitude', 'altitude'),
+    Property('athome', 'at_home'),
+    Property('atpark', 'at_park'),
+    Property('azimuth', 'azimuth'),
+    Property('declination', 'declination'),
+    Property('guideratedeclination', 'guide_rate_declination', field='GuideRateDeclination', parse=float),
+    Property('guideraterightascension', 'guide_rate_right_ascension', field='GuideRateRightAscension', parse=float),
+    Property('ispulseguiding', 'is_pulse_guiding'),
+    Property('rightascension', 'right_ascension'),
+    Property('siderealtime', 'sidereal_time'),
+    Property('slewing', 'slewing'),
+    Property('targetdeclination', 'target_declination', field='TargetDeclination', parse=declination),
+    Property('targetrightascension', 'target_right_ascension', field='TargetRightAscension', parse=right_ascension),
+    Property('tracking', 'tracking', field='Tracking', parse=to_bool),
+    Property('utcdate', 'utc_date', field='UTCDate', parse=str, settable=False),
+    # GETs with parameters in ITelescope that SEO doesn't answer
+    Property('axisrates', implemented=False),
+    Property('destinationsideofpier', implemented=False),
+
+    # Methods
+    Method('pulseguide', 'pulse_guide', fields=(('Direction', guide_direction), ('Duration', pulse_duration))),
+    Method('abortslew', 'abort_slew'),
+    Method('slewtocoordinates', 'slew_to_coordinates', fields=(('RightAscension', right_ascension), ('Declination', declination))),
+    Method('slewtocoordinatesasync', 'slew_to_coordinates_async', fields=(('RightAscension', right_ascension), ('Declination', declination))),
+    Method('slewtotarget', 'slew_to_target'),
+    Method('slewtotargetasync', 'slew_to_target_async'),
+    Method('synctocoordinates', 'sync_to_coordinates', fields=(('RightAscension', right_ascension), ('Declination', declination))),
+    Method('synctotarget', 'sync_to_target'),
+    # CanPark, CanFindHome, CanSetPark, CanUnpark and CanSlewAltAz are false
+    Method('findhome', implemented=False),
+    Method('park', implemented=False),
+    Method('setpark', implemented=False),
+    Method('unpark', implemented=False),
+    Method('slewtoaltaz', implemented=False),
+    Method('slewtoaltazasync', implemented=False),
+    Method('synctoaltaz', implemented=False),
+    # Placeholder, succeeds without moving the mount (yet)
+    Method('moveaxis', fields=(('Axis', int), ('Rate', float))),
+]
+
+# {endpoint: responder}, made by start_telescope_device() and routed by app.init_routes
+responders = {}
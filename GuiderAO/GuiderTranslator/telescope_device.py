@@ -2,91 +2,189 @@
 # MaxIm DL.  We only need to implement methods relevant to pulse guide, with everything else
 # already managed.
 
-from threading import Timer
+from collections import namedtuple
 from threading import Lock
 from logging import Logger
-import subprocess
-import time
+from mount_state import Position
+from pulse_timer import PulseTimer
+
+# PulseGuide directions (ASCOM GuideDirections) and the axis each one moves.
+# A pulse on one axis can overlap a pulse on the other.
+DIRECTION_NAMES = {0: 'N', 1: 'S', 2: 'E', 3: 'W'}
+PULSE_AXES = {0: 'dec', 1: 'dec', 2: 'ra', 3: 'ra'}
+
+
+class Capabilities:
+    """Telescope constants. Frozen once made, so they are read without the lock."""
+    __slots__ = (
+        'alignment_mode',
+        'aperture_area',
+        'aperture_diameter',
+        'can_find_home',
+        'can_park',
+        'can_pulse_guide',
+        'can_set_declination_rate',
+        'can_set_guide_rates',
+        'can_set_park',
+        'can_set_pier_side',
+        'can_set_right_ascension_rate',
+        'can_set_tracking',
+        'can_slew',
+        'can_slew_alt_az',
+        'can_slew_alt_az_async',
+        'can_slew_async',
+        'can_sync',
+        'can_unpark',
+        'declination_rate',
+        'does_refraction',
+        'equatorial_system',
+        'focal_length',
+        'right_ascension_rate',
+        'side_of_pier',
+        'site_elevation',
+        'site_latitude',
+        'site_longitude',
+        'slew_settling_time',
+        'tracking_rate',
+        'tracking_rates',
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'Capabilities are read-only, cannot set {name}')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'Capabilities are read-only, cannot delete {name}')
+
+    def replace(self, **changes) -> 'Capabilities':
+        """A copy with the given values changed"""
+        return Capabilities(**{name: changes.get(name, getattr(self, name)) for name in self.__slots__})
+
+
+SEO_CAPABILITIES = Capabilities(
+    alignment_mode=0,  # Alt/Az alignment
+    aperture_area=0.196,  # Area of the SEO Telescope mirror
+    aperture_diameter=0.5,  # Aperture diameter of SEO telescope
+    can_find_home=False,  # Not implemented in this driver
+    can_park=False,  # Not implemented in this driver
+    can_pulse_guide=True,  # To be implemented by us
+    can_set_declination_rate=False,  # Not implemented in this driver
+    can_set_guide_rates=True,  # To be implemented by us
+    can_set_park=False,  # TODO: Check with Marc and Dick
+    can_set_pier_side=False,  # Not implemented in this driver
+    # TODO: Check if we can actually set the RA rate
+    can_set_right_ascension_rate=False,
+    can_set_tracking=False,  # Not implemented by us
+    can_slew=True,
+    can_slew_alt_az=False,
+    can_slew_alt_az_async=False,
+    can_slew_async=True,
+    can_sync=True,
+    can_unpark=False,  # Not implemented in this driver
+    declination_rate=0,  # Always 0 due to cansetdeclinationrate being False
+    # SEO does not do atmospheric refraction to coordinates
+    does_refraction=False,
+    equatorial_system=2,  # J2000
+    focal_length=2,  # TODO: Check for SEO
+    right_ascension_rate=0,  # 0 because canSetRightAscensionRate is False
+    side_of_pier=0,  # Cannot be changed
+    site_elevation=144,  # TODO: Get this from Marc
+    site_latitude=50,  # TODO: Get real value
+    site_longitude=70,  # TODO: Get real value
+    slew_settling_time=0.5,  # TODO: Chose what value to set this to
+    tracking_rate=0,  # Sidereal Tracking (15.041 arcs/s)
+    tracking_rates=(0,),  # We only have 1 rate
+)
+
+
+# Everything about the telescope that changes. TelescopeDevice keeps one of
+# these and replaces it whole under its lock, so a reader gets a consistent
+# snapshot from a single attribute read and never takes the lock.
+DeviceState = namedtuple('DeviceState', [
+    'connected',
+    'altitude',
+    'at_home',
+    'at_park',
+    'azimuth',
+    'declination',
+    'guide_rate_declination',
+    'guide_rate_right_ascension',
+    'is_pulse_guiding',
+    'right_ascension',
+    'sidereal_time',
+    'slewing',
+    'tracking',
+    'target_declination',
+    'target_right_ascension',
+    'utc_date',
+])
 
 
 class TelescopeDevice:
-    def __init__(self, logger: Logger):
-        self._lock = Lock()
+    def __init__(self, logger: Logger, pulse_sink=None, position=None, capabilities: Capabilities = SEO_CAPABILITIES,
+                 mount=None, timer: PulseTimer = None):
+        self._lock = Lock()  # Taken by writers only
         self.name: str = 'SEO Telescope v2'
         self.logger = logger
-        #
-        # Telescope Constants
-        #
-        self._alignment_mode = 0  # Alt/Az alignment
-        self._aperture_area = 0.196  # Area of the SEO Telescope mirror
-        self._aperture_diameter = 0.5  # Aperture diameter of SEO telescope
-        self._can_find_home = False  # Not implemented in this driver
-        self._can_park = False  # Not implemented in this driver
-        self._can_pulse_guide = True  # To be implemented by us
-        self._can_set_declination_rate = False  # Not implemented in this driver
-        self._can_set_guide_rates = True  # To be implemented by us
-        self._can_set_park = False  # TODO: Check with Marc and Dick
-        self._can_set_pier_side = False  # Not implemented in this driver
-        # TODO: Check if we can actually set the RA rate
-        self._can_set_right_ascension_rate = False
-        self._can_set_tracking = False  # Not implemented by us
-        self._can_slew = True
-        self._can_slew_alt_az = False
-        self._can_slew_alt_az_async = False
-        self._can_slew_async = True
-        self._can_sync = True
-        self._can_unpark = False  # Not implemented in this driver
-        self._declination_rate = 0  # Always 0 due to cansetdeclinationrate being False
-        # SEO does not do atmospheric refraction to coordinates
-        self._does_refraction = False
-        self._equatorial_system = 2  # J2000
-        self._focal_length = 2  # TODO: Check for SEO
-        self._right_ascension_rate = 0  # 0 because canSetRightAscensionRate is False
-        self._side_of_pier = 0  # Cannot be changed
-        self._site_elevation = 144  # TODO: Get this from Marc
-        self._site_latitude = 50  # TODO: Get real value
-        self._site_longitude = 70  # TODO: Get real value
-        self._slew_settling_time = 0.5  # TODO: Chose what value to set this to
-        self._tracking_rate = 0  # Sidereal Tracking (15.041 arcs/s)
-        self._tracking_rates = [0]  # We only have 1 rate
+        self.pulse_sink = pulse_sink  # pulse_sink.PulsePipeline the started pulses are handed to
+        self.position = position  # mount_state.MountPositionProvider, None to use the values in the state
+        self.capabilities = capabilities
+        self.mount = mount  # mount.SlewMachine the slews and syncs go to, None to only set the target
+        self.timer = timer if timer is not None else PulseTimer(logger=logger)  # ends the pulses
         #
         # Telescope state variables
         #
-        self._altitude = 0
-        self._at_home = True
-        self._at_park = True
-        self._azimuth = 0
-        self._connected = False
-        self._declination = 0
-        self._guide_rate_declination = 0.005
-        self._guide_rate_right_ascension = 0.005
-        self._is_pulse_guiding = False
-        self._right_ascension = 0
-        self._sidereal_time = 0.1
-        self._slewing = False
-        self._tracking = True
-        self._target_declination = 0
-        self._target_right_ascension = 0
-        self._utc_date = None
+        self._state = DeviceState(
+            connected=False,
+            altitude=0,
+            at_home=True,
+            at_park=True,
+            azimuth=0,
+            declination=0,
+            guide_rate_declination=0.005,
+            guide_rate_right_ascension=0.005,
+            is_pulse_guiding=False,
+            right_ascension=0,
+            sidereal_time=0.1,
+            slewing=False,
+            tracking=True,
+            target_declination=0,
+            target_right_ascension=0,
+            utc_date=None,
+        )
+        self._pulses = {}  # axis -> TimedPulse in progress on it, under the lock
+
+    def _update(self, **changes):
+        # Writers only. Readers keep whichever snapshot they already have.
+        self._lock.acquire()
+        self._state = self._state._replace(**changes)
+        self._lock.release()
+
+    @property
+    def state(self) -> DeviceState:
+        """Consistent snapshot of all the state properties"""
+        return self._state
 
     # Connector methods
     @property
     def connected(self) -> bool:
-        self._lock.acquire()
-        res = self._connected
-        self._lock.release()
-        return res
+        return self._state.connected
 
     @connected.setter
     def connected(self, connected: bool):
         self._lock.acquire()
-        if (not connected) and self._connected and self._slewing:
+        state = self._state
+        if (not connected) and state.connected and state.slewing:
             self._lock.release()
             # Yes you could call Halt() but this is for illustration
             raise RuntimeError('Cannot disconnect while telescope is moving')
-        elif (not connected) and self._connected and self._is_pulse_guiding:
+        elif (not connected) and state.connected and state.is_pulse_guiding:
+            self._lock.release()
             raise RuntimeError('Cannot disconnect while guider is tracking')
-        self._connected = connected
+        self._state = state._replace(connected=connected)
         self._lock.release()
         if connected:
             self.logger.info('[connected]')
@@ -94,423 +192,263 @@ class TelescopeDevice:
             self.logger.info('[disconnected]')
 
     #
-    # Guarded properties
+    # Constant properties, no lock needed
     #
 
     @property
     def alignment_mode(self) -> int:
-        self._lock.acquire()
-        res = self._alignment_mode
-        self._lock.release()
-        return res
+        return self.capabilities.alignment_mode
 
     @property
     def aperture_area(self) -> float:
-        self._lock.acquire()
-        res = self._aperture_area
-        self._lock.release()
-        return res
+        return self.capabilities.aperture_area
 
     @property
     def aperture_diameter(self) -> float:
-        self._lock.acquire()
-        res = self._aperture_diameter
-        self._lock.release()
-        return res
+        return self.capabilities.aperture_diameter
 
     @property
     def can_find_home(self) -> bool:
-        self._lock.acquire()
-        res = self._can_find_home
-        self._lock.release()
-        return res
+        return self.capabilities.can_find_home
 
     @property
     def can_park(self) -> bool:
-        self._lock.acquire()
-        res = self._can_park
-        self._lock.release()
-        return res
+        return self.capabilities.can_park
 
     @property
     def can_pulse_guide(self) -> bool:
-        self._lock.acquire()
-        res = self._can_pulse_guide
-        self._lock.release()
-        return res
+        return self.capabilities.can_pulse_guide
 
     @property
     def can_set_declination_rate(self) -> bool:
-        self._lock.acquire()
-        res = self._can_set_declination_rate
-        self._lock.release()
-        return res
+        return self.capabilities.can_set_declination_rate
 
     @property
     def can_set_guide_rates(self) -> bool:
-        self._lock.acquire()
-        res = self._can_set_guide_rates
-        self._lock.release()
-        return res
+        return self.capabilities.can_set_guide_rates
 
     @property
     def can_set_park(self) -> bool:
-        self._lock.acquire()
-        res = self._can_set_park
-        self._lock.release()
-        return res
+        return self.capabilities.can_set_park
 
     @property
     def can_set_pier_side(self) -> bool:
-        self._lock.acquire()
-        res = self._can_set_pier_side
-        self._lock.release()
-        return res
+        return self.capabilities.can_set_pier_side
 
     @property
     def can_set_right_ascension_rate(self) -> bool:
-        self._lock.acquire()
-        res = self._can_set_right_ascension_rate
-        self._lock.release()
-        return res
+        return self.capabilities.can_set_right_ascension_rate
 
     @property
     def can_set_tracking(self) -> bool:
-        self._lock.acquire()
-        res = self._can_set_tracking
-        self._lock.release()
-        return res
+        return self.capabilities.can_set_tracking
 
     @property
     def can_slew(self) -> bool:
-        self._lock.acquire()
-        res = self._can_slew
-        self._lock.release()
-        return res
+        return self.capabilities.can_slew
 
     @property
     def can_slew_alt_az(self) -> bool:
-        self._lock.acquire()
-        res = self._can_slew_alt_az
-        self._lock.release()
-        return res
+        return self.capabilities.can_slew_alt_az
 
     @property
     def can_slew_alt_az_async(self) -> bool:
-        self._lock.acquire()
-        res = self._can_slew_alt_az_async
-        self._lock.release()
-        return res
+        return self.capabilities.can_slew_alt_az_async
 
     @property
     def can_slew_async(self) -> bool:
-        self._lock.acquire()
-        res = self._can_slew_async
-        self._lock.release()
-        return res
+        return self.capabilities.can_slew_async
 
     @property
     def can_sync(self) -> bool:
-        self._lock.acquire()
-        res = self._can_sync
-        self._lock.release()
-        return res
+        return self.capabilities.can_sync
 
     @property
     def can_unpark(self) -> bool:
-        self._lock.acquire()
-        res = self._can_unpark
-        self._lock.release()
-        return res
+        return self.capabilities.can_unpark
 
     @property
     def declination_rate(self) -> float:
-        self._lock.acquire()
-        res = self._declination_rate
-        self._lock.release()
-        return res
+        return self.capabilities.declination_rate
 
     @property
     def does_refraction(self) -> bool:
-        self._lock.acquire()
-        res = self._does_refraction
-        self._lock.release()
-        return res
+        return self.capabilities.does_refraction
 
     @property
     def equatorial_system(self) -> int:
-        self._lock.acquire()
-        res = self._equatorial_system
-        self._lock.release()
-        return res
+        return self.capabilities.equatorial_system
 
     @property
     def focal_length(self) -> float:
-        self._lock.acquire()
-        res = self._focal_length
-        self._lock.release()
-        return res
+        return self.capabilities.focal_length
 
     @property
     def right_ascension_rate(self) -> float:
-        self._lock.acquire()
-        res = self._right_ascension_rate
-        self._lock.release()
-        return res
+        return self.capabilities.right_ascension_rate
 
     @property
     def side_of_pier(self) -> int:
-        self._lock.acquire()
-        res = self._side_of_pier
-        self._lock.release()
-        return res
+        return self.capabilities.side_of_pier
 
     @property
     def site_elevation(self) -> float:
-        self._lock.acquire()
-        res = self._site_elevation
-        self._lock.release()
-        return res
+        return self.capabilities.site_elevation
 
     @property
     def site_latitude(self) -> float:
-        self._lock.acquire()
-        res = self._site_latitude
-        self._lock.release()
-        return res
+        return self.capabilities.site_latitude
 
     @property
     def site_longitude(self) -> float:
-        self._lock.acquire()
-        res = self._site_longitude
-        self._lock.release()
-        return res
+        return self.capabilities.site_longitude
 
     @property
     def slew_settling_time(self) -> float:
-        self._lock.acquire()
-        res = self._slew_settling_time
-        self._lock.release()
-        return res
+        return self.capabilities.slew_settling_time
 
     @property
     def tracking_rate(self) -> int:
-        self._lock.acquire()
-        res = self._tracking_rate
-        self._lock.release()
-        return res
+        return self.capabilities.tracking_rate
 
     @property
-    def tracking_rates(self) -> list:
-        self._lock.acquire()
-        res = self._tracking_rates
-        self._lock.release()
-        return res
+    def tracking_rates(self) -> tuple:
+        return self.capabilities.tracking_rates
 
     #
     # State properties
     #
 
+    def _mount_position(self) -> Position:
+        # Not under the device lock, a refresh runs the where command
+        if self.position is not None:
+            return self.position.get()
+        state = self._state
+        return Position(state.altitude, state.azimuth, state.right_ascension, state.declination, 0.0)
+
     @property
     def altitude(self) -> float:
-        self._lock.acquire()
-        # Make a call to aster to get the altitude
-        command = 'tx where'
-        process = subprocess.run(command.split(), stdout=subprocess.PIPE)
-        output = process.stdout.decode('utf-8')
-        # Parse the output
-
-        self._lock.release()
-        return res
+        return self._mount_position().altitude
 
     @altitude.setter
     def altitude(self, altitude: float):
-        self._lock.acquire()
-        self._altitude = altitude
-        self._lock.release()
+        self._update(altitude=altitude)
 
     @property
     def at_home(self) -> bool:
-        self._lock.acquire()
-        res = self._at_home
-        self._lock.release()
-        return res
+        return self._state.at_home
 
     @at_home.setter
     def at_home(self, at_home: bool):
-        self._lock.acquire()
-        self._at_home = at_home
-        self._lock.release()
+        self._update(at_home=at_home)
 
     @property
     def azimuth(self) -> float:
-        self._lock.acquire()
-        res = self._azimuth
-        self._lock.release()
-        return res
+        return self._mount_position().azimuth
 
     @azimuth.setter
     def azimuth(self, azimuth: float):
-        self._lock.acquire()
-        self._azimuth = azimuth
-        self._lock.release()
+        self._update(azimuth=azimuth)
 
     @property
     def at_park(self) -> bool:
-        self._lock.acquire()
-        res = self._at_park
-        self._lock.release()
-        return res
+        return self._state.at_park
 
     @at_park.setter
     def at_park(self, at_park: bool):
-        self._lock.acquire()
-        self._at_park = at_park
-        self._lock.release()
+        self._update(at_park=at_park)
 
     @property
     def declination(self) -> float:
-        self._lock.acquire()
-        res = self._declination
-        self._lock.release()
-        return res
+        return self._mount_position().declination
 
     @declination.setter
     def declination(self, declination: float):
-        self._lock.acquire()
-        self._declination = declination
-        self._lock.release()
+        self._update(declination=declination)
 
     @property
     def guide_rate_declination(self) -> float:
-        self._lock.acquire()
-        res = self._guide_rate_declination
-        self._lock.release()
-        return res
+        return self._state.guide_rate_declination
 
     @guide_rate_declination.setter
     def guide_rate_declination(self, guide_rate_declination: float):
-        self._lock.acquire()
-        self._guide_rate_declination = guide_rate_declination
-        self._lock.release()
+        self._update(guide_rate_declination=guide_rate_declination)
 
     @property
     def guide_rate_right_ascension(self) -> float:
-        self._lock.acquire()
-        res = self._guide_rate_right_ascension
-        self._lock.release()
-        return res
+        return self._state.guide_rate_right_ascension
 
     @guide_rate_right_ascension.setter
     def guide_rate_right_ascension(self, guide_rate_right_ascension: float):
-        self._lock.acquire()
-        self._guide_rate_right_ascension = guide_rate_right_ascension
-        self._lock.release()
+        self._update(guide_rate_right_ascension=guide_rate_right_ascension)
 
     @property
     def is_pulse_guiding(self) -> bool:
-        self._lock.acquire()
-        res = self._is_pulse_guiding
-        self._lock.release()
-        return res
+        return self._state.is_pulse_guiding
 
     @is_pulse_guiding.setter
-    def is_pulse_guiding(self, ispulseguiding: bool):
-        self._lock.acquire()
-        self._is_pulse_guiding = ispulseguiding
-        self._lock.release()
+    def is_pulse_guiding(self, is_pulse_guiding: bool):
+        self._update(is_pulse_guiding=is_pulse_guiding)
 
     @property
     def right_ascension(self) -> float:
-        self._lock.acquire()
-        res = self._right_ascension
-        self._lock.release()
-        return res
+        return self._mount_position().right_ascension
 
     @right_ascension.setter
     def right_ascension(self, right_ascension: float):
-        self._lock.acquire()
-        self._right_ascension = right_ascension
-        self._lock.release()
+        self._update(right_ascension=right_ascension)
 
     @property
     def sidereal_time(self) -> float:
-        self._lock.acquire()
-        res = self._sidereal_time
-        self._lock.release()
-        return res
+        return self._state.sidereal_time
 
     @sidereal_time.setter
     def sidereal_time(self, sidereal_time: float):
-        self._lock.acquire()
-        self._sidereal_time = sidereal_time
-        self._lock.release()
+        self._update(sidereal_time=sidereal_time)
 
     @property
     def slewing(self) -> bool:
-        self._lock.acquire()
-        res = self._slewing
-        self._lock.release()
-        return res
+        return self._state.slewing
 
     @slewing.setter
     def slewing(self, slewing: bool):
-        self._lock.acquire()
-        self._slewing = slewing
-        self._lock.release()
+        self._update(slewing=slewing)
 
     @property
     def tracking(self) -> bool:
-        self._lock.acquire()
-        res = self._tracking
-        self._lock.release()
-        return res
+        return self._state.tracking
 
     @tracking.setter
     def tracking(self, tracking: bool):
-        self._lock.acquire()
-        self._tracking = tracking
-        self._lock.release()
+        self._update(tracking=tracking)
 
     @property
     def target_declination(self) -> float:
-        self._lock.acquire()
-        res = self._target_declination
-        self._lock.release()
-        return res
+        return self._state.target_declination
 
     @target_declination.setter
     def target_declination(self, target_declination: float):
-        self._lock.acquire()
-        self._target_declination = target_declination
-        self._lock.release()
+        self._update(target_declination=target_declination)
 
     @property
     def target_right_ascension(self) -> float:
-        self._lock.acquire()
-        res = self._target_right_ascension
-        self._lock.release()
-        return res
+        return self._state.target_right_ascension
 
     @target_right_ascension.setter
     def target_right_ascension(self, target_right_ascension: float):
-        self._lock.acquire()
-        self._target_right_ascension = target_right_ascension
-        self._lock.release()
+        self._update(target_right_ascension=target_right_ascension)
 
     @property
     def utc_date(self) -> str:
-        self._lock.acquire()
-        res = self._utc_date
-        self._lock.release()
-        return res
-    
+        return self._state.utc_date
+
     #
     # Methods
     #
 
     def abort_slew(self):
-        pass
+        if self.mount is not None:
+            self.mount.abort()
 
     def action(self, action: str, parameters: list):
         pass
@@ -521,16 +459,73 @@ class TelescopeDevice:
     def can_move_axis(self, axis: int) -> bool:
         pass
 
+    # Slews return as soon as the mount has been told, the SlewMachine keeps
+    # slewing, the target and the position up to date in the state while it
+    # moves. The synchronous ones then wait for it to stop.
+
+    # With CanSlew/CanSync false they raise NotImplementedError, which the
+    # responders answer with NotImplementedException.
+
+    def slew_to_coordinates_async(self, right_ascension: float, declination: float):
+        if not self.capabilities.can_slew:
+            raise NotImplementedError('CanSlew is false, no slew_command is configured')
+        if self.mount is None:
+            self._update(target_right_ascension=right_ascension, target_declination=declination)
+            return
+        self.mount.start(right_ascension, declination)
+
+    def slew_to_coordinates(self, right_ascension: float, declination: float):
+        self.slew_to_coordinates_async(right_ascension, declination)
+        if self.mount is not None:
+            self.mount.wait()
+
+    def slew_to_target_async(self):
+        state = self._state
+        self.slew_to_coordinates_async(state.target_right_ascension, state.target_declination)
+
+    def slew_to_target(self):
+        state = self._state
+        self.slew_to_coordinates(state.target_right_ascension, state.target_declination)
+
+    def sync_to_coordinates(self, right_ascension: float, declination: float):
+        if not self.capabilities.can_sync:
+            raise NotImplementedError('CanSync is false, no sync_command is configured')
+        if self._state.slewing:
+            raise RuntimeError('Cannot sync while the telescope is slewing')
+        self._update(target_right_ascension=right_ascension, target_declination=declination)
+        if self.mount is not None:
+            self.mount.sync(right_ascension, declination)
+        else:
+            self._update(right_ascension=right_ascension, declination=declination)
+
+    def sync_to_target(self):
+        state = self._state
+        self.sync_to_coordinates(state.target_right_ascension, state.target_declination)
+
     def pulse_guide(self, direction: int, duration: int):
-        self._is_pulse_guiding = True
-        if direction == 0:
-            self.logger.info("Pulse guide: N")
-        elif direction == 1:
-            self.logger.info("Pulse guide: S")
-        elif direction == 2:
-            self.logger.info("Pulse guide: E")
-        elif direction == 3:
-            self.logger.info("Pulse guide: W")
-        self.logger.info("Pulse guide: {} ms".format(duration))
-        time.sleep(duration / 1000)
-        self._is_pulse_guiding = False
+        # Returns as soon as the pulse has started, the PulseTimer ends it. The
+        # client polls IsPulseGuiding. A new pulse on an axis that is still
+        # moving replaces the old one.
+        if direction not in PULSE_AXES:
+            raise ValueError(f'Bad pulse guide direction {direction}')
+        if duration < 0:
+            raise ValueError(f'Bad pulse guide duration {duration}')
+        axis = PULSE_AXES[direction]
+        self._lock.acquire()
+        previous = self._pulses.get(axis)
+        if previous is not None:
+            self.timer.cancel(previous)
+        self._pulses[axis] = self.timer.start(duration, self._end_pulse, axis)
+        self._state = self._state._replace(is_pulse_guiding=True)
+        self._lock.release()
+        if self.pulse_sink is not None:
+            self.pulse_sink.submit(direction, duration)  # Never blocks
+        self.logger.info('Pulse guide: %s %d ms', DIRECTION_NAMES[direction], duration)
+
+    def _end_pulse(self, pulse):
+        # Runs on the PulseTimer's thread
+        self._lock.acquire()
+        if self._pulses.get(pulse.tag) is pulse:  # not replaced by a newer pulse
+            del self._pulses[pulse.tag]
+        self._state = self._state._replace(is_pulse_guiding=bool(self._pulses))
+        self._lock.release()
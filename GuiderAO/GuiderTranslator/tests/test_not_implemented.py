@@ -0,0 +1,46 @@
+"""
+GETs that ITelescope has but SEO doesn't answer: HTTP 200 and an Alpaca
+NotImplementedException (0x400), not a 405 from a missing route.
+
+Run from GuiderTranslator: python -m pytest -q tests
+"""
+import logging
+import os
+import sys
+
+import pytest
+from falcon import App, testing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import exceptions  # noqa: E402
+import shr  # noqa: E402
+import telescope  # noqa: E402
+from responders import make_responders  # noqa: E402
+
+
+class Device:
+    connected = True
+
+
+@pytest.fixture
+def client():
+    logger = logging.getLogger('test')
+    exceptions.logger = logger                  # as app.main wires them
+    shr.set_shr_logger(logger)
+    app = App()
+    table = [spec for spec in telescope.ENDPOINTS if spec.name in ('axisrates', 'destinationsideofpier')]
+    for name, responder in make_responders(table, Device(), 'Telescope', shr.PreProcessRequest(0)).items():
+        app.add_route(f'/api/v1/telescope/{{devnum:int(min=0)}}/{name}', responder)
+    return testing.TestClient(app)
+
+
+@pytest.mark.parametrize('endpoint, query', [
+    ('axisrates', 'Axis=0'),
+    ('destinationsideofpier', 'RightAscension=1.5&Declination=20'),
+])
+def test_get_answers_not_implemented(client, endpoint, query):
+    result = client.simulate_get(f'/api/v1/telescope/0/{endpoint}',
+                                 query_string=f'{query}&ClientID=1&ClientTransactionID=7')
+    assert result.status_code == 200
+    assert result.json['ErrorNumber'] == 0x400
+    assert result.json['ClientTransactionID'] == 7